@@ -0,0 +1,90 @@
+# api_client.py
+
+"""
+Blocking client for the comparison job API (`api_server.py`).
+
+Used by the Streamlit app when `API_URL` is set, so the script thread only
+submits a job and follows its progress instead of running the graph
+itself. Other systems can use it, or plain HTTP, in the same way.
+
+Usage:
+    client = ApiClient("http://localhost:8080")
+    job = client.submit(["a.txt", "b.txt"], "Datasets")
+    for event in client.events(job["id"]):
+        print(event["event"], event.get("node", ""))
+    result = client.result(job["id"])
+"""
+
+import json
+from typing import Iterator, List
+
+import requests
+
+
+class ApiError(Exception):
+    """Raised when the API rejects a request or a job failed."""
+
+
+class ApiClient:
+    """
+    Args:
+        base_url (str): API root, e.g. `http://localhost:8080`.
+        timeout_s (float): Timeout of plain requests; event streams only time out between keep-alives.
+    """
+
+    def __init__(self, base_url: str, timeout_s: float = 30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout_s = timeout_s
+        self.session = requests.Session()
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout_s)
+        try:
+            return self.session.request(method, f"{self.base_url}{path}", **kwargs)
+        except requests.RequestException as exc:
+            raise ApiError(f"API unreachable at {self.base_url}: {exc}") from exc
+
+    def _json(self, response: requests.Response):
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("error", response.text)
+            except ValueError:
+                message = response.text
+            raise ApiError(f"HTTP {response.status_code}: {message}")
+        return response.json()
+
+    def submit(self, publications: List[str], query: str, fast: bool = False, profile: bool = False) -> dict:
+        """Queues a comparison (`profile` runs it under `run_profiler`); returns `{"id", "status", "links"}` immediately."""
+        body = {"publications": publications, "query": query, "fast": fast, "profile": profile}
+        return self._json(self._request("POST", "/jobs", json=body))
+
+    def job(self, job_id: str) -> dict:
+        return self._json(self._request("GET", f"/jobs/{job_id}"))
+
+    def events(self, job_id: str) -> Iterator[dict]:
+        """Yields the job's progress events until it is done or failed."""
+        with self._request("GET", f"/jobs/{job_id}/events", stream=True, timeout=(self.timeout_s, None)) as response:
+            if response.status_code >= 400:
+                self._json(response)
+            data = []
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("data:"):
+                    data.append(line[5:].strip())
+                elif not line and data:
+                    event = json.loads("\n".join(data))
+                    data = []
+                    yield event
+                    if event["event"] in ("done", "failed"):
+                        return
+
+    def result(self, job_id: str) -> dict:
+        """The job's result; raises `ApiError` when the job failed or has not finished."""
+        job = self.job(job_id)
+        if job["status"] == "failed":
+            raise ApiError(f"job {job_id} failed: {job['error']}")
+        if job["status"] != "done":
+            raise ApiError(f"job {job_id} is still {job['status']}")
+        return job["result"]
+
+    def publications(self) -> List[str]:
+        return self._json(self._request("GET", "/publications"))
@@ -0,0 +1,443 @@
+# api_server.py
+
+"""
+Asyncio HTTP API for comparison jobs.
+
+Submitting a comparison returns a job ID at once. Jobs wait in a bounded
+queue and run on a fixed pool of workers. Each worker owns a
+`PublicationExplorer` and runs the graph in a worker thread, so the event
+loop keeps serving requests while comparisons run. Progress is published
+per graph node and can be followed as server-sent events. The result is
+fetched by ID once the job is done.
+
+Endpoints:
+    POST /jobs              {"publications": ["a.txt", "b.txt"], "query": "Datasets", "fast": false, "profile": false}
+                            → 202 {"id", "status", "links"}; 400 on invalid input, 503 when the queue is full.
+                            `"profile": true` or an `X-Profile: 1` header profiles the run (`run_profiler.py`);
+                            the result then lists the saved profile files
+    GET  /jobs/{id}         status, timings, node events so far and, once done, the result
+    GET  /jobs/{id}/events  text/event-stream: `queued`, `running`, one `node` per finished graph node,
+                            then `done` or `failed`; honours `Last-Event-ID` to resume
+    GET  /publications      publications that can be compared
+    GET  /health            worker count and queue depth
+
+Finished jobs are kept in memory (the most recent `--retain`), so results
+do not survive a restart; batch runs that must survive crashes belong in
+`work_queue.py`.
+
+Usage:
+    python src/api_server.py --port 8080 --workers 4
+    API_URL=http://localhost:8080 streamlit run src/app.py
+"""
+
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Set
+
+from aiohttp import web
+
+from latency import HedgeBudget
+from model_tiers import TierMetrics
+from paths import RUN_PROFILES_DIR, SAMPLE_PUBLICATION_DIR
+from run_profiler import RunProfiler
+from work_queue import RESULT_KEYS, build_explorer
+from logger import logger
+
+
+DEFAULT_PORT = 8080
+WORKERS = 2
+MAX_QUEUED = 32
+RETAIN = 200
+KEEPALIVE_S = 15.0
+TERMINAL_EVENTS = ("done", "failed")
+
+_dumps = functools.partial(json.dumps, default=str, ensure_ascii=False)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+@dataclass
+class Job:
+    id: str
+    payload: dict
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    events: List[dict] = field(default_factory=list)
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    subscribers: Set[asyncio.Queue] = field(default_factory=set, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_EVENTS
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "payload": self.payload,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "events": self.events,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def parse_payload(body: dict, pub_dir: Path = SAMPLE_PUBLICATION_DIR, profile: bool = False) -> dict:
+    """
+    Validates a job submission. Publications are file names inside the
+    sample publication directory; paths are rejected. `profile` (from the
+    `X-Profile` header) turns profiling on regardless of the body.
+
+    Raises:
+        ValueError: On a missing or invalid field.
+    """
+    if not isinstance(body, dict):
+        raise ValueError("body must be a JSON object")
+    pubs = body.get("publications")
+    if not isinstance(pubs, list) or len(pubs) < 2:
+        raise ValueError("'publications' must list at least two publications")
+    paths = []
+    for name in pubs:
+        if not isinstance(name, str) or Path(name).name != name or not (Path(pub_dir) / name).is_file():
+            raise ValueError(f"unknown publication: {name!r}")
+        paths.append(str(Path(pub_dir) / name))
+    query = body.get("query")
+    if not isinstance(query, str) or not query.strip():
+        raise ValueError("'query' must be a non-empty string")
+    return {
+        "publications": pubs,
+        "paths": paths,
+        "query": query.strip(),
+        "fast": bool(body.get("fast")),
+        "profile": profile or bool(body.get("profile")),
+    }
+
+
+# ==============================
+# Job Manager
+# ==============================
+
+class JobManager:
+    """
+    Bounded job queue drained by a fixed pool of workers.
+
+    Args:
+        workers (int): Concurrent comparisons; each worker owns one explorer.
+        max_queued (int): Jobs that may wait for a worker before submissions are refused.
+        retain (int): Finished jobs kept for result lookups.
+        explorer_factory (Callable): Builds a worker's explorer (on the worker thread, on first use).
+    """
+
+    def __init__(self, workers: int = WORKERS, max_queued: int = MAX_QUEUED, retain: int = RETAIN,
+                 explorer_factory: Callable = build_explorer):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retain = retain
+        self.explorer_factory = explorer_factory
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="api-worker")
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"🧵 Job manager started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, payload: dict) -> Job:
+        job = Job(id=uuid.uuid4().hex, payload=payload)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"{self.max_queued} jobs already queued") from None
+        self.jobs[job.id] = job
+        self._publish(job, "queued", position=self._queue.qsize())
+        logger.info(f"📥 Job {job.id} queued: {len(payload['paths'])} publications, query '{payload['query']}'")
+        return job
+
+    def stats(self) -> dict:
+        running = sum(1 for j in self.jobs.values() if j.status == "running")
+        return {"workers": self.workers, "queued": self._queue.qsize() if self._queue else 0, "running": running}
+
+    # ------------------------------
+    # Events
+    # ------------------------------
+
+    def _publish(self, job: Job, kind: str, **data) -> None:
+        """Appends an event to the job and hands it to live subscribers (event-loop thread only)."""
+        event = {"id": len(job.events), "event": kind, "elapsed_ms": round((time.time() - job.created_at) * 1000, 1), **data}
+        job.events.append(event)
+        for queue in job.subscribers:
+            queue.put_nowait(event)
+
+    def subscribe(self, job: Job, after: int = -1):
+        """
+        Past events after `after` plus a queue receiving future ones. Both are
+        taken on the event-loop thread without awaiting, so no event is lost
+        or duplicated in between.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        if not job.finished:
+            job.subscribers.add(queue)
+        return job.events[after + 1:], queue
+
+    # ------------------------------
+    # Workers
+    # ------------------------------
+
+    async def _worker(self, index: int) -> None:
+        explorer = None
+        while True:
+            job = await self._queue.get()
+            job.status, job.started_at = "running", time.time()
+            self._publish(job, "running", worker=index)
+            try:
+                if explorer is None:
+                    explorer = await self._loop.run_in_executor(self._pool, self.explorer_factory)
+                job.result = await self._loop.run_in_executor(self._pool, self._run, job, explorer)
+                job.status = "done"
+                self._publish(job, "done")
+                logger.info(f"✅ Job {job.id} done in {time.time() - job.started_at:.1f}s")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                job.status, job.error = "failed", f"{type(exc).__name__}: {exc}"
+                self._publish(job, "failed", error=job.error)
+                logger.error(f"❌ Job {job.id} failed: {job.error}")
+            finally:
+                job.finished_at = time.time()
+                job.subscribers.clear()
+                self._queue.task_done()
+                self._evict()
+
+    def _run(self, job: Job, explorer) -> dict:
+        """Streams the graph on a worker thread, forwarding each finished node to the event loop."""
+        state = {
+            "run_id": job.id,
+            "pub_paths": job.payload["paths"],
+            "user_query": job.payload["query"],
+            "fast": job.payload["fast"],
+            "count": 0,
+        }
+        # Workers reuse their explorer, so call and hedge counts restart per job (as with the app's
+        # fresh explorer per run); the latency window stays process-wide for timeouts and hedging
+        explorer.tier_metrics = TierMetrics(explorer.tier_metrics.models)
+        explorer.hedge_budget = HedgeBudget()
+        final = {}
+        profiler = RunProfiler(job.id).start() if job.payload.get("profile") else None
+        try:
+            for mode, chunk in explorer.graph.stream(state, stream_mode=["updates", "values"]):
+                if mode == "values":
+                    final = chunk
+                    continue
+                for node in chunk:
+                    self._loop.call_soon_threadsafe(functools.partial(self._publish, job, "node", node=node))
+        finally:
+            if profiler is not None:
+                profiler.stop()
+        result = {k: final.get(k) for k in RESULT_KEYS}
+        result["tier_metrics"] = explorer.tier_metrics.summary()
+        result["hedging"] = explorer.hedge_budget.stats
+        result["latency_ms"] = explorer.latency.snapshot()
+        result["node_metrics"] = explorer.node_ledger.pop(job.id)
+        if profiler is not None:
+            result["profile"] = profiler.save(RUN_PROFILES_DIR / f"job_{job.id}.profile")
+        return result
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.retain)]:
+            del self.jobs[job_id]
+
+
+# ==============================
+# HTTP Handlers
+# ==============================
+
+def _error(status: int, message: str) -> web.Response:
+    return web.json_response({"error": message}, status=status)
+
+
+def _sse(event: dict) -> bytes:
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {_dumps(event)}\n\n".encode("utf-8")
+
+
+MANAGER = web.AppKey("manager", JobManager)
+
+
+def create_app(manager: Optional[JobManager] = None, pub_dir: Path = SAMPLE_PUBLICATION_DIR) -> web.Application:
+    """aiohttp application serving `manager` (stored under `MANAGER`); the manager starts and stops with the app."""
+    app = web.Application()
+    app[MANAGER] = manager or JobManager()
+
+    async def on_startup(app_: web.Application):
+        await app_[MANAGER].start()
+
+    async def on_cleanup(app_: web.Application):
+        await app_[MANAGER].stop()
+
+    def job_or_404(request: web.Request) -> Job:
+        job = request.app[MANAGER].jobs.get(request.match_info["job_id"])
+        if job is None:
+            raise web.HTTPNotFound(text=_dumps({"error": "unknown job"}), content_type="application/json")
+        return job
+
+    async def submit(request: web.Request) -> web.Response:
+        try:
+            profile = request.headers.get("X-Profile", "").lower() in ("1", "true", "yes")
+            payload = parse_payload(await request.json(), pub_dir, profile=profile)
+        except json.JSONDecodeError:
+            return _error(400, "body must be JSON")
+        except ValueError as exc:
+            return _error(400, str(exc))
+        try:
+            job = request.app[MANAGER].submit(payload)
+        except QueueFullError as exc:
+            return _error(503, str(exc))
+        links = {"self": f"/jobs/{job.id}", "events": f"/jobs/{job.id}/events"}
+        return web.json_response({"id": job.id, "status": job.status, "links": links}, status=202)
+
+    async def get_job(request: web.Request) -> web.Response:
+        return web.json_response(job_or_404(request).to_dict(), dumps=_dumps)
+
+    async def job_events(request: web.Request) -> web.StreamResponse:
+        job = job_or_404(request)
+        try:
+            after = int(request.headers.get("Last-Event-ID", -1))
+        except ValueError:
+            after = -1
+        backlog, queue = request.app[MANAGER].subscribe(job, after)
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        try:
+            for event in backlog:
+                await response.write(_sse(event))
+                if event["event"] in TERMINAL_EVENTS:
+                    return response
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), KEEPALIVE_S)
+                except asyncio.TimeoutError:
+                    await response.write(b": keep-alive\n\n")
+                    continue
+                await response.write(_sse(event))
+                if event["event"] in TERMINAL_EVENTS:
+                    return response
+        finally:
+            job.subscribers.discard(queue)
+
+    async def publications(_request: web.Request) -> web.Response:
+        return web.json_response(sorted(p.name for p in Path(pub_dir).glob("*.txt")))
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", **request.app[MANAGER].stats()})
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_post("/jobs", submit)
+    app.router.add_get("/jobs/{job_id}", get_job)
+    app.router.add_get("/jobs/{job_id}/events", job_events)
+    app.router.add_get("/publications", publications)
+    app.router.add_get("/health", health)
+    return app
+
+
+# ==============================
+# Server
+# ==============================
+
+class ApiServer:
+    """
+    Runs the API on its own event loop in a background thread, e.g. next to
+    a Streamlit process or in tests; usable as a context manager.
+    """
+
+    def __init__(self, manager: Optional[JobManager] = None, host: str = "127.0.0.1", port: int = 0):
+        self.app = create_app(manager)
+        self.host, self.port = host, port
+        self._loop = asyncio.new_event_loop()
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "ApiServer":
+        async def serve():
+            self._runner = web.AppRunner(self.app)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, self.host, self.port)
+            await site.start()
+            self.port = self._runner.addresses[0][1]
+
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True, name="api-server")
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(serve(), self._loop).result()
+        logger.info(f"🌐 API server listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        if self._runner is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "ApiServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+# ==============================
+# CLI
+# ==============================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve comparison jobs over HTTP with server-sent progress events.")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Bind port.")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Concurrent comparisons.")
+    parser.add_argument("--max-queued", type=int, default=MAX_QUEUED, help="Waiting jobs before submissions get HTTP 503.")
+    parser.add_argument("--retain", type=int, default=RETAIN, help="Finished jobs kept for result lookups.")
+    parser.add_argument("--fake-model", action="store_true", help="Use the offline fake model (demos, tests).")
+    args = parser.parse_args(argv)
+
+    factory = functools.partial(build_explorer, fake_model=args.fake_model)
+    manager = JobManager(args.workers, args.max_queued, args.retain, factory)
+    web.run_app(create_app(manager), host=args.host, port=args.port, print=None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
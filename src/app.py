@@ -9,6 +9,7 @@ Streamlit UI for comparing scientific publications.
 
 import os
 import json
+import uuid
 from datetime import datetime
 from html import escape
 from pathlib import Path
@@ -28,8 +29,10 @@ sys.path.insert(0, str(SRC_DIR.parent))
 #from src.paths import SAMPLE_PUBLICATION_DIR, COMPARISONS_DIR, OUTPUTS_DIR, LOGS_DIR, PROFILES_DIR
 
 
-from explorer import PublicationExplorer
-from src.paths import SAMPLE_PUBLICATION_DIR, COMPARISONS_DIR, OUTPUTS_DIR, LOGS_DIR, PROFILES_DIR
+from similarity import get_similarity_index
+from utils import clean_filename
+from run_history import RunHistory, RunRecord
+from src.paths import SAMPLE_PUBLICATION_DIR, COMPARISONS_DIR, OUTPUTS_DIR, LOGS_DIR, PROFILES_DIR, CASSETTES_DIR, RUN_PROFILES_DIR
 
 
 
@@ -40,11 +43,14 @@ load_dotenv()
 openai_key = os.getenv("OPENAI_API_KEY", "")
 tavily_key = os.getenv("TAVILY_API_KEY", "")
 
+# 🌐 Comparison job API (`src/api_server.py`); empty runs comparisons in this process
+api_url = os.getenv("API_URL", "")
+
 # 📱 Streamlit UI Setup
 st.set_page_config(page_title="Publication Comparator", layout="wide")
 st.title("📊 AI-Powered Ready Tensor Publication Comparator")
 st.markdown("""
-Simply select two `.txt` publication files and a query type to compare:
+Simply select two or more `.txt` publication files and a query type to compare:
 
 - Tools  
 - Tasks  
@@ -108,12 +114,57 @@ This AI-powered comparison tool uses:
     else:
         st.info("⚠️ No logs found yet.")
 
+    # 🎞️ Record/replay
+    record_cassette = st.checkbox(
+        "🎞️ Record LLM cassette",
+        disabled=bool(api_url),
+        help=(
+            "Not available while comparisons run on the API server (`API_URL` is set); cassettes are recorded by local runs only."
+            if api_url else "Capture every LLM response of the run to `outputs/cassettes/` for offline replay."
+        ),
+    ) and not api_url
+
+    # ⚡ Fast mode
+    fast_compare = st.checkbox(
+        "⚡ Fast compare (no LLM)",
+        help="Build profiles from the entity gazetteer and report the deterministic profile diff as the comparison, without LLM calls.",
+    )
+
+    # 🔬 Profiling
+    profile_run = st.checkbox(
+        "🔬 Profile this run",
+        help="Sample the run's stacks and per-node allocations; saves a flamegraph-ready `.folded` file and an allocation report to `outputs/run_profiles/`.",
+    )
+
 
 # 📄 Load publications
 pub_dir = Path(SAMPLE_PUBLICATION_DIR)
 pub_files = sorted(f.name for f in pub_dir.glob("*.txt"))
-pub1 = st.selectbox("Select Publication 1", [""] + pub_files, key="pub1")
-pub2 = st.selectbox("Select Publication 2", [""] + pub_files, key="pub2")
+selected_pubs = st.multiselect("Select publications to compare (two or more)", pub_files, key="pubs")
+
+# 🔗 Similar publications
+with st.expander("🔗 Find similar publications"):
+    similarity_index = get_similarity_index()
+    if similarity_index is None:
+        st.info("⚠️ Corpus profiles not found. Run `python src/corpus.py` to enable similarity search.")
+    else:
+        seed = st.selectbox("Find publications similar to", [""] + pub_files, key="similar_seed")
+        top_k = st.slider("Number of results", 1, 20, 5, key="similar_k")
+        if seed:
+            ids_by_stem = {clean_filename(t): d for d, t in zip(similarity_index.doc_ids, similarity_index.titles)}
+            doc_id = ids_by_stem.get(Path(seed).stem)
+            if doc_id is None:
+                st.info("⚠️ This publication has no precomputed profile yet.")
+            else:
+                matches = similarity_index.similar_to(doc_id, top_k)
+                st.table([
+                    {
+                        "Publication": m["title"],
+                        "Similarity": f"{m['score']:.2f}",
+                        "Shared": "; ".join(f"{f}: {', '.join(v)}" for f, v in m["shared"].items() if v),
+                    }
+                    for m in matches
+                ])
 
 # 🧠 Query Selection
 query_options = [""] + [
@@ -129,60 +180,143 @@ elif query_choice:
 
 # 🚀 Comparison Trigger
 if st.button("🚀 Run Comparison"):
-    if not pub1 or not pub2:
-        st.warning("Please select both publications before running the comparison.")
+    if len(selected_pubs) < 2:
+        st.warning("Please select at least two publications before running the comparison.")
     elif not user_query:
         st.warning("Please enter or select a valid query.")
     else:
-        explorer = PublicationExplorer()
-        state = {
-            "pub1_path": str(pub_dir / pub1),
-            "pub2_path": str(pub_dir / pub2),
-            "user_query": user_query,
-            "pub1_profile": "",
-            "pub2_profile": "",
-            "comparison": "",
-            "trends": "",
-            "summary": "",
-            "fact_check": "",
-            "extra_info": "",
-            "lnode": "",
-            "count": 0
-        }
-
-        with st.spinner("🔍 Processing publications... This may take a moment."):
-            result = explorer.graph.invoke(state)
+        if api_url:
+            # 🌐 Thin client: the API server runs the graph, this script only follows the job
+            from api_client import ApiClient, ApiError
+
+            client = ApiClient(api_url)
+            progress = st.empty()
+            try:
+                job = client.submit(selected_pubs, user_query, fast_compare, profile=profile_run)
+                run_id = job["id"]
+                for event in client.events(job["id"]):
+                    if event["event"] == "node":
+                        progress.info(f"⏳ {event['node']} finished after {event['elapsed_ms'] / 1000:.1f}s")
+                result = {k: v for k, v in client.result(job["id"]).items() if v is not None}
+            except ApiError as e:
+                st.error(f"❌ Comparison job failed: {e}")
+                st.stop()
+            progress.empty()
+            tier_summary = result.pop("tier_metrics", {})
+            latency_info = {"hedging": result.pop("hedging", {}), "latency_ms": result.pop("latency_ms", {})}
+            node_metrics = result.pop("node_metrics", {})
+            profiler, profile_files = None, result.pop("profile", None)
+        else:
+            # Imported on the first comparison so plain reruns (widget changes) never pay for the pipeline
+            from explorer import PublicationExplorer
+            from cassette import Cassette
+            from run_profiler import RunProfiler
+
+            run_id = uuid.uuid4().hex
+            cassette = Cassette(CASSETTES_DIR / f"cassette_{run_id}.jsonl.gz") if record_cassette else None
+            explorer = PublicationExplorer(cassette=cassette)
+            state = {
+                "run_id": run_id,
+                "pub_paths": [str(pub_dir / p) for p in selected_pubs],
+                "pub1_path": str(pub_dir / selected_pubs[0]),
+                "pub2_path": str(pub_dir / selected_pubs[1]),
+                "user_query": user_query,
+                "fast": fast_compare,
+                "profiles": [],
+                "pub1_profile": "",
+                "pub2_profile": "",
+                "comparison": "",
+                "trends": "",
+                "summary": "",
+                "fact_check": "",
+                "extra_info": "",
+                "lnode": "",
+                "count": 0
+            }
+
+            # Stopped once the results are written, so JSON dumping and file I/O are covered too
+            profiler = RunProfiler(run_id).start() if profile_run else None
+            profile_files = None
+
+            try:
+                with st.spinner("🔍 Processing publications... This may take a moment."):
+                    result = explorer.graph.invoke(state)
+            except BaseException:
+                if profiler is not None:
+                    profiler.stop()  # don't leave the sampler and tracemalloc running in the Streamlit process
+                raise
+
+            if cassette is not None:
+                cassette.save(state=state)
+
+            tier_summary = explorer.tier_metrics.summary()
+            latency_info = {"hedging": explorer.hedge_budget.stats, "latency_ms": explorer.latency.snapshot()}
+            node_metrics = explorer.node_ledger.pop(run_id)
 
         # ✅ Always save validated profiles
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        if result.get("pub1_profile"):
-            profile_path1 = PROFILES_DIR / f"validated_profile_pub1_{Path(pub1).stem}_{timestamp}.json"
-            with open(profile_path1, "w", encoding="utf-8") as f:
-                json.dump(result["pub1_profile"], f, indent=2, ensure_ascii=False)
-
-        if result.get("pub2_profile"):
-            profile_path2 = PROFILES_DIR / f"validated_profile_pub2_{Path(pub2).stem}_{timestamp}.json"
-            with open(profile_path2, "w", encoding="utf-8") as f:
-                json.dump(result["pub2_profile"], f, indent=2, ensure_ascii=False)
+        PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+        for i, (pub, profile) in enumerate(zip(selected_pubs, result.get("profiles") or []), start=1):
+            if profile:
+                profile_path = PROFILES_DIR / f"validated_profile_pub{i}_{Path(pub).stem}_{timestamp}.json"
+                with open(profile_path, "w", encoding="utf-8") as f:
+                    json.dump(profile, f, indent=2, ensure_ascii=False)
 
         # ✅ Display Results
         st.subheader("✅ Summary")
         st.text_area("Summary", result.get("summary", "[No summary]"), height=300)
 
+        with st.expander("🧮 Profile Diff"):
+            st.text_area("Comparison", result.get("comparison", "[No comparison]"), height=300)
+            if result.get("profile_diff"):
+                st.json(result["profile_diff"], expanded=False)
+
         with st.expander("📘 Fact Check"):
             st.text_area("Fact Check", result.get("fact_check", "[No fact check]"), height=300)
+            if result.get("grounding"):
+                st.dataframe([
+                    {
+                        "Claim": c["claim"],
+                        "Source": c["source"],
+                        "Support": f"{c['score']:.2f}",
+                        "Evidence": " | ".join(f"{e['publication']} [{e['start']}:{e['end']}]" for e in c["evidence"]),
+                    }
+                    for c in result["grounding"]
+                ])
 
         with st.expander("🧠 Enrichment"):
             st.text_area("ReAct Agent Output", result.get("extra_info", "[No enrichment]"), height=300)
 
+        with st.expander("💸 Model Tiers"):
+            st.json(tier_summary)
+
+        with st.expander("⏱️ Latency & Hedging"):
+            st.json(latency_info)
+
         # 📝 Save Comparison Results
-        base_name = f"comparison_{Path(pub1).stem}_vs_{Path(pub2).stem}_{timestamp}"
+        stems = [Path(p).stem for p in selected_pubs]
+        label = "_vs_".join(stems) if len(stems) <= 3 else f"{stems[0]}_and_{len(stems) - 1}_more"
+        base_name = f"comparison_{label}_{timestamp}"
         json_path = COMPARISONS_DIR / f"{base_name}.json"
         html_path = COMPARISONS_DIR / f"{base_name}.html"
 
+        # The `run` block lets `run_history.py --rebuild` recompute the aggregates from this file
+        run_record = RunRecord(
+            run_id=run_id,
+            saved_at=datetime.now().isoformat(timespec="seconds"),
+            query=user_query,
+            publications=stems,
+            profiles=[p for p in result.get("profiles") or [] if isinstance(p, dict)],
+            nodes=node_metrics,
+            source=str(json_path),
+        )
+        result["run"] = run_record.meta()
+
         try:
+            COMPARISONS_DIR.mkdir(parents=True, exist_ok=True)
             with open(json_path, "w", encoding="utf-8") as f:
                 json.dump(result, f, indent=2, ensure_ascii=False)
+            RunHistory().record(run_record)
 
             # Save HTML report
             html_report = f"""
@@ -192,6 +326,7 @@ if st.button("🚀 Run Comparison"):
             <body>
                 <h1>📊 Comparison</h1>
                 <p><strong>Query:</strong> {escape(user_query)}</p>
+                <p><strong>Publications:</strong> {escape(", ".join(stems))}</p>
                 <h2>✅ Summary</h2><pre>{escape(result.get("summary", "[No summary]"))}</pre>
                 <h2>📘 Fact Check</h2><pre>{escape(result.get("fact_check", "[No fact check]"))}</pre>
                 <h2>🧠 Enrichment</h2><pre>{escape(result.get("extra_info", "[No enrichment]"))}</pre>
@@ -211,8 +346,21 @@ if st.button("🚀 Run Comparison"):
                 f"• 🧪 Comparison JSON: `{json_path.name}`\n"
                 f"• 📄 Comparison HTML: `{html_path.name}`\n"
                 f"• ✅ Profiles: saved in `outputs/profiles/`\n"
+                f"• 📈 History: aggregates updated (see the History page)\n"
                 f"• 🗒 Logs: `{latest_log}`"
             )
 
         except Exception as e:
             st.error(f"❌ Failed to save results: {e}")
+
+        # 🔬 Run profile
+        if profiler is not None:
+            profile_files = profiler.stop().save(RUN_PROFILES_DIR / f"{base_name}.profile")
+        if profile_files:
+            with st.expander("🔬 Run Profile"):
+                st.markdown(
+                    f"• 🔥 Flamegraph stacks: `{Path(profile_files['flamegraph']).name}`\n"
+                    f"• 🧠 Allocations: `{Path(profile_files['allocations']).name}`"
+                )
+                if profiler is not None:
+                    st.json(profiler.summary())
@@ -0,0 +1,306 @@
+# cassette.py
+
+"""
+Record/replay layer for LLM calls.
+
+A `Cassette` captures every chat-model response, Guardrails outcome, tool
+observation and ReAct agent answer of a run into a compact gzip JSON-lines
+file. Replaying the cassette serves those responses back without network
+access, optionally sleeping for the recorded (or scaled) latency, so runs can
+be re-profiled, regression-tested and load-tested offline.
+
+Usage:
+    python src/cassette.py outputs/cassettes/cassette_<run_id>.jsonl.gz --latency 1.0
+"""
+
+import sys
+import gzip
+import json
+import time
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from collections import defaultdict, deque
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Deque, Dict, List, Optional
+
+from langchain_core.messages import AIMessage
+
+from logger import logger
+
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(Exception):
+    """Raised when a replayed request has no recorded response."""
+
+
+def request_key(kind: str, request: Any) -> str:
+    """Stable, compact fingerprint of a request (the prompt itself is not stored)."""
+    if isinstance(request, list):
+        request = "\n".join(getattr(m, "content", str(m)) for m in request)
+    digest = hashlib.sha256(f"{kind}\x00{request}".encode("utf-8")).hexdigest()
+    return digest[:16]
+
+
+# ==============================
+# Cassette
+# ==============================
+
+class Cassette:
+    """
+    In-memory list of recorded interactions backed by a `.jsonl.gz` file.
+
+    Args:
+        path (str | Path): Cassette file location.
+        mode (str): "record" or "replay".
+        latency_scale (float): Replay sleeps `recorded latency * latency_scale`;
+            0 replays instantly.
+        strict (bool): In replay, raise `CassetteMiss` when a request's
+            fingerprint is unknown instead of serving the next recorded
+            response of the same kind.
+    """
+
+    def __init__(self, path, mode: str = "record", latency_scale: float = 0.0, strict: bool = False):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self.header: Dict[str, Any] = {}
+        self.entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, Deque[int]] = defaultdict(deque)
+        self._by_kind: Dict[str, Deque[int]] = defaultdict(deque)
+        self._used: set = set()
+
+    @classmethod
+    def load(cls, path, latency_scale: float = 0.0, strict: bool = False) -> "Cassette":
+        """Opens a recorded cassette for replay."""
+        cassette = cls(path, mode="replay", latency_scale=latency_scale, strict=strict)
+        with gzip.open(cassette.path, "rt", encoding="utf-8") as f:
+            cassette.header = json.loads(f.readline())
+            for line in f:
+                cassette._index(json.loads(line))
+        logger.info(f"🎞️ Loaded cassette {cassette.path.name} ({len(cassette.entries)} interactions)")
+        return cassette
+
+    def _index(self, entry: Dict[str, Any]) -> None:
+        position = len(self.entries)
+        self.entries.append(entry)
+        self._by_key[entry["key"]].append(position)
+        self._by_kind[entry["kind"]].append(position)
+
+    def record(self, kind: str, request: Any, response: Any, latency_ms: float) -> None:
+        with self._lock:
+            self._index({
+                "kind": kind,
+                "key": request_key(kind, request),
+                "latency_ms": round(latency_ms, 3),
+                "response": response,
+            })
+
+    def play(self, kind: str, request: Any) -> Any:
+        """Returns the recorded response for a request, honoring simulated latency."""
+        key = request_key(kind, request)
+        with self._lock:
+            position = self._take(self._by_key[key])
+            if position is None:
+                if self.strict:
+                    raise CassetteMiss(f"No recorded {kind} response for request {key}")
+                position = self._take(self._by_kind[kind])
+                if position is None:
+                    raise CassetteMiss(f"Cassette exhausted for {kind} requests")
+                logger.warning(f"⚠️ Cassette fingerprint miss for {kind}; serving next recorded response")
+            entry = self.entries[position]
+        if self.latency_scale:
+            time.sleep(entry["latency_ms"] * self.latency_scale / 1000)
+        return entry["response"]
+
+    def _take(self, queue: Deque[int]) -> Optional[int]:
+        while queue:
+            position = queue.popleft()
+            if position not in self._used:
+                self._used.add(position)
+                return position
+        return None
+
+    def save(self, state: Optional[dict] = None) -> str:
+        """Writes the cassette, storing the initial graph state in its header."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.header = {
+            "version": CASSETTE_VERSION,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "state": state or self.header.get("state"),
+        }
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps(self.header, ensure_ascii=False) + "\n")
+            for entry in self.entries:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        logger.info(f"🎞️ Saved cassette with {len(self.entries)} interactions to {self.path}")
+        return str(self.path)
+
+    # ------------------------------
+    # Wrappers
+    # ------------------------------
+
+    def wrap_model(self, model=None):
+        return RecordingModel(model, self) if self.mode == "record" else ReplayModel(self)
+
+    def wrap_guard(self, guard):
+        return RecordingGuard(guard, self) if self.mode == "record" else ReplayGuard(self)
+
+    def wrap_agent(self, agent=None):
+        return RecordingAgent(agent, self) if self.mode == "record" else ReplayAgent(self)
+
+    def wrap_tool(self, name: str, tool):
+        return RecordingTool(name, tool, self) if self.mode == "record" else ReplayTool(name, self)
+
+
+# ==============================
+# Recording Wrappers
+# ==============================
+
+class RecordingModel:
+    """Chat-model proxy that records each `invoke` response."""
+
+    def __init__(self, model, cassette: Cassette):
+        self.model = model
+        self.cassette = cassette
+
+    def invoke(self, messages, *args, **kwargs):
+        start = time.perf_counter()
+        response = self.model.invoke(messages, *args, **kwargs)
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.cassette.record("llm", messages, response.content, latency_ms)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+class RecordingGuard:
+    """Guardrails proxy that records each validated output."""
+
+    def __init__(self, guard, cassette: Cassette):
+        self.guard = guard
+        self.cassette = cassette
+
+    def parse(self, llm_output: str, *args, **kwargs):
+        start = time.perf_counter()
+        result = self.guard.parse(llm_output, *args, **kwargs)
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.cassette.record("guard", llm_output, result.validated_output, latency_ms)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.guard, name)
+
+
+class RecordingAgent:
+    """ReAct agent proxy that records each final answer."""
+
+    def __init__(self, agent, cassette: Cassette):
+        self.agent = agent
+        self.cassette = cassette
+
+    def run(self, query: str, *args, **kwargs):
+        start = time.perf_counter()
+        response = self.agent.run(query, *args, **kwargs)
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.cassette.record("agent", query, response, latency_ms)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.agent, name)
+
+
+class RecordingTool:
+    """Agent tool proxy that records each observation."""
+
+    def __init__(self, name: str, tool, cassette: Cassette):
+        self.name = name
+        self.tool = tool
+        self.cassette = cassette
+
+    def __call__(self, query: str):
+        start = time.perf_counter()
+        response = self.tool(query)
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.cassette.record(f"tool:{self.name}", query, response, latency_ms)
+        return response
+
+
+# ==============================
+# Replay Stand-ins
+# ==============================
+
+class ReplayModel:
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    def invoke(self, messages, *args, **kwargs) -> AIMessage:
+        return AIMessage(content=self.cassette.play("llm", messages))
+
+
+class ReplayGuard:
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    def parse(self, llm_output: str, *args, **kwargs):
+        return SimpleNamespace(validated_output=self.cassette.play("guard", llm_output))
+
+
+class ReplayAgent:
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    def run(self, query: str, *args, **kwargs) -> str:
+        return self.cassette.play("agent", query)
+
+
+class ReplayTool:
+    def __init__(self, name: str, cassette: Cassette):
+        self.name = name
+        self.cassette = cassette
+
+    def __call__(self, query: str):
+        return self.cassette.play(f"tool:{self.name}", query)
+
+
+# ==============================
+# Offline Replay CLI
+# ==============================
+
+def replay_run(path, latency_scale: float = 0.0, strict: bool = False) -> dict:
+    """Re-runs the recorded graph offline and returns the final state."""
+    from explorer import PublicationExplorer
+
+    cassette = Cassette.load(path, latency_scale=latency_scale, strict=strict)
+    state = cassette.header.get("state")
+    if not state:
+        raise CassetteMiss(f"Cassette {path} does not store an initial state")
+    explorer = PublicationExplorer(cassette=cassette)
+    return explorer.graph.invoke(state)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a recorded LLM cassette offline.")
+    parser.add_argument("cassette", help="Path to a .jsonl.gz cassette.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Scale for recorded latency (0 = instant).")
+    parser.add_argument("--strict", action="store_true", help="Fail on requests missing from the cassette.")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    result = replay_run(args.cassette, latency_scale=args.latency, strict=args.strict)
+    print(f"✅ Replayed {args.cassette} in {time.perf_counter() - start:.3f} s")
+    print(result.get("summary", "[No summary]"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
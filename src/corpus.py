@@ -0,0 +1,156 @@
+# corpus.py
+
+"""
+Offline, corpus-wide profile precomputation.
+
+Extracts a validated profile for every publication in
+`data/project_1_publications.json` (streamed record by record) in parallel and stores them in
+`outputs/corpus/corpus_profiles.json` for `trends.TrendEngine`. Re-runs only
+extract publications whose content hash changed.
+
+Usage:
+    python src/corpus.py --workers 8
+"""
+
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from paths import PUBLICATION_FPATH
+from ingest import iter_records
+from trends import CORPUS_PROFILES_PATH
+from normalize import TextNormalizer
+from logger import logger
+
+
+PROFILE_TEXT_CHARS = 12000
+DATE_KEYS = ("published_at", "publication_date", "date", "created_at")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def load_publications(path: Path = PUBLICATION_FPATH) -> Iterator[dict]:
+    """Streams the dump's records (see `ingest.iter_records`) instead of loading the whole dump."""
+    return iter_records(path)
+
+
+def load_corpus_profiles(path: Path = CORPUS_PROFILES_PATH) -> Dict[str, dict]:
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("profiles", {})
+
+
+def save_corpus_profiles(profiles: Dict[str, dict], path: Path = CORPUS_PROFILES_PATH) -> str:
+    """Writes the profile store atomically so readers never see a partial file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "profiles": profiles}, f, indent=2, ensure_ascii=False)
+    tmp.replace(path)
+    return str(path)
+
+
+def precompute_profiles(
+    publications: Iterable[dict],
+    extract: Callable[[str, str], dict],
+    workers: int = 8,
+    path: Path = CORPUS_PROFILES_PATH,
+    force: bool = False,
+    normalizer: Optional[TextNormalizer] = None,
+) -> Dict[str, dict]:
+    """
+    Extracts profiles for all publications that are new or changed.
+
+    Args:
+        publications (iterable): Records with `id`, `title` and `publication_description`.
+        extract (callable): `(text, pub_id) -> profile dict`, e.g.
+            `PublicationExplorer.extract_profile` with `save=False`.
+        workers (int): Concurrent extraction threads (LLM calls are I/O bound).
+        path (Path): Profile store to update.
+        force (bool): Re-extract even when the content hash is unchanged
+            (profiles that failed validation are always re-extracted).
+        normalizer (TextNormalizer, optional): Strips boilerplate before
+            truncation; defaults to `TextNormalizer.from_env()`.
+
+    Returns:
+        dict: The full profile store, keyed by publication id.
+    """
+    store = load_corpus_profiles(path)
+    normalizer = normalizer or TextNormalizer.from_env()
+    pending = []
+    for pub in publications:
+        raw = pub.get("publication_description") or ""
+        text = normalizer.normalize(raw, pub["id"]).text[:PROFILE_TEXT_CHARS]
+        digest = content_hash(text)
+        existing = store.get(pub["id"])
+        # Entries whose extraction failed validation (no dict profile) are retried
+        unchanged = existing and existing.get("content_hash") == digest
+        if not force and unchanged and isinstance(existing.get("profile"), dict):
+            continue
+        # Only the truncated text and metadata are kept; the full record is dropped
+        date = next((pub[k] for k in DATE_KEYS if pub.get(k)), None)
+        pending.append((pub["id"], pub.get("title", ""), pub.get("username"), text, digest, date))
+
+    logger.info(f"📚 Corpus: {len(store)} cached profiles, {len(pending)} to extract with {workers} workers")
+    failures = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(extract, text, pub_id): (pub_id, title, username, digest, date)
+                   for pub_id, title, username, text, digest, date in pending}
+        for future in as_completed(futures):
+            pub_id, title, username, digest, date = futures[future]
+            try:
+                profile = future.result()
+            except Exception as e:
+                failures += 1
+                logger.error(f"❌ Profile extraction failed for {pub_id}: {e}")
+                continue
+            if not isinstance(profile, dict):
+                failures += 1
+                logger.warning(f"⚠️ Profile for {pub_id} failed validation; it is retried on the next run")
+            store[pub_id] = {
+                "title": title,
+                "username": username,
+                "date": date,
+                "content_hash": digest,
+                "profile": profile if isinstance(profile, dict) else None,
+            }
+
+    save_corpus_profiles(store, path)
+    logger.info(f"✅ Corpus profiles saved to {path} ({len(store)} total, {failures} failed)")
+    return store
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Precompute validated profiles for the whole corpus.")
+    parser.add_argument("--input", default=str(PUBLICATION_FPATH), help="Publications JSON dump.")
+    parser.add_argument("--output", default=str(CORPUS_PROFILES_PATH), help="Profile store to update.")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent extraction threads.")
+    parser.add_argument("--force", action="store_true", help="Re-extract unchanged publications.")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from explorer import PublicationExplorer
+
+    load_dotenv()
+    explorer = PublicationExplorer()
+    precompute_profiles(
+        load_publications(Path(args.input)),
+        lambda text, pub_id: explorer.extract_profile(text, pub_id, save=False),
+        workers=args.workers,
+        path=Path(args.output),
+        force=args.force,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+# enrichment.py
+
+"""
+Bounded, budgeted ReAct enrichment.
+
+`run_enrichment` wraps the ReAct agent used by `react_agent_tool` with
+iteration, wall-clock and token budgets. Independent tools (keyword
+extraction, retrieval, web search) are dispatched concurrently up front and
+their observations handed to the agent, which saves serial LLM round trips.
+Every LLM and tool step is timed, and when a budget runs out the best
+partial answer assembled so far is returned instead of an error.
+"""
+
+import time
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from logger import logger
+
+
+# Message AgentExecutor returns when its own iteration/time limit stops it
+STOPPED_MESSAGE = "Agent stopped due to iteration limit or time limit."
+MAX_OBSERVATION_CHARS = 600
+
+
+class BudgetExceeded(Exception):
+    """Raised from the callback handler to stop the agent once a budget is spent."""
+
+
+@dataclass
+class EnrichmentBudget:
+    max_iterations: int = 5
+    max_seconds: float = 20.0
+    max_tokens: int = 6000
+    prefetch_seconds: float = 8.0
+
+
+@dataclass
+class EnrichmentResult:
+    answer: str
+    complete: bool
+    stop_reason: Optional[str]
+    elapsed_ms: float
+    tokens: int
+    steps: List[Dict[str, Any]] = field(default_factory=list)
+
+
+# ==============================
+# Step Timing & Budget Enforcement
+# ==============================
+
+class BudgetTracker(BaseCallbackHandler):
+    """Times every LLM/tool step and stops the agent when a budget is exceeded."""
+
+    raise_error = True
+
+    def __init__(self, budget: EnrichmentBudget, started: float):
+        self.budget = budget
+        self.started = started
+        self.tokens = 0
+        self.iterations = 0
+        self.steps: List[Dict[str, Any]] = []
+        self.observations: List[str] = []
+        self.last_thought: Optional[str] = None
+        self._open: Dict[Any, tuple] = {}
+
+    def _check(self) -> None:
+        if time.perf_counter() - self.started > self.budget.max_seconds:
+            raise BudgetExceeded("max_seconds")
+        if self.tokens > self.budget.max_tokens:
+            raise BudgetExceeded("max_tokens")
+
+    def _close(self, run_id, **details) -> None:
+        kind, name, start = self._open.pop(run_id, ("?", "?", time.perf_counter()))
+        step = {"step": len(self.steps) + 1, "kind": kind, "name": name,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3), **details}
+        self.add_step(step)
+
+    def add_step(self, step: Dict[str, Any]) -> None:
+        # Bound under `agent_step` so log_analytics does not count it as a node run
+        self.steps.append(step)
+        logger.bind(agent_step=step).debug(
+            f"🧩 Agent {step['kind']} step {step['name']} took {step['duration_ms']:.0f} ms"
+        )
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._check()
+        self._open[run_id] = ("llm", (serialized or {}).get("name", "llm"), time.perf_counter())
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self.on_llm_start(serialized, [], run_id=run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        tokens = usage.get("total_tokens") or 0
+        self.tokens += tokens
+        self._close(run_id, tokens=tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, error=str(error))
+
+    def on_agent_action(self, action, *, run_id, **kwargs):
+        self.iterations += 1
+        self.last_thought = action.log
+        if self.iterations > self.budget.max_iterations:
+            raise BudgetExceeded("max_iterations")
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._check()
+        self._open[run_id] = ("tool", (serialized or {}).get("name", "tool"), time.perf_counter())
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self.observations.append(str(output)[:MAX_OBSERVATION_CHARS])
+        self._close(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, error=str(error))
+
+
+# ==============================
+# Concurrent Tool Prefetch
+# ==============================
+
+def _timed_call(fn: Callable[[str], Any], arg: str) -> tuple:
+    start = time.perf_counter()
+    result = fn(arg)
+    return result, round((time.perf_counter() - start) * 1000, 3)
+
+
+def prefetch_tools(
+    tools: Dict[str, Callable[[str], Any]],
+    inputs: Dict[str, str],
+    timeout_s: float,
+    tracker: Optional[BudgetTracker] = None,
+) -> Dict[str, str]:
+    """
+    Runs independent tools concurrently and returns their observations.
+
+    Tools that fail or miss the deadline are left out; the agent can still
+    call them itself. Timings are added to `tracker` when given.
+    """
+    selected = {name: fn for name, fn in tools.items() if name in inputs}
+    if not selected:
+        return {}
+    results: Dict[str, str] = {}
+    pool = ThreadPoolExecutor(max_workers=len(selected), thread_name_prefix="enrich")
+    futures = {pool.submit(_timed_call, fn, inputs[name]): name for name, fn in selected.items()}
+    done, _ = wait(futures, timeout=timeout_s)
+    for future in futures:
+        name = futures[future]
+        if future not in done:
+            logger.warning(f"⚠️ Prefetch of {name} exceeded {timeout_s:.0f} s")
+        elif future.exception() is not None:
+            logger.warning(f"⚠️ Prefetch of {name} failed: {future.exception()}")
+        else:
+            result, duration_ms = future.result()
+            results[name] = str(result)[:MAX_OBSERVATION_CHARS]
+            if tracker is not None:
+                tracker.add_step({"step": len(tracker.steps) + 1, "kind": "prefetch",
+                                  "name": name, "duration_ms": duration_ms})
+    pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def _partial_answer(reason: str, tracker: BudgetTracker, prefetched: Dict[str, str]) -> str:
+    lines = [f"Partial enrichment (stopped: {reason})."]
+    if tracker.last_thought:
+        lines.append(f"Last reasoning step:\n{tracker.last_thought.strip()}")
+    observations = [f"- {name}: {text}" for name, text in prefetched.items()]
+    observations += [f"- {text}" for text in tracker.observations]
+    if observations:
+        lines.append("Observations gathered:\n" + "\n".join(observations))
+    return "\n\n".join(lines)
+
+
+# ==============================
+# Entry Point
+# ==============================
+
+def run_enrichment(
+    agent,
+    query: str,
+    context: str,
+    tools: Dict[str, Callable[[str], Any]],
+    tool_inputs: Dict[str, str],
+    budget: EnrichmentBudget,
+) -> EnrichmentResult:
+    """
+    Runs the ReAct agent within `budget`.
+
+    Args:
+        agent: Object with `run(input, callbacks=...)`, e.g. an AgentExecutor.
+        query (str): Enrichment instruction.
+        context (str): Publication excerpts appended to the instruction.
+        tools (dict): Tool name → callable, shared with the agent.
+        tool_inputs (dict): Tool name → input for tools to prefetch concurrently.
+        budget (EnrichmentBudget): Iteration, time and token limits.
+
+    Returns:
+        EnrichmentResult: Final or best partial answer plus per-step timings.
+    """
+    started = time.perf_counter()
+    tracker = BudgetTracker(budget, started)
+    prefetched = prefetch_tools(tools, tool_inputs, min(budget.prefetch_seconds, budget.max_seconds), tracker)
+    prompt = f"{query}\n\n{context}"
+    if prefetched:
+        observed = "\n".join(f"- {name}: {text}" for name, text in prefetched.items())
+        prompt += f"\n\nPre-fetched tool observations (avoid repeating these calls):\n{observed}"
+
+    stop_reason = None
+    try:
+        answer = agent.run(prompt, callbacks=[tracker])
+        if answer == STOPPED_MESSAGE:
+            stop_reason = "agent_limit"
+    except BudgetExceeded as exc:
+        stop_reason = str(exc)
+    if stop_reason:
+        answer = _partial_answer(stop_reason, tracker, prefetched)
+
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+    logger.bind(stop_reason=stop_reason, tokens=tracker.tokens).info(
+        f"🤖 Enrichment {'stopped early' if stop_reason else 'completed'} after "
+        f"{len(tracker.steps)} steps, {tracker.tokens} tokens, {elapsed_ms:.0f} ms"
+    )
+    return EnrichmentResult(
+        answer=answer,
+        complete=stop_reason is None,
+        stop_reason=stop_reason,
+        elapsed_ms=elapsed_ms,
+        tokens=tracker.tokens,
+        steps=tracker.steps,
+    )
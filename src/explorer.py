@@ -1,4 +1,3 @@
-
 # explorer.py
 # explorer.py
 
@@ -7,23 +6,35 @@ Module for analyzing and comparing scientific publications using LLMs and LangGr
 """
 
 from pathlib import Path
-from typing import Optional, TypedDict
+from typing import List, Optional, TypedDict
 import os
+import re
 import sys
 import json
+import time
 import threading
 import functools
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
 
-from langchain_openai import ChatOpenAI
-from langchain.agents import initialize_agent, Tool
-from langchain.agents.agent_types import AgentType
-from langgraph.graph import StateGraph, END
 from langchain_core.messages import SystemMessage
-from langchain_community.tools.tavily_search.tool import TavilySearchResults
 
-from guardrails import Guard
 from paths import SRC_DIR
+from cassette import Cassette
+from search import CachedWebSearch
+from enrichment import EnrichmentBudget, run_enrichment
+from trends import get_trend_engine
+from similarity import get_similarity_index
+from normalize import TextNormalizer
+from prompt_budget import PromptBudgeter
+from profile_diff import DIFF_FIELDS, diff_profiles
+from entity_extractor import EntityExtractor, get_entity_extractor
+from profile_store import PROFILE_FIELDS, ProfileStore, extraction_fields_for_query
+from grounding import profile_claims, summary_claims, verify_claims
+from model_tiers import FAST, STRONG, ModelRouter, TierMetrics
+from latency import HedgeBudget, get_latency_tracker, hedged_call
+from run_profiler import active_profiler
+from run_history import NodeLedger
 
 from logger import logger  # ✅ Logging enabled
 
@@ -39,26 +50,31 @@ class TimeoutException(Exception):
 def timeout(seconds: int = 10):
     """
     Cross-platform timeout decorator.
-    Uses `signal` on Unix (Linux/macOS) and `threading.Timer` on Windows.
+    Uses `signal` in the main thread on Unix (Linux/macOS). On Windows and in
+    other threads (Streamlit script runners, concurrent load-test sessions),
+    where `signal` is unavailable, the call runs in a daemon thread that is
+    abandoned once the deadline passes.
     """
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            if sys.platform == "win32":  # ✅ Windows fallback
-                result = [TimeoutException("Function timed out")]
-
-                def _raise_timeout():
+            if sys.platform == "win32" or threading.current_thread() is not threading.main_thread():
+                outcome = {}
+
+                def _run():
+                    try:
+                        outcome["value"] = func(*args, **kwargs)
+                    except BaseException as exc:
+                        outcome["error"] = exc
+
+                worker = threading.Thread(target=_run, daemon=True, name=f"timeout-{func.__name__}")
+                worker.start()
+                worker.join(seconds)
+                if worker.is_alive():
                     raise TimeoutException("Function timed out")
-
-                timer = threading.Timer(seconds, _raise_timeout)
-                timer.start()
-                try:
-                    result = [func(*args, **kwargs)]
-                finally:
-                    timer.cancel()
-                if isinstance(result[0], Exception):
-                    raise result[0]
-                return result[0]
+                if "error" in outcome:
+                    raise outcome["error"]
+                return outcome["value"]
             else:
                 import signal
 
@@ -75,20 +91,103 @@ def timeout(seconds: int = 10):
     return decorator
 
 
+def adaptive_timeout(node: str, default_s: int):
+    """
+    `timeout` whose limit is derived from the explorer's observed latency of
+    `node` (see `latency.LatencyTracker.node_timeout`), `default_s` until then.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, state, *args, **kwargs):
+            tracker = getattr(self, "latency", None)
+            seconds = tracker.node_timeout(node, default_s) if tracker else default_s
+            return timeout(seconds)(func)(self, state, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ==============================
+# Node Tracing
+# ==============================
+
+def traced_node(node: str):
+    """
+    Decorator that logs a structured start/finish record for a graph node.
+
+    Each record carries `run_id`, `node`, `status` and `duration_ms` in its
+    `extra` payload so `log_analytics.py` can rebuild per-run timelines from
+    `logs/pipeline.log`. Apply it above `@adaptive_timeout` so timeouts are recorded; successful
+    durations also feed the explorer's latency tracker (fast-mode runs under their own key, so they
+    don't skew the timeouts of LLM-backed runs), and every outcome (with the node's
+    LLM tokens) goes to the explorer's `node_ledger` for the run history. When the run is being
+    profiled (`run_profiler.RunProfiler`), allocation snapshots are taken around the node.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, state, *args, **kwargs):
+            node_logger = logger.bind(run_id=state.get("run_id") or "-", node=node)
+            node_logger.debug(f"▶️ {node} started")
+            profiler = active_profiler(state.get("run_id"))
+            if profiler is not None:
+                try:
+                    profiler.node_started(node)
+                except Exception as e:  # profiling must never fail a run
+                    node_logger.warning(f"⚠️ Profiler failed at {node} start: {e}")
+                    profiler = None
+            metrics = getattr(self, "tier_metrics", None)
+            tokens_before = metrics.node_tokens(node) if metrics is not None else (0, 0)
+            start = time.perf_counter()
+            status = "ok"
+            try:
+                return func(self, state, *args, **kwargs)
+            except TimeoutException:
+                status = "timeout"
+                raise
+            except Exception:
+                status = "error"
+                raise
+            finally:
+                duration_ms = round((time.perf_counter() - start) * 1000, 3)
+                if profiler is not None:
+                    try:
+                        profiler.node_finished(node, status)
+                    except Exception as e:
+                        node_logger.warning(f"⚠️ Profiler failed at {node} finish: {e}")
+                if status == "ok" and getattr(self, "latency", None) is not None:
+                    self.latency.record(f"{node}:fast" if state.get("fast") else node, duration_ms)
+                if getattr(self, "node_ledger", None) is not None and state.get("run_id"):
+                    tokens = metrics.node_tokens(node) if metrics is not None else (0, 0)
+                    self.node_ledger.record(
+                        state["run_id"], node, status, duration_ms,
+                        tokens[0] - tokens_before[0], tokens[1] - tokens_before[1],
+                    )
+                log = node_logger.bind(status=status, duration_ms=duration_ms)
+                if status == "ok":
+                    log.info(f"⏱️ {node} finished in {duration_ms:.0f} ms")
+                else:
+                    log.error(f"❌ {node} failed ({status}) after {duration_ms:.0f} ms")
+        return wrapper
+    return decorator
+
+
 # ==============================
 # Directory Setup
 # ==============================
 
+# Created when first written to, so importing this module has no filesystem side effects
 PROFILES_DIR = Path("outputs/profiles")
-PROFILES_DIR.mkdir(parents=True, exist_ok=True)
 COMPARISONS_DIR = Path("outputs/comparisons")
-COMPARISONS_DIR.mkdir(parents=True, exist_ok=True)
-
 LOGS_DIR = Path("logs")
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
 
-MAX_CHARS = 12000
+MODEL_NAME = "gpt-3.5-turbo"
+# Cheap pre-compression cap; node prompts are then fitted to token budgets (see prompt_budget.py)
+PROFILE_MAX_CHARS = 2000
+EXTRACTION_WORKERS = 8
+ANALYZE_TIMEOUT_S = 60
+# Extractions stop this long before the analyze_pubs timeout, so dictionary fallbacks can still be returned.
+# The timeout never adapts below ANALYZE_TIMEOUT_S, so extractions always get at least 50 s.
+EXTRACTION_DEADLINE_MARGIN_S = 10
 
 
 # ==============================
@@ -96,20 +195,100 @@ MAX_CHARS = 12000
 # ==============================
 
 class AgentState(TypedDict):
+    run_id: Optional[str]
+    pub_paths: Optional[List[str]]
     pub1_path: str
     pub2_path: str
     user_query: str
+    fast: Optional[bool]
+    profiles: Optional[list]
+    profile_sources: Optional[List[str]]
+    profile_fields: Optional[List[str]]
     pub1_profile: Optional[str]
     pub2_profile: Optional[str]
+    profile_diff: Optional[dict]
     comparison: Optional[str]
     trends: Optional[str]
     summary: Optional[str]
     fact_check: Optional[str]
+    grounding: Optional[List[dict]]
     extra_info: Optional[str]
+    enrichment_trace: Optional[dict]
     lnode: Optional[str]
     count: int
 
 
+def publication_paths(state: AgentState) -> List[str]:
+    """Publications of a run: `pub_paths`, or the legacy `pub1_path`/`pub2_path` pair."""
+    paths = state.get("pub_paths") or [state.get("pub1_path"), state.get("pub2_path")]
+    return [p for p in paths if p]
+
+
+def publication_profiles(state: AgentState) -> list:
+    """Extracted profiles of a run, in the same order as `publication_paths`."""
+    if state.get("profiles"):
+        return list(state["profiles"])
+    return [p for p in (state.get("pub1_profile"), state.get("pub2_profile")) if p]
+
+
+# ==============================
+# Profile Compression
+# ==============================
+
+def compress_profile(profile, max_chars: int) -> str:
+    """
+    Renders a profile as compact `field: a; b` lines that fit in `max_chars`.
+
+    Duplicate entries are dropped and, when the profile is still too long,
+    every field is truncated to an equal share of the budget so no field is
+    lost entirely.
+    """
+    if not isinstance(profile, dict):
+        return str(profile or "")[:max_chars]
+    lines = []
+    for field in list(PROFILE_FIELDS) + [k for k in profile if k not in PROFILE_FIELDS]:
+        values = profile.get(field)
+        if not values:
+            continue
+        values = values if isinstance(values, list) else [values]
+        unique = dict.fromkeys(str(v).strip() for v in values if str(v).strip())
+        if unique:
+            lines.append(f"{field}: {'; '.join(unique)}")
+    text = "\n".join(lines)
+    if len(text) <= max_chars:
+        return text
+    per_line = max(max_chars // len(lines) - 1, 16)
+    return "\n".join(l if len(l) <= per_line else l[:per_line - 1] + "…" for l in lines)[:max_chars]
+
+
+def profile_blocks(names: List[str], profiles: list) -> List[str]:
+    """One numbered, compressed block per publication profile."""
+    return [
+        f"Publication {i} ({name}):\n{compress_profile(profile, PROFILE_MAX_CHARS)}"
+        for i, (name, profile) in enumerate(zip(names, profiles), start=1)
+    ]
+
+
+def _pad_fields(raw: str, fields) -> str:
+    """
+    Completes a partial JSON answer with empty lists for the fields that were
+    not requested, so it validates against the full rail schema.
+    """
+    match = re.search(r"\{.*\}", raw or "", re.DOTALL)
+    try:
+        answer = json.loads(match.group(0)) if match else None
+    except ValueError:
+        return raw
+    if not isinstance(answer, dict):
+        return raw
+    return json.dumps({f: answer.get(f, []) if f in fields else [] for f in PROFILE_FIELDS})
+
+
+def _names(paths: List[str], count: int) -> List[str]:
+    names = [Path(p).stem for p in paths[:count]]
+    return names + [f"Publication {i}" for i in range(len(names) + 1, count + 1)]
+
+
 # ==============================
 # Save Profile
 # ==============================
@@ -118,6 +297,7 @@ def save_validated_profile(profile: dict, name: str) -> str:
     """Save a validated Guardrails profile to JSON."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     file_path = PROFILES_DIR / f"validated_profile_{name}_{timestamp}.json"
+    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
     with open(file_path, "w", encoding="utf-8") as f:
         json.dump(profile, f, indent=2)
     logger.info(f"✅ Saved validated profile to {file_path}")
@@ -125,12 +305,19 @@ def save_validated_profile(profile: dict, name: str) -> str:
 
 
 # ==============================
-# Dummy Tools
+# Agent Tools
 # ==============================
 
 class KeywordTagExtractor:
+    """Keyword tagger for the ReAct agent, backed by the entity gazetteer."""
+
+    def __init__(self, extractor: Optional[EntityExtractor] = None):
+        self.extractor = extractor or get_entity_extractor()
+
     def run(self, text: str) -> str:
-        return "Keywords: NLP, HuggingFace, Evaluation Metrics"
+        hits = self.extractor.extract(text)
+        names = [name for counter in hits.values() for name, _ in counter.most_common(5)]
+        return "Keywords: " + (", ".join(names) if names else "none found")
 
 
 class RAGRetriever:
@@ -143,70 +330,154 @@ class RAGRetriever:
 # ==============================
 
 class PublicationExplorer:
-    """Main orchestration class for analyzing and comparing two scientific publications."""
-
-    def __init__(self):
-        self.model = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
-
-        rail_path = SRC_DIR / "rails" / "profile_extraction.rail"
-        self.guard = Guard.from_rail(str(rail_path))
-
-        # Prompts (unchanged)
+    """Main orchestration class for analyzing and comparing two or more scientific publications."""
+
+    def __init__(self, cassette: Optional[Cassette] = None, lazy: Optional[bool] = None):
+        """
+        Args:
+            cassette (Cassette, optional): Records LLM, Guardrails and agent
+                responses ("record" mode) or serves them offline ("replay" mode).
+            lazy (bool, optional): Extract only the profile fields the query
+                needs; defaults to `LAZY_EXTRACTION` (1/0, on by default).
+        """
+        self.cassette = cassette
+        self.router = ModelRouter.from_env(MODEL_NAME)
+        self.tier_metrics = TierMetrics(self.router.models)
+        self.budgeter = PromptBudgeter(self.router.models[STRONG])
+        self.latency = get_latency_tracker()
+        self.hedge_budget = HedgeBudget()
+        self.node_ledger = NodeLedger()
+        # Replays answer instantly and must not record duplicate calls
+        self.hedging = cassette is None and os.getenv("HEDGE_REQUESTS", "1").strip().lower() not in ("0", "false", "no")
+
+        # Prompts
         self.PROFILE_PROMPT = (
             "You are an expert scientific reviewer.\n\n"
             "Extract the following attributes from the publication and return them in valid JSON:\n"
-            "- `tools`\n- `evaluation_methods`\n- `datasets`\n- `task_types`\n- `results`\n\n"
+            "{fields}\n\n"
+            "Entities found by a dictionary scan (hints with mention counts; keep only those the "
+            "publication actually uses and add any that are missing):\n{hints}\n\n"
             "Publication:\n{text}"
         )
         self.COMPARE_PROMPT = (
-            "Compare the two research publications based on:\n"
+            "Compare the {n} research publications based on:\n"
             "- Tool usage\n- Evaluation methods\n- Task types\n- Datasets\n- Results\n\n"
             "Query: '{query}'\n\n"
-            "Publication 1 Attributes:\n{pub1_profile}\n\n"
-            "Publication 2 Attributes:\n{pub2_profile}"
+            "Structural diff of the extracted attributes (entity names alias-normalized):\n{diff}"
         )
         self.TREND_PROMPT = (
-            "Analyze trends related to query: '{query}'.\n\n"
-            "**Publication 1:**\n{pub1_profile}\n\n"
-            "**Publication 2:**\n{pub2_profile}"
+            "Analyze trends related to query: '{query}' across {n} publications.\n\n"
+            "{profiles}\n\n"
+            "**Corpus statistics** (ground trend claims in these counts):\n{corpus_stats}"
         )
         self.SUMMARY_PROMPT = (
             "Summarize the findings below.\n\n"
             "**Comparison:**\n{comparison}\n\n**Trends:**\n{trends}"
         )
         self.FACTCHECK_PROMPT = (
-            "Fact-check the summary and trends against the publications.\n\n"
-            "Comparison:\n{comparison}\n\nTrends:\n{trends}\n\nSummary:\n{summary}\n\n"
-            "Publication 1:\n{pub1_text}\n\nPublication 2:\n{pub2_text}"
+            "Fact-check the claims below against the quoted evidence from the publications. "
+            "A lexical search found only weak support for them. For each claim answer SUPPORTED, "
+            "CONTRADICTED or NOT FOUND with a one-line reason.\n\n{claims}"
         )
 
-        self.react_agent = initialize_agent(
+        self.normalizer = TextNormalizer.from_env()
+        self.entity_extractor = get_entity_extractor()
+        if lazy is None:
+            lazy = os.getenv("LAZY_EXTRACTION", "1").strip().lower() not in ("0", "false", "no")
+        self.lazy = lazy
+        self.profile_store = ProfileStore.from_env(self.router.models[STRONG])
+        self.web_search = CachedWebSearch.from_env()
+        self.tools = {
+            "KeywordTagExtractor": KeywordTagExtractor(self.entity_extractor).run,
+            "RAGRetriever": RAGRetriever().run,
+            "WebSearch": self.web_search.run,
+        }
+        if cassette is not None:
+            self.tools = {name: cassette.wrap_tool(name, tool) for name, tool in self.tools.items()}
+
+        self.enrichment_budget = EnrichmentBudget()
+        # The chat models, Guardrails guard, ReAct agent and graph are built on first use (see the
+        # properties below), so importing and constructing the explorer stays cheap and runs that
+        # never reach a component (fast mode, extraction-only jobs) never import its dependencies.
+
+    @property
+    def replay(self) -> bool:
+        return self.cassette is not None and self.cassette.mode == "replay"
+
+    def _chat_model(self, name: str):
+        if self.replay:
+            return self.cassette.wrap_model()
+        from langchain_openai import ChatOpenAI
+
+        model = ChatOpenAI(model=name, temperature=0)
+        return self.cassette.wrap_model(model) if self.cassette is not None else model
+
+    @functools.cached_property
+    def model(self):
+        """Strong-tier chat model."""
+        return self._chat_model(self.router.models[STRONG])
+
+    @functools.cached_property
+    def fast_model(self):
+        """Fast-tier chat model; None unless routing or a node override can use it."""
+        uses_fast = self.router.routing or any(s.tier == FAST for s in self.router.node_settings.values())
+        if not uses_fast or self.router.models[FAST] == self.router.models[STRONG]:
+            return None
+        return self._chat_model(self.router.models[FAST])
+
+    @functools.cached_property
+    def guard(self):
+        if self.replay:
+            return self.cassette.wrap_guard(None)
+        from guardrails import Guard
+
+        guard = Guard.from_rail(str(SRC_DIR / "rails" / "profile_extraction.rail"))
+        return self.cassette.wrap_guard(guard) if self.cassette is not None else guard
+
+    @functools.cached_property
+    def react_agent(self):
+        if self.replay:
+            return self.cassette.wrap_agent()
+        from langchain.agents import initialize_agent, Tool
+        from langchain.agents.agent_types import AgentType
+        from langchain_openai import ChatOpenAI
+
+        tier = self.router.settings("react_agent_tool").tier
+        tier = FAST if tier == FAST and self.fast_model is not None else STRONG
+        agent = initialize_agent(
             tools=[
-                Tool("KeywordTagExtractor", KeywordTagExtractor().run, "Extract keywords."),
-                Tool("RAGRetriever", RAGRetriever().run, "Retrieve factual info."),
-                Tool("WebSearch", TavilySearchResults().run, "Search web content.")
+                Tool("KeywordTagExtractor", self.tools["KeywordTagExtractor"], "Extract keywords."),
+                Tool("RAGRetriever", self.tools["RAGRetriever"], "Retrieve factual info."),
+                Tool("WebSearch", self.tools["WebSearch"], "Search web content.")
             ],
-            llm=self.model,
+            # Its own unwrapped model: the agent is recorded as a whole, not call by call
+            llm=ChatOpenAI(model=self.router.models[tier], **self.router.invoke_kwargs("react_agent_tool")),
             agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
             verbose=False,
-            handle_parsing_errors=True
+            handle_parsing_errors=True,
+            max_iterations=self.enrichment_budget.max_iterations,
+            max_execution_time=self.enrichment_budget.max_seconds,
+            early_stopping_method="force"
         )
+        return self.cassette.wrap_agent(agent) if self.cassette is not None else agent
 
-        self.graph = self._build_graph()
+    @functools.cached_property
+    def graph(self):
+        return self._build_graph()
 
     def _build_graph(self):
+        from langgraph.graph import StateGraph, END
+
         builder = StateGraph(AgentState)
-        builder.add_node("analyze_pub1", self.analyze_pub1)
-        builder.add_node("analyze_pub2", self.analyze_pub2)
+        builder.add_node("analyze_pubs", self.analyze_pubs)
         builder.add_node("compare", self.compare)
         builder.add_node("aggregate_trends", self.aggregate_trends)
         builder.add_node("summarize", self.summarize)
         builder.add_node("fact_check_node", self.fact_check)
         builder.add_node("react_agent_tool", self.react_agent_tool)
 
-        builder.set_entry_point("analyze_pub1")
-        builder.add_edge("analyze_pub1", "analyze_pub2")
-        builder.add_edge("analyze_pub2", "compare")
+        builder.set_entry_point("analyze_pubs")
+        builder.add_edge("analyze_pubs", "compare")
         builder.add_edge("compare", "aggregate_trends")
         builder.add_edge("aggregate_trends", "summarize")
         builder.add_edge("summarize", "fact_check_node")
@@ -215,85 +486,282 @@ class PublicationExplorer:
 
         return builder.compile()
 
+    def find_similar(self, publication, k: int = 5) -> list:
+        """
+        Top-k corpus publications most similar to an indexed publication id
+        or to an ad-hoc profile dict. Returns [] until `src/corpus.py` has run.
+        """
+        index = get_similarity_index()
+        if index is None:
+            return []
+        if isinstance(publication, dict):
+            return index.query(publication, k)
+        return index.similar_to(publication, k)
+
     def read_txt(self, path: str) -> str:
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read()[:MAX_CHARS]
+        """Boilerplate-free publication text, normalized once per content hash."""
+        return self.normalizer.read(path).text
 
-    def validate_profile(self, raw: str, pub_name: str) -> dict:
-        result = self.guard.parse(llm_output=raw)
+    def validate_profile(self, raw: str, pub_name: str, save: bool = True, fields=PROFILE_FIELDS) -> dict:
+        """Validates an answer against the rail; partial answers are checked for the requested `fields` only."""
+        partial = tuple(fields) != PROFILE_FIELDS
+        result = self.guard.parse(llm_output=_pad_fields(raw, fields) if partial else raw)
         validated = result.validated_output or raw
+        if partial and isinstance(validated, dict):
+            validated = {f: validated.get(f, []) for f in fields}
         logger.info(f"[{pub_name.upper()}] Raw: {raw}")
         logger.info(f"[{pub_name.upper()}] Validated: {validated}")
-        if isinstance(validated, dict):
+        if save and isinstance(validated, dict):
             save_validated_profile(validated, pub_name)
         return validated
 
+    def extract_profile(self, text: str, pub_name: str, save: bool = True, fields=PROFILE_FIELDS) -> dict:
+        """Runs the profile prompt for `fields` on `text` and validates the answer with Guardrails."""
+        hits = self.entity_extractor.extract(text)
+        hints = EntityExtractor.to_hints({f: hits[f] for f in fields if f in hits})
+        template = (
+            self.PROFILE_PROMPT
+            .replace("{fields}", "\n".join(f"- `{f}`" for f in fields))
+            .replace("{hints}", hints)
+        )
+        text = self.budgeter.truncate(text, self.budgeter.available("analyze_pubs", template.replace("{text}", "")))
+        prompt = template.replace("{text}", text)
+        response, tier = self._invoke_tier("analyze_pubs", prompt)
+        validated = self.validate_profile(response.content, pub_name, save=save, fields=fields)
+        if tier != STRONG and not isinstance(validated, dict):
+            logger.warning(f"↪️ [{pub_name.upper()}] {tier} tier answer failed validation; retrying on the strong tier")
+            self.tier_metrics.record_fallback("analyze_pubs")
+            response, _ = self._invoke_tier("analyze_pubs", prompt, STRONG)
+            validated = self.validate_profile(response.content, pub_name, save=save, fields=fields)
+        return validated
+
+    def profile_fields(self, query: str) -> tuple:
+        """Profile fields extracted for `query`: all of them unless extraction is lazy."""
+        return extraction_fields_for_query(query) if self.lazy else PROFILE_FIELDS
+
+    def ensure_profile(self, path: str, pub_name: str, fields=PROFILE_FIELDS, save: bool = True):
+        """
+        Profile of the publication at `path` restricted to `fields`. Fields
+        stored by earlier runs are merged in; only missing ones are extracted.
+        """
+        text = self.read_txt(path)
+        cached, missing = self.profile_store.missing(text, fields)
+        if missing:
+            extracted = self.extract_profile(text, pub_name, save=save, fields=missing)
+            if not isinstance(extracted, dict):
+                return extracted  # unvalidated answers are passed on but never stored
+            cached = self.profile_store.merge(text, extracted)
+        logger.info(f"🧩 [{pub_name.upper()}] {len(fields) - len(missing)} cached / {len(missing)} extracted fields")
+        return {f: cached.get(f, []) for f in fields}
+
     # ==============================
     # NODES with Timeout Protection
     # ==============================
 
-    @timeout(30)
-    def analyze_pub1(self, state: AgentState) -> AgentState:
-        text = self.read_txt(state["pub1_path"])
-        raw = self.model.invoke([SystemMessage(content=self.PROFILE_PROMPT.replace("{text}", text))]).content
-        validated = self.validate_profile(raw, "pub1")
-        return {**state, "pub1_profile": validated, "lnode": "analyze_pub1", "count": state["count"] + 1}
-
-    @timeout(30)
-    def analyze_pub2(self, state: AgentState) -> AgentState:
-        text = self.read_txt(state["pub2_path"])
-        raw = self.model.invoke([SystemMessage(content=self.PROFILE_PROMPT.replace("{text}", text))]).content
-        validated = self.validate_profile(raw, "pub2")
-        return {**state, "pub2_profile": validated, "lnode": "analyze_pub2", "count": state["count"] + 1}
-
-    @timeout(30)
+    def _model_for(self, tier: str):
+        return self.fast_model if tier == FAST and self.fast_model is not None else self.model
+
+    def _invoke_tier(self, node: str, prompt: str, tier: Optional[str] = None):
+        """
+        Sends a single-message prompt on the routed (or given) tier after
+        checking it fits the model context. Errors on the fast tier are retried
+        on the strong tier. Returns the response and the tier that answered.
+        """
+        tokens = self.budgeter.check(prompt, node)
+        tier = tier or self.router.route(node, tokens)
+        if self._model_for(tier) is self.model:
+            tier = STRONG
+        model, kwargs = self._model_for(tier), self.router.invoke_kwargs(node)
+        delay = self.latency.hedge_delay(node) if self.hedging else None
+        start = time.perf_counter()
+        try:
+            response = hedged_call(
+                lambda: model.invoke([SystemMessage(content=prompt)], **kwargs), delay, self.hedge_budget
+            )
+        except Exception as e:
+            if tier == STRONG:
+                raise
+            logger.warning(f"↪️ {node}: {tier} tier failed ({type(e).__name__}); retrying on the strong tier")
+            self.tier_metrics.record_fallback(node)
+            return self._invoke_tier(node, prompt, STRONG)
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.latency.record(f"{node}:llm", latency_ms)
+        self.tier_metrics.record(node, tier, latency_ms, tokens, self.budgeter.count(str(response.content)))
+        return response, tier
+
+    def _invoke(self, node: str, prompt: str):
+        return self._invoke_tier(node, prompt)[0]
+
+    def _profile_blocks(self, state: AgentState) -> List[str]:
+        profiles = publication_profiles(state)
+        return profile_blocks(_names(publication_paths(state), len(profiles)), profiles)
+
+    def _claim_blocks(self, checks) -> List[str]:
+        blocks = []
+        for i, check in enumerate(checks, start=1):
+            lines = [f"{i}. [{check.source}] {check.claim} (lexical support {check.score:.2f})"]
+            lines += [f"   Evidence {e['publication']} [{e['start']}:{e['end']}]: \"{e['text']}\"" for e in check.evidence]
+            if not check.evidence:
+                lines.append("   Evidence: none found")
+            blocks.append("\n".join(lines))
+        return blocks
+
+    def _excerpt_blocks(self, state: AgentState) -> List[str]:
+        return [
+            f"Publication {i} ({Path(path).stem}):\n{self.read_txt(path)}"
+            for i, path in enumerate(publication_paths(state), start=1)
+        ]
+
+    @traced_node("analyze_pubs")
+    @adaptive_timeout("analyze_pubs", ANALYZE_TIMEOUT_S)
+    def analyze_pubs(self, state: AgentState) -> AgentState:
+        """
+        Extracts the profile fields the query needs for every publication
+        concurrently (one LLM call each, none when all fields are cached).
+        Extractions that fail or miss the deadline, and all of them in fast
+        runs, fall back to a dictionary profile from the entity gazetteer.
+        """
+        paths = publication_paths(state)
+        fields = self.profile_fields(state["user_query"])
+        profiles, sources = [None] * len(paths), ["gazetteer"] * len(paths)
+
+        if not state.get("fast"):
+            def extract(i: int) -> dict:
+                return self.ensure_profile(paths[i], f"pub{i + 1}", fields)
+
+            pool = ThreadPoolExecutor(max_workers=max(1, min(len(paths), EXTRACTION_WORKERS)))
+            try:
+                futures = [pool.submit(extract, i) for i in range(len(paths))]
+                deadline = self.latency.node_timeout("analyze_pubs", ANALYZE_TIMEOUT_S) - EXTRACTION_DEADLINE_MARGIN_S
+                done, _ = wait(futures, timeout=deadline)
+            finally:
+                # Don't block on extractions that are still running
+                pool.shutdown(wait=False, cancel_futures=True)
+            for i, future in enumerate(futures):
+                if future in done and future.exception() is None:
+                    profiles[i], sources[i] = future.result(), "llm"
+                else:
+                    reason = "timed out" if future not in done else f"failed ({future.exception()})"
+                    logger.warning(f"⏳ Profile extraction for pub{i + 1} {reason}; using dictionary profile")
+
+        for i, path in enumerate(paths):
+            if profiles[i] is None:
+                fallback = self.entity_extractor.fallback_profile(self.read_txt(path))
+                profiles[i] = {f: fallback[f] for f in fields}
+        return {
+            **state,
+            "pub_paths": paths,
+            "profiles": profiles,
+            "profile_sources": sources,
+            "profile_fields": list(fields),
+            "pub1_profile": profiles[0] if profiles else None,
+            "pub2_profile": profiles[1] if len(profiles) > 1 else None,
+            "lnode": "analyze_pubs",
+            "count": state["count"] + 1,
+        }
+
+    @traced_node("compare")
+    @adaptive_timeout("compare", 30)
     def compare(self, state: AgentState) -> AgentState:
-        prompt = self.COMPARE_PROMPT.format(
-            query=state["user_query"],
-            pub1_profile=state["pub1_profile"],
-            pub2_profile=state["pub2_profile"]
-        )
-        response = self.model.invoke([SystemMessage(content=prompt)])
-        return {**state, "comparison": response.content, "lnode": "compare", "count": state["count"] + 1}
-
-    @timeout(30)
+        profiles = publication_profiles(state)
+        diff_fields = [f for f in DIFF_FIELDS if f in (state.get("profile_fields") or DIFF_FIELDS)]
+        diff = diff_profiles(_names(publication_paths(state), len(profiles)), profiles, diff_fields)
+        if state.get("fast"):
+            # Fast runs report the deterministic diff without an LLM round trip
+            comparison = f"Query: '{state['user_query']}'\n\n{diff.to_text()}"
+        else:
+            prompt_args = {"query": state["user_query"], "n": len(profiles)}
+            budget = self.budgeter.available("compare", self.COMPARE_PROMPT.format(diff="", **prompt_args))
+            text = self.budgeter.truncate(diff.to_text(), budget)
+            comparison = self._invoke("compare", self.COMPARE_PROMPT.format(diff=text, **prompt_args)).content
+        return {**state, "profile_diff": diff.to_dict(), "comparison": comparison,
+                "lnode": "compare", "count": state["count"] + 1}
+
+    @traced_node("aggregate_trends")
+    @adaptive_timeout("aggregate_trends", 30)
     def aggregate_trends(self, state: AgentState) -> AgentState:
-        prompt = self.TREND_PROMPT.format(
-            query=state["user_query"],
-            pub1_profile=state["pub1_profile"],
-            pub2_profile=state["pub2_profile"]
-        )
-        response = self.model.invoke([SystemMessage(content=prompt)])
+        engine = get_trend_engine()
+        if engine is not None:
+            corpus_stats = engine.to_prompt(state["user_query"], publication_profiles(state))
+        else:
+            corpus_stats = "Not available (run `python src/corpus.py` to precompute corpus profiles)."
+        blocks = self._profile_blocks(state)
+        fields = {"query": state["user_query"], "n": len(blocks), "corpus_stats": corpus_stats}
+        budget = self.budgeter.available("aggregate_trends", self.TREND_PROMPT.format(profiles="", **fields))
+        profiles = "\n\n".join(self.budgeter.fit(blocks, budget))
+        response = self._invoke("aggregate_trends", self.TREND_PROMPT.format(profiles=profiles, **fields))
         return {**state, "trends": response.content, "lnode": "aggregate_trends", "count": state["count"] + 1}
 
-    @timeout(30)
+    @traced_node("summarize")
+    @adaptive_timeout("summarize", 30)
     def summarize(self, state: AgentState) -> AgentState:
-        prompt = self.SUMMARY_PROMPT.format(
-            comparison=state["comparison"],
-            trends=state["trends"]
-        )
-        response = self.model.invoke([SystemMessage(content=prompt)])
+        budget = self.budgeter.available("summarize", self.SUMMARY_PROMPT.format(comparison="", trends=""))
+        comparison, trends = self.budgeter.fit([state["comparison"], state["trends"]], budget)
+        prompt = self.SUMMARY_PROMPT.format(comparison=comparison, trends=trends)
+        response = self._invoke("summarize", prompt)
         return {**state, "summary": response.content, "lnode": "summarize", "count": state["count"] + 1}
 
-    @timeout(30)
+    @traced_node("fact_check_node")
+    @adaptive_timeout("fact_check_node", 30)
     def fact_check(self, state: AgentState) -> AgentState:
-        pub1 = self.read_txt(state["pub1_path"])
-        pub2 = self.read_txt(state["pub2_path"])
-        prompt = self.FACTCHECK_PROMPT.format(
-            comparison=state["comparison"],
-            trends=state["trends"],
-            summary=state["summary"],
-            pub1_text=pub1,
-            pub2_text=pub2
-        )
-        response = self.model.invoke([SystemMessage(content=prompt)])
-        return {**state, "fact_check": response.content, "lnode": "fact_check", "count": state["count"] + 1}
-
-    @timeout(30)
+        """
+        Grounds the extracted entities and summary sentences in the publications
+        with a lexical n-gram index; only weakly supported claims are sent to
+        the LLM, together with their evidence spans.
+        """
+        paths = publication_paths(state)
+        names = _names(paths, len(paths))
+        documents = {name: self.read_txt(path) for name, path in zip(names, paths)}
+        profiles = publication_profiles(state)
+        claims = profile_claims(names, profiles, state.get("profile_fields") or PROFILE_FIELDS[:-1])
+        checks = verify_claims(claims + summary_claims(state.get("summary", "")), documents)
+        weak = [c for c in checks if not c.supported]
+        report = f"Lexically grounded: {len(checks) - len(weak)}/{len(checks)} claims."
+        logger.info(f"🧷 {report} Escalating {len(weak)} to the LLM")
+
+        if weak:
+            # Whole claims, weakest first, as many as the node budget holds
+            weak.sort(key=lambda c: c.score)
+            budget = self.budgeter.available("fact_check_node", self.FACTCHECK_PROMPT.format(claims=""))
+            blocks = []
+            for block in self._claim_blocks(weak):
+                budget -= self.budgeter.count(block + "\n\n")
+                if budget < 0:
+                    break
+                blocks.append(block)
+            if len(blocks) < len(weak):
+                logger.warning(f"⚠️ Fact check budget holds {len(blocks)} of {len(weak)} weak claims")
+            response = self._invoke("fact_check_node", self.FACTCHECK_PROMPT.format(claims="\n\n".join(blocks)))
+            report = f"{report}\n\n{response.content}"
+        return {**state, "fact_check": report, "grounding": [c.to_dict() for c in checks],
+                "lnode": "fact_check", "count": state["count"] + 1}
+
+    @traced_node("react_agent_tool")
+    @adaptive_timeout("react_agent_tool", 30)
     def react_agent_tool(self, state: AgentState) -> AgentState:
-        pub1 = self.read_txt(state["pub1_path"])
-        pub2 = self.read_txt(state["pub2_path"])
         query = f"Enrich or validate missing insights for query: {state['user_query']}"
-        context = f"Publication 1:\n{pub1[:3000]}\n\nPublication 2:\n{pub2[:3000]}"
-        response = self.react_agent.run(f"{query}\n\n{context}")
-        return {**state, "extra_info": response, "lnode": "react_agent_tool", "count": state["count"] + 1}
+        context = "\n\n".join(self.budgeter.fit(self._excerpt_blocks(state), self.budgeter.budget("react_agent_tool")))
+        titles = " vs ".join(Path(p).stem for p in publication_paths(state))
+        self.web_search.start_run()
+        result = run_enrichment(
+            self.react_agent,
+            query,
+            context,
+            tools=self.tools,
+            tool_inputs={
+                "KeywordTagExtractor": context,
+                "RAGRetriever": state["user_query"],
+                "WebSearch": f"{titles} {state['user_query']}",
+            },
+            budget=self.enrichment_budget,
+        )
+        logger.info(f"🔎 Web search stats: {self.web_search.stats}")
+        trace = {
+            "complete": result.complete,
+            "stop_reason": result.stop_reason,
+            "elapsed_ms": result.elapsed_ms,
+            "tokens": result.tokens,
+            "steps": result.steps,
+        }
+        return {**state, "extra_info": result.answer, "enrichment_trace": trace,
+                "lnode": "react_agent_tool", "count": state["count"] + 1}
@@ -0,0 +1,420 @@
+# extraction_benchmark.py
+
+"""
+Accuracy vs latency/cost benchmark of profile extraction settings.
+
+Every speed knob of the `analyze_pubs` node trades against extraction
+quality. This harness runs profile extraction over the publications of a
+hand-labelled gold set (`data/gold_profiles.json`) for every combination of:
+
+- `input_tokens`: prompt budget of the node, i.e. how much publication text is sent
+- `tier`: strong or fast model tier (see `model_tiers.py`)
+- `validate`: Guardrails validation of the answer, or plain JSON parsing
+- `normalize`: boilerplate-stripping text normalization before prompting
+- `fields`: all profile fields, or only those a query type needs (lazy extraction)
+
+Each setting is scored on the fields it extracts with field-level
+precision/recall (entities matched alias-normalized, `results` by
+content-word overlap) and timed; cost comes
+from the prompt and answer token counts at the tier's model prices. Settings
+that no other setting beats on both accuracy and latency (or cost) form the
+Pareto frontier, written to a JSON report and an SVG plot.
+
+Responses come from the offline fake model by default, whose answers are the
+gazetteer profile of the text it was sent and whose latency is simulated per
+tier: it measures what truncation, normalization and field choice cost in
+accuracy, but not quality differences between models. Use `--mode live`
+(optionally `--cassette` to record) or `--mode replay --cassette` for that.
+
+Usage:
+    python src/extraction_benchmark.py
+    python src/extraction_benchmark.py --input-tokens 1000 3500 --tiers strong fast --validate 1 0
+    python src/extraction_benchmark.py --mode live --cassette outputs/cassettes/extraction_bench.jsonl.gz
+    python src/extraction_benchmark.py --mode replay --cassette outputs/cassettes/extraction_bench.jsonl.gz
+"""
+
+import sys
+import json
+import time
+import argparse
+import itertools
+from pathlib import Path
+from types import SimpleNamespace
+from datetime import datetime
+from dataclasses import asdict, dataclass, replace
+from typing import Dict, List, Optional, Sequence
+
+from paths import GOLD_PROFILES_FPATH, OUTPUTS_DIR, SAMPLE_PUBLICATION_DIR
+from grounding import content_terms
+from latency import percentile
+from model_tiers import FAST, STRONG, TierMetrics
+from normalize import TextNormalizer
+from profile_diff import entities_match
+from profile_store import PROFILE_FIELDS, extraction_fields_for_query
+from prompt_budget import NODE_TOKEN_BUDGETS
+from logger import logger
+
+
+BENCHMARK_DIR = Path(OUTPUTS_DIR) / "benchmarks"
+RESULT_OVERLAP = 0.5  # share of a gold result's content words a predicted result must contain
+# Offline fake-model latency per tier: (seconds per call, seconds per 1K prompt tokens)
+FAKE_TIER_LATENCY = {STRONG: (0.04, 0.03), FAST: (0.02, 0.015)}
+
+
+# ==============================
+# Settings
+# ==============================
+
+@dataclass(frozen=True)
+class ExtractionSettings:
+    input_tokens: int = NODE_TOKEN_BUDGETS["analyze_pubs"]
+    tier: str = STRONG
+    validate: bool = True
+    normalize: bool = True
+    fields: str = "all"  # "all", or a query type whose fields are extracted
+
+    @property
+    def name(self) -> str:
+        parts = [f"{self.input_tokens}t", self.tier]
+        if not self.validate:
+            parts.append("no-guard")
+        if not self.normalize:
+            parts.append("raw-text")
+        if self.fields != "all":
+            parts.append(self.fields.lower().replace(" ", "-"))
+        return "/".join(parts)
+
+    @property
+    def field_names(self) -> tuple:
+        return PROFILE_FIELDS if self.fields == "all" else extraction_fields_for_query(self.fields)
+
+
+def settings_grid(input_tokens: Sequence[int], tiers: Sequence[str], validate: Sequence[bool] = (True,),
+                  normalize: Sequence[bool] = (True,), fields: Sequence[str] = ("all",)) -> List[ExtractionSettings]:
+    return [ExtractionSettings(*combo) for combo in itertools.product(input_tokens, tiers, validate, normalize, fields)]
+
+
+# ==============================
+# Scoring
+# ==============================
+
+def load_gold(path=GOLD_PROFILES_FPATH) -> Dict[str, dict]:
+    """Gold profiles keyed by publication file stem."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["profiles"]
+
+
+def _matches(field_name: str, predicted: str, gold: str) -> bool:
+    if field_name == "results":
+        gold_terms = set(content_terms(gold))
+        return bool(gold_terms) and len(gold_terms & set(content_terms(predicted))) / len(gold_terms) >= RESULT_OVERLAP
+    return entities_match(predicted, gold)
+
+
+def count_matches(field_name: str, predicted: Sequence, gold: Sequence) -> int:
+    """Predicted values matched one-to-one with gold values."""
+    unmatched = [str(g) for g in gold]
+    matched = 0
+    for value in predicted:
+        for i, expected in enumerate(unmatched):
+            if _matches(field_name, str(value), expected):
+                del unmatched[i]
+                matched += 1
+                break
+    return matched
+
+
+@dataclass
+class FieldScore:
+    matched: int = 0
+    predicted: int = 0
+    gold: int = 0
+
+    def add(self, other: "FieldScore") -> None:
+        self.matched += other.matched
+        self.predicted += other.predicted
+        self.gold += other.gold
+
+    @property
+    def precision(self) -> float:
+        return self.matched / self.predicted if self.predicted else 0.0
+
+    @property
+    def recall(self) -> float:
+        return self.matched / self.gold if self.gold else 0.0
+
+    @property
+    def f1(self) -> float:
+        p, r = self.precision, self.recall
+        return 2 * p * r / (p + r) if p + r else 0.0
+
+    def to_dict(self) -> dict:
+        return {"precision": round(self.precision, 3), "recall": round(self.recall, 3), "f1": round(self.f1, 3)}
+
+
+def score_profile(profile, gold: dict, fields: Sequence[str] = PROFILE_FIELDS) -> Dict[str, FieldScore]:
+    """Per-field scores of one extracted profile; non-dict answers score as empty profiles."""
+    profile = profile if isinstance(profile, dict) else {}
+    scores = {}
+    for f in fields:
+        predicted = [v for v in profile.get(f) or [] if str(v).strip()]
+        expected = gold.get(f) or []
+        scores[f] = FieldScore(count_matches(f, predicted, expected), len(predicted), len(expected))
+    return scores
+
+
+# ==============================
+# Runner
+# ==============================
+
+@dataclass
+class SettingResult:
+    settings: ExtractionSettings
+    scores: Dict[str, FieldScore]
+    latencies_ms: List[float]
+    cost_usd: float
+    prompt_tokens: int
+    failures: int = 0
+    pareto_latency: bool = False
+    pareto_cost: bool = False
+
+    @property
+    def overall(self) -> FieldScore:
+        total = FieldScore()
+        for score in self.scores.values():
+            total.add(score)
+        return total
+
+    @property
+    def mean_latency_ms(self) -> float:
+        return sum(self.latencies_ms) / len(self.latencies_ms) if self.latencies_ms else 0.0
+
+    @property
+    def cost_per_publication(self) -> float:
+        return self.cost_usd / len(self.latencies_ms) if self.latencies_ms else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.settings.name,
+            "settings": asdict(self.settings),
+            **self.overall.to_dict(),
+            "fields": {f: s.to_dict() for f, s in self.scores.items()},
+            "mean_latency_ms": round(self.mean_latency_ms, 1),
+            "p95_latency_ms": round(percentile(self.latencies_ms, 95) or 0.0, 1),
+            "cost_usd_per_publication": round(self.cost_per_publication, 6),
+            "prompt_tokens": self.prompt_tokens,
+            "failures": self.failures,
+            "pareto_latency": self.pareto_latency,
+            "pareto_cost": self.pareto_cost,
+        }
+
+
+class _UnvalidatedGuard:
+    """Guard stand-in that parses the JSON answer without Guardrails validation."""
+
+    def parse(self, llm_output: str, *args, **kwargs):
+        try:
+            value = json.loads(llm_output)
+        except json.JSONDecodeError:
+            value = None
+        return SimpleNamespace(validated_output=value if isinstance(value, dict) else None)
+
+
+def build_benchmark_explorer(mode: str = "fake", cassette_path: Optional[str] = None):
+    """
+    Explorer with both tiers available: offline fakes ("fake"), the real API
+    optionally recorded to a cassette ("live"), or a recorded cassette ("replay").
+    """
+    from cassette import Cassette
+    from explorer import PublicationExplorer
+
+    if mode == "replay":
+        cassette = Cassette.load(cassette_path)
+        explorer = PublicationExplorer(cassette=cassette)
+        explorer.fast_model = cassette.wrap_model()
+    elif mode == "live":
+        from langchain_openai import ChatOpenAI
+
+        cassette = Cassette(cassette_path) if cassette_path else None
+        explorer = PublicationExplorer(cassette=cassette)
+        if explorer.fast_model is None:
+            explorer.fast_model = ChatOpenAI(model=explorer.router.models[FAST], temperature=0)
+            if cassette is not None:
+                explorer.fast_model = cassette.wrap_model(explorer.fast_model)
+    else:
+        from fake_model import FakeChatModel, use_fake_models
+
+        explorer = PublicationExplorer()
+        use_fake_models(explorer)
+        for tier, attr in ((STRONG, "model"), (FAST, "fast_model")):
+            per_call_s, per_1k_tokens_s = FAKE_TIER_LATENCY[tier]
+            setattr(explorer, attr, FakeChatModel(per_call_s, latency_per_1k_tokens_s=per_1k_tokens_s))
+    explorer.hedging = False  # duplicates would blur per-setting latency and cost
+    return explorer
+
+
+def run_setting(explorer, settings: ExtractionSettings, gold: Dict[str, dict],
+                publication_dir: str = SAMPLE_PUBLICATION_DIR) -> SettingResult:
+    """Extracts every gold publication with `settings` and scores the profiles."""
+    guard = explorer.guard
+    explorer.budgeter.node_budgets["analyze_pubs"] = settings.input_tokens
+    explorer.router.node_settings["analyze_pubs"] = replace(explorer.router.settings("analyze_pubs"), tier=settings.tier)
+    explorer.normalizer = TextNormalizer(enabled=settings.normalize)
+    explorer.tier_metrics = TierMetrics(explorer.router.models)
+    if not settings.validate:
+        explorer.guard = _UnvalidatedGuard()
+
+    scores = {f: FieldScore() for f in settings.field_names}
+    latencies, failures = [], 0
+    try:
+        for stem, expected in gold.items():
+            start = time.perf_counter()
+            try:
+                text = explorer.read_txt(str(Path(publication_dir) / f"{stem}.txt"))
+                profile = explorer.extract_profile(text, stem, save=False, fields=settings.field_names)
+            except Exception as e:
+                logger.warning(f"⚠️ {settings.name}: extraction of {stem!r} failed ({type(e).__name__}: {e})")
+                profile = None
+            latencies.append((time.perf_counter() - start) * 1000)
+            failures += not isinstance(profile, dict)
+            for f, score in score_profile(profile, expected, settings.field_names).items():
+                scores[f].add(score)
+    finally:
+        explorer.guard = guard
+
+    tiers = explorer.tier_metrics.summary()["tiers"].values()
+    return SettingResult(
+        settings, scores, latencies,
+        cost_usd=sum(t["cost_usd"] for t in tiers),
+        prompt_tokens=sum(t["input_tokens"] for t in tiers),
+        failures=failures,
+    )
+
+
+def pareto_front(results: Sequence[SettingResult], key) -> List[SettingResult]:
+    """Results that no other result beats on both `key` (lower is better) and F1, by ascending `key`."""
+    front, best_f1 = [], -1.0
+    for result in sorted(results, key=lambda r: (key(r), -r.overall.f1)):
+        if result.overall.f1 > best_f1:
+            front.append(result)
+            best_f1 = result.overall.f1
+    return front
+
+
+def run_benchmark(explorer, grid: Sequence[ExtractionSettings], gold: Dict[str, dict],
+                  publication_dir: str = SAMPLE_PUBLICATION_DIR) -> List[SettingResult]:
+    results = []
+    for settings in grid:
+        result = run_setting(explorer, settings, gold, publication_dir)
+        logger.info(f"📐 {settings.name}: F1 {result.overall.f1:.3f}, {result.mean_latency_ms:.0f} ms, "
+                    f"${result.cost_per_publication:.5f}/publication")
+        results.append(result)
+    for result in pareto_front(results, lambda r: r.mean_latency_ms):
+        result.pareto_latency = True
+    for result in pareto_front(results, lambda r: r.cost_per_publication):
+        result.pareto_cost = True
+    return results
+
+
+# ==============================
+# Frontier Plot
+# ==============================
+
+def _panel(results: Sequence[SettingResult], key, label: str, x0: int, width: int = 440, height: int = 360) -> List[str]:
+    left, top, plot_w, plot_h = x0 + 60, 40, width - 80, height - 90
+    xs = [key(r) for r in results]
+    lo, hi = min(xs), max(xs)
+    span = (hi - lo) or 1.0
+
+    def point(r):
+        return left + (key(r) - lo) / span * plot_w, top + (1 - r.overall.f1) * plot_h
+
+    parts = [
+        f'<rect x="{left}" y="{top}" width="{plot_w}" height="{plot_h}" fill="none" stroke="#999"/>',
+        f'<text x="{left + plot_w / 2}" y="{top + plot_h + 40}" text-anchor="middle">{label}</text>',
+        f'<text x="{left}" y="{top + plot_h + 18}" text-anchor="middle" font-size="11">{lo:.4g}</text>',
+        f'<text x="{left + plot_w}" y="{top + plot_h + 18}" text-anchor="middle" font-size="11">{hi:.4g}</text>',
+        f'<text x="{left - 8}" y="{top + 4}" text-anchor="end" font-size="11">1.0</text>',
+        f'<text x="{left - 8}" y="{top + plot_h + 4}" text-anchor="end" font-size="11">0.0</text>',
+        f'<text x="{x0 + 16}" y="{top + plot_h / 2}" transform="rotate(-90 {x0 + 16} {top + plot_h / 2})" '
+        f'text-anchor="middle">F1</text>',
+    ]
+    front = pareto_front(results, key)
+    on_front = {id(r) for r in front}
+    parts.append('<polyline fill="none" stroke="#d62728" stroke-width="1.5" points="'
+                 + " ".join(f"{x:.1f},{y:.1f}" for x, y in map(point, front)) + '"/>')
+    for r in results:
+        x, y = point(r)
+        parts.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="4" fill="{"#d62728" if id(r) in on_front else "#7f7f7f"}">'
+                     f'<title>{r.settings.name}: F1 {r.overall.f1:.3f}</title></circle>')
+        if id(r) in on_front:
+            parts.append(f'<text x="{x + 6:.1f}" y="{y - 6:.1f}" font-size="10">{r.settings.name}</text>')
+    return parts
+
+
+def write_frontier_svg(results: Sequence[SettingResult], path) -> str:
+    """Two panels, F1 vs mean latency and F1 vs cost, with the Pareto frontiers in red."""
+    parts = [
+        '<svg xmlns="http://www.w3.org/2000/svg" width="900" height="380" font-family="sans-serif" font-size="12">',
+        '<rect width="100%" height="100%" fill="white"/>',
+        '<text x="450" y="20" text-anchor="middle" font-size="14">Extraction settings: accuracy vs latency and cost</text>',
+        *_panel(results, lambda r: r.mean_latency_ms, "mean latency per publication (ms)", 0),
+        *_panel(results, lambda r: r.cost_per_publication, "cost per publication (USD)", 450),
+        "</svg>",
+    ]
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text("\n".join(parts), encoding="utf-8")
+    return str(path)
+
+
+# ==============================
+# CLI
+# ==============================
+
+def _flag(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark profile extraction settings against a gold set.")
+    parser.add_argument("--mode", choices=("fake", "live", "replay"), default="fake", help="Source of model responses.")
+    parser.add_argument("--cassette", help="Cassette to record to (live) or replay from (replay).")
+    parser.add_argument("--gold", default=str(GOLD_PROFILES_FPATH), help="Gold profiles JSON.")
+    parser.add_argument("--input-tokens", type=int, nargs="+", default=[500, 1000, 2000, 3500], help="Prompt budgets to try.")
+    parser.add_argument("--tiers", nargs="+", choices=(STRONG, FAST), default=[STRONG, FAST], help="Model tiers to try.")
+    parser.add_argument("--validate", nargs="+", type=_flag, default=[True, False], help="Guardrails validation on (1) / off (0).")
+    parser.add_argument("--normalize", nargs="+", type=_flag, default=[True], help="Text normalization on (1) / off (0).")
+    parser.add_argument("--fields", nargs="+", default=["all"], help='"all" and/or query types, e.g. "Datasets".')
+    parser.add_argument("--output-dir", default=str(BENCHMARK_DIR), help="Where the report and plot are written.")
+    args = parser.parse_args(argv)
+    if args.mode == "replay" and not args.cassette:
+        parser.error("--mode replay needs --cassette")
+
+    gold = load_gold(args.gold)
+    grid = settings_grid(args.input_tokens, args.tiers, args.validate, args.normalize, args.fields)
+    explorer = build_benchmark_explorer(args.mode, args.cassette)
+    logger.info(f"📐 Benchmarking {len(grid)} extraction settings on {len(gold)} gold publications ({args.mode} responses)")
+    results = run_benchmark(explorer, grid, gold)
+    if args.mode == "live" and explorer.cassette is not None:
+        explorer.cassette.save()
+
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    out_dir = Path(args.output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    report = out_dir / f"extraction_benchmark_{stamp}.json"
+    report.write_text(json.dumps({"mode": args.mode, "gold": args.gold, "results": [r.to_dict() for r in results]},
+                                 indent=2, ensure_ascii=False), encoding="utf-8")
+    plot = write_frontier_svg(results, out_dir / f"extraction_frontier_{stamp}.svg")
+
+    print(f"{'setting':<36} {'P':>6} {'R':>6} {'F1':>6} {'ms':>8} {'USD/pub':>9}  frontier")
+    for r in sorted(results, key=lambda r: -r.overall.f1):
+        s = r.overall
+        marks = ",".join(m for m, on in (("latency", r.pareto_latency), ("cost", r.pareto_cost)) if on)
+        print(f"{r.settings.name:<36} {s.precision:>6.3f} {s.recall:>6.3f} {s.f1:>6.3f} "
+              f"{r.mean_latency_ms:>8.0f} {r.cost_per_publication:>9.5f}  {marks}")
+    print(f"💾 Report: {report}\n📈 Frontier plot: {plot}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# fake_model.py
+
+"""
+Deterministic stand-ins for the chat model and the ReAct agent.
+
+They let the whole pipeline (batch workers, load tests, benchmarks) run
+offline without API keys or cost: profile prompts are answered with the
+gazetteer profile of the publication text embedded in the prompt, every
+other prompt with a short canned answer. Latency and failures can be
+injected to exercise timeouts and retries.
+"""
+
+import re
+import json
+import time
+import random
+import threading
+from typing import Optional
+
+from langchain_core.messages import AIMessage
+
+from entity_extractor import get_entity_extractor
+
+
+PROFILE_PROMPT_PREFIX = "You are an expert scientific reviewer"
+REACT_FINAL_ANSWER = "Final Answer:"
+_REQUESTED_FIELD = re.compile(r"^- `(\w+)`$", re.MULTILINE)
+
+
+class FakeModelError(RuntimeError):
+    """Injected failure of the fake model."""
+
+
+class FakeChatModel:
+    """
+    Chat-model stand-in with the `invoke(messages)` interface used by the explorer.
+
+    Args:
+        latency_s (float): Simulated latency per call.
+        fail_rate (float): Probability that a call raises `FakeModelError`.
+        seed (int, optional): Seed for the failure draws.
+        latency_per_1k_tokens_s (float): Extra simulated latency per 1K prompt
+            tokens (approximated as 4 characters each), so longer prompts are slower.
+    """
+
+    def __init__(self, latency_s: float = 0.0, fail_rate: float = 0.0, seed: Optional[int] = None,
+                 latency_per_1k_tokens_s: float = 0.0):
+        self.latency_s = latency_s
+        self.latency_per_1k_tokens_s = latency_per_1k_tokens_s
+        self.fail_rate = fail_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def invoke(self, messages, *args, **kwargs) -> AIMessage:
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.fail_rate
+        delay = self.latency_s + self.latency_per_1k_tokens_s * len(messages[-1].content) / 4000
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise FakeModelError("injected fake model failure")
+        return AIMessage(content=fake_answer(messages[-1].content))
+
+
+class FakeAgent:
+    """ReAct agent stand-in with the `run(input, callbacks=...)` interface."""
+
+    def run(self, prompt: str, *args, **kwargs) -> str:
+        return "No additional insights (offline fake agent)."
+
+
+def fake_answer(prompt: str) -> str:
+    if prompt.startswith(PROFILE_PROMPT_PREFIX):
+        text = prompt.rsplit("Publication:\n", 1)[-1]
+        fields = _REQUESTED_FIELD.findall(prompt.split("Entities found", 1)[0])
+        profile = get_entity_extractor().fallback_profile(text)
+        return json.dumps({f: profile.get(f, []) for f in fields or profile})
+    if REACT_FINAL_ANSWER in prompt and "Thought:" in prompt:
+        # ReAct agent prompt: finish at once so agents driven through the mock server terminate
+        return f"Thought: I now know the final answer\n{REACT_FINAL_ANSWER} No additional insights (offline fake model)."
+    first_line = prompt.strip().splitlines()[0] if prompt.strip() else ""
+    return f"Offline answer to: {first_line[:120]}"
+
+
+def use_fake_models(explorer, latency_s: float = 0.0, fail_rate: float = 0.0, seed: Optional[int] = None):
+    """Swaps the explorer's model and ReAct agent for offline fakes; returns the fake model."""
+    explorer.model = FakeChatModel(latency_s, fail_rate, seed)
+    explorer.react_agent = FakeAgent()
+    return explorer.model
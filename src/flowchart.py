@@ -0,0 +1,263 @@
+# flowchart.py
+
+"""
+Pipeline flowcharts generated from the compiled LangGraph, annotated with
+measured node metrics and colored as a heatmap.
+
+`graph_topology` reads the nodes and edges of `PublicationExplorer.graph`
+itself, so the diagrams follow `_build_graph` instead of a hand-kept edge
+list. `node_metrics` combines two sources of recorded metrics:
+
+- the run-history aggregates (`run_history.py`), which give p50/p95 latency
+  and LLM tokens per node for a month or all time;
+- optionally, the pipeline logs (`log_analytics.py`). These also see runs
+  that failed before anything was saved, so their error rate replaces the
+  history's failure rate. Their latency is used for nodes the history has
+  not timed.
+
+`to_mermaid` and `to_dot` render the annotated graph. The heat metric is
+p95 latency by default; p50, failure rate and tokens per run also work.
+Nodes are filled on a green → yellow → red scale relative to the hottest
+node. Edges take the color of the node they lead into and are labelled
+with its run count. The History page renders the DOT version; the
+`generate_flowchart_*` scripts write the Mermaid and PNG versions to
+`docs/`.
+
+Usage:
+    python src/flowchart.py --format mermaid --period 2026-10
+    python src/flowchart.py --format dot --heat failure_rate --logs > pipeline.dot
+"""
+
+import sys
+import json
+import argparse
+import functools
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from run_history import ALL_TIME, RunHistory
+
+
+START, END = "__start__", "__end__"
+HEAT_METRICS = {
+    "p95_ms": "p95 latency",
+    "p50_ms": "p50 latency",
+    "failure_rate": "failure rate",
+    "tokens_per_run": "tokens per run",
+}
+# Green → yellow → red
+HEAT_STOPS = ((0.0, (0xC7, 0xE9, 0xC0)), (0.5, (0xFE, 0xE0, 0x8B)), (1.0, (0xF4, 0x6D, 0x43)))
+UNMEASURED_FILL = "#eeeeee"
+
+
+# ==============================
+# Topology
+# ==============================
+
+@dataclass
+class Topology:
+    """Nodes (in graph order, including `START`/`END`) and `(source, target, conditional)` edges."""
+
+    nodes: List[str]
+    edges: List[Tuple[str, str, bool]]
+
+    @property
+    def steps(self) -> List[str]:
+        return [n for n in self.nodes if n not in (START, END)]
+
+
+def graph_topology(graph) -> Topology:
+    """Topology of a compiled LangGraph."""
+    drawable = graph.get_graph()
+    nodes = list(drawable.nodes)
+    order = {n: i for i, n in enumerate(nodes)}
+    edges = sorted(
+        ((e.source, e.target, bool(e.conditional)) for e in drawable.edges),
+        key=lambda e: (order.get(e[0], len(order)), order.get(e[1], len(order))),
+    )
+    return Topology(nodes, edges)
+
+
+@functools.lru_cache(maxsize=1)
+def pipeline_topology() -> Topology:
+    """Topology of `PublicationExplorer.graph` (building it creates no model clients)."""
+    from explorer import PublicationExplorer
+
+    return graph_topology(PublicationExplorer().graph)
+
+
+# ==============================
+# Metrics
+# ==============================
+
+def node_metrics(history_nodes: Dict[str, dict], log_nodes: Optional[Dict[str, dict]] = None) -> Dict[str, dict]:
+    """
+    Per-node `calls`, `p50_ms`, `p95_ms`, `failure_rate` and `tokens_per_run`
+    from `RunHistory.node_stats` and, optionally, the `nodes` of a
+    `log_analytics.build_report`.
+    """
+    metrics = {}
+    for node, s in history_nodes.items():
+        metrics[node] = {
+            "calls": s["calls"],
+            "p50_ms": s["p50_ms"],
+            "p95_ms": s["p95_ms"],
+            "failure_rate": s["failure_rate"],
+            "tokens_per_run": round((s["input_tokens"] + s["output_tokens"]) / s["calls"], 1) if s["calls"] else None,
+        }
+    for node, s in (log_nodes or {}).items():
+        m = metrics.setdefault(node, {"calls": s["calls"], "p50_ms": s["p50_ms"], "p95_ms": s["p95_ms"], "tokens_per_run": None})
+        m["failure_rate"] = s["error_rate"]
+    return metrics
+
+
+def heat_color(share: float) -> str:
+    """Hex fill for a heat share in [0, 1]."""
+    share = min(max(share, 0.0), 1.0)
+    for (lo, low_rgb), (hi, high_rgb) in zip(HEAT_STOPS, HEAT_STOPS[1:]):
+        if share <= hi:
+            t = (share - lo) / (hi - lo)
+            return "#" + "".join(f"{round(a + (b - a) * t):02x}" for a, b in zip(low_rgb, high_rgb))
+    return "#" + "".join(f"{c:02x}" for c in HEAT_STOPS[-1][1])
+
+
+def heat_shares(metrics: Dict[str, dict], heat: str = "p95_ms") -> Dict[str, float]:
+    """Each measured node's `heat` value relative to the hottest node."""
+    values = {n: m[heat] for n, m in metrics.items() if m.get(heat) is not None}
+    top = max(values.values(), default=0)
+    return {n: (v / top if top > 0 else 0.0) for n, v in values.items()}
+
+
+def bottleneck(metrics: Dict[str, dict], heat: str = "p95_ms") -> Optional[Tuple[str, float]]:
+    """The hottest node and its share of the summed `heat` over all nodes."""
+    values = {n: m[heat] for n, m in metrics.items() if m.get(heat)}
+    if not values:
+        return None
+    node = max(values, key=values.get)
+    return node, values[node] / sum(values.values())
+
+
+def _duration(ms: Optional[float]) -> str:
+    if ms is None:
+        return "–"
+    return f"{ms / 1000:.1f}s" if ms >= 1000 else f"{ms:.0f}ms"
+
+
+def _annotation(m: dict) -> List[str]:
+    lines = [f"p50 {_duration(m.get('p50_ms'))} · p95 {_duration(m.get('p95_ms'))}"]
+    tokens = m.get("tokens_per_run")
+    extras = [f"{tokens:,.0f} tok/run"] if tokens else []
+    if m.get("failure_rate") is not None:
+        extras.append(f"{m['failure_rate']:.1%} failed")
+    return lines + ([" · ".join(extras)] if extras else [])
+
+
+# ==============================
+# Rendering
+# ==============================
+
+def to_mermaid(topology: Topology, metrics: Optional[Dict[str, dict]] = None, heat: str = "p95_ms",
+               fills: Optional[Dict[str, str]] = None) -> str:
+    """
+    Mermaid flowchart of `topology`. Without metrics, nodes use `fills`
+    (static colors) and edges carry no labels.
+    """
+    ids = {START: "start", END: "end_node"}
+    shares = heat_shares(metrics, heat) if metrics else {}
+    lines = ["flowchart TD", "    start([Start])", "    end_node([End])"]
+    for node in topology.steps:
+        label = [node] + (_annotation(metrics[node]) if metrics and node in metrics else [])
+        lines.append(f'    {node}["{"<br/>".join(label)}"]')
+    for source, target, conditional in topology.edges:
+        arrow = "-.->" if conditional else "-->"
+        calls = (metrics or {}).get(target, {}).get("calls")
+        label = f'|"{calls} runs"|' if calls else ""
+        lines.append(f"    {ids.get(source, source)} {arrow}{label} {ids.get(target, target)}")
+    for node in topology.steps:
+        if metrics:
+            fill = heat_color(shares[node]) if node in shares else UNMEASURED_FILL
+        else:
+            fill = (fills or {}).get(node)
+        if fill:
+            lines.append(f"    style {node} fill:{fill},stroke:#333,stroke-width:1px")
+    if metrics:
+        for i, (_, target, _) in enumerate(topology.edges):
+            if target in shares:
+                width = 1 + 3 * shares[target]
+                lines.append(f"    linkStyle {i} stroke:{heat_color(shares[target])},stroke-width:{width:.1f}px")
+    return "\n".join(lines)
+
+
+def to_dot(topology: Topology, metrics: Optional[Dict[str, dict]] = None, heat: str = "p95_ms") -> str:
+    """Graphviz DOT source of `topology` (rendered by `st.graphviz_chart` or the `dot` tool)."""
+    shares = heat_shares(metrics, heat) if metrics else {}
+
+    def quote(text: str) -> str:
+        return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+    lines = [
+        "digraph pipeline {",
+        "    rankdir=TB;",
+        '    node [shape=box, style="rounded,filled", fontname="Helvetica", fontsize=11, fillcolor="#ffffff"];',
+        '    edge [fontname="Helvetica", fontsize=9];',
+        f'    {quote(START)} [label="Start", shape=circle, fillcolor="#dddddd"];',
+        f'    {quote(END)} [label="End", shape=doublecircle, fillcolor="#dddddd"];',
+    ]
+    for node in topology.steps:
+        label = "\\n".join([node] + (_annotation(metrics[node]) if metrics and node in metrics else []))
+        label = label.replace('"', "'")
+        fill = heat_color(shares[node]) if node in shares else (UNMEASURED_FILL if metrics else "#ffffff")
+        lines.append(f'    {quote(node)} [label="{label}", fillcolor="{fill}"];')
+    for source, target, conditional in topology.edges:
+        attrs = ["style=dashed"] if conditional else []
+        if target in shares:
+            attrs += [f'color="{heat_color(shares[target])}"', f"penwidth={1 + 3 * shares[target]:.1f}"]
+            if metrics[target].get("calls"):
+                attrs.append(f'label="{metrics[target]["calls"]} runs"')
+        lines.append(f"    {quote(source)} -> {quote(target)}" + (f" [{', '.join(attrs)}]" if attrs else "") + ";")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def collect_metrics(period: str = ALL_TIME, history: Optional[RunHistory] = None, logs: bool = False) -> Dict[str, dict]:
+    """Node metrics of `period` from the run history and, with `logs`, the pipeline logs of the same window."""
+    history = history or RunHistory()
+    log_nodes = None
+    if logs:
+        from datetime import datetime
+        from log_analytics import analyze_logs, build_report
+
+        since = until = None
+        if period != ALL_TIME:
+            start = datetime.strptime(period, "%Y-%m")
+            end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+            since, until = start.timestamp(), end.timestamp()
+        log_nodes = build_report(analyze_logs(since=since, until=until))["nodes"]
+    return node_metrics(history.node_stats(period), log_nodes)
+
+
+# ==============================
+# CLI
+# ==============================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Flowchart of the compiled pipeline graph with a node-latency heatmap.")
+    parser.add_argument("--format", choices=("mermaid", "dot", "json"), default="mermaid", help="Output format.")
+    parser.add_argument("--period", default=ALL_TIME, help=f"Month (YYYY-MM) or '{ALL_TIME}'.")
+    parser.add_argument("--heat", choices=tuple(HEAT_METRICS), default="p95_ms", help="Metric the heatmap colors by.")
+    parser.add_argument("--logs", action="store_true", help="Also read failure rates from the pipeline logs.")
+    args = parser.parse_args(argv)
+
+    topology = pipeline_topology()
+    metrics = collect_metrics(args.period, logs=args.logs)
+    if args.format == "json":
+        print(json.dumps({"nodes": topology.nodes, "edges": topology.edges, "metrics": metrics}, indent=2))
+    elif args.format == "dot":
+        print(to_dot(topology, metrics, args.heat))
+    else:
+        print(to_mermaid(topology, metrics, args.heat))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
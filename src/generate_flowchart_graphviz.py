@@ -3,18 +3,27 @@
 """
 Generates a vertical Graphviz PNG diagram of the LangGraph orchestration flow
 and saves it to the docs/ directory.
+
+The diagram is generated from the compiled `PublicationExplorer.graph` (see
+`flowchart.py`); with `--heatmap` it carries the recorded p50/p95 latency,
+tokens and failure rate per node, colored by heat.
+
+Usage:
+    python src/generate_flowchart_graphviz.py --heatmap
 """
 
 import os
-from graphviz import Digraph
-from IPython.display import Image, display
+import argparse
+from typing import List, Optional
+
+from graphviz import Source
 
 # Define output path
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 DOCS_DIR = os.path.join(ROOT_DIR, "docs")
-os.makedirs(DOCS_DIR, exist_ok=True)
 #from paths import DOCS_DIR
 from paths import SRC_DIR
+from flowchart import ALL_TIME, HEAT_METRICS, collect_metrics, pipeline_topology, to_dot
 
 OUTPUT_PATH = os.path.join(DOCS_DIR, "publication_flowchart")
 
@@ -23,38 +32,28 @@ OUTPUT_PATH = os.path.join(DOCS_DIR, "publication_flowchart")
 #OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-# Create the flowchart
-dot = Digraph(comment="LangGraph Flowchart", format='png')
-dot.attr(rankdir='TB', fontsize='12')
-
-# Nodes
-dot.node('Z', 'Ready Tensor dataset', shape='folder', style='filled', fillcolor='lightgray')
-dot.node('A', 'select_pub1')
-dot.node('C', 'select_pub2')
-dot.node('B', 'analyze_pub1')
-dot.node('D', 'analyze_pub2')
-dot.node('E', 'compare')
-dot.node('F', 'aggregate_trends')
-dot.node('G', 'summarize')
-dot.node('H', 'fact_check_node')
-dot.node('I', 'END', shape='doublecircle')
-
-# Edges
-dot.edge('Z', 'A')
-dot.edge('Z', 'C')
-dot.edge('A', 'B')
-dot.edge('C', 'D')
-dot.edge('B', 'E')
-dot.edge('D', 'E')
-dot.edge('E', 'F')
-dot.edge('F', 'G')
-dot.edge('G', 'H')
-dot.edge('H', 'I')
-
-# Generate PNG only (no .md, no .gv)
-output_png_path = dot.render(filename=OUTPUT_PATH, view=False)
-print(f"✅ PNG flowchart saved to: {output_png_path}")
+def build_flowchart(heatmap: bool = False, period: str = ALL_TIME, heat: str = "p95_ms") -> Source:
+    """Builds the flowchart; importing this module renders nothing and creates no directories."""
+    metrics = collect_metrics(period) if heatmap else None
+    return Source(to_dot(pipeline_topology(), metrics, heat), format="png")
+
+
+def main(argv: Optional[List[str]] = None) -> str:
+    parser = argparse.ArgumentParser(description="Graphviz PNG of the compiled LangGraph.")
+    parser.add_argument("--heatmap", action="store_true", help="Annotate nodes with recorded run metrics.")
+    parser.add_argument("--period", default=ALL_TIME, help="Month (YYYY-MM) or 'all'.")
+    parser.add_argument("--heat", choices=tuple(HEAT_METRICS), default="p95_ms", help="Metric the heatmap colors by.")
+    args = parser.parse_args(argv)
+
+    os.makedirs(DOCS_DIR, exist_ok=True)
+    # Generate PNG only (no .md, no .gv)
+    output_png_path = build_flowchart(args.heatmap, args.period, args.heat).render(filename=OUTPUT_PATH, view=False, cleanup=True)
+    print(f"✅ PNG flowchart saved to: {output_png_path}")
+    return output_png_path
+
 
 # Display for notebooks or interactive shell
 if __name__ == "__main__":
-    display(Image(filename=output_png_path))
+    from IPython.display import Image, display
+
+    display(Image(filename=main()))
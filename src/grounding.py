@@ -0,0 +1,267 @@
+# grounding.py
+
+"""
+Lexical grounding of fact-check claims in the source publications.
+
+Most claims a run makes ("uses SST-2", "evaluated with F1") can be verified
+by locating supporting spans in the publication itself. `GroundingIndex`
+maps every word and word pair of a document to its token positions, with
+character offsets, and is built once per document text (`get_grounding_index`
+keeps an LRU of them). `verify_claims` scores each claim by the share of its
+content words and word pairs found in a source, returns the best supporting
+window as evidence, and marks claims below `SUPPORT_THRESHOLD` as weak so
+only those are escalated to the LLM.
+
+Usage:
+    python src/grounding.py data/sample_publications/<pub>.txt "uses SST-2 for evaluation"
+"""
+
+import re
+import sys
+import hashlib
+import argparse
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from logger import logger
+
+
+MAX_NGRAM = 2
+SUPPORT_THRESHOLD = 0.75
+EVIDENCE_WINDOW = 40  # tokens
+EVIDENCE_SPANS = 2
+INDEX_CACHE_SIZE = 64
+MAX_SUMMARY_CLAIMS = 100
+
+_WORD = re.compile(r"[^\W_]+(?:[.\-][^\W_]+)*[+#]*")
+STOPWORDS = frozenset(
+    "a an and are as at be been both but by can do does for from has have how in into is it its of on "
+    "or our over such than that the their them then there these they this those to two use used uses "
+    "using was we were what when which while who will with within".split()
+)
+
+
+def _stem(token: str) -> str:
+    """Folds plurals so "datasets" supports "dataset" and vice versa."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize_spans(text: str) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """Lowercased, plural-folded word tokens of `text` and their character offsets."""
+    tokens, spans = [], []
+    for m in _WORD.finditer(text):
+        tokens.append(_stem(m.group(0).lower()))
+        spans.append(m.span())
+    return tokens, spans
+
+
+def content_terms(text: str) -> List[str]:
+    return [t for t in tokenize_spans(text)[0] if t not in STOPWORDS]
+
+
+# ==============================
+# Index
+# ==============================
+
+class GroundingIndex:
+    """
+    Word n-gram → token positions index of one document.
+
+    Args:
+        text (str): Document text; evidence offsets refer to it.
+        max_n (int): Longest indexed n-gram.
+    """
+
+    def __init__(self, text: str, max_n: int = MAX_NGRAM):
+        self.text = text
+        self.max_n = max_n
+        self.tokens, self.spans = tokenize_spans(text)
+        self.postings: Dict[Tuple[str, ...], List[int]] = defaultdict(list)
+        for i in range(len(self.tokens)):
+            for n in range(1, max_n + 1):
+                if i + n > len(self.tokens):
+                    break
+                self.postings[tuple(self.tokens[i:i + n])].append(i)
+
+    def positions(self, ngram: Sequence[str]) -> List[int]:
+        return self.postings.get(tuple(ngram), [])
+
+    def span(self, start_token: int, end_token: int) -> Tuple[int, int]:
+        """Character offsets of tokens `[start_token, end_token)`."""
+        return self.spans[start_token][0], self.spans[end_token - 1][1]
+
+
+_INDEX_LOCK = threading.Lock()
+_INDEXES: "OrderedDict[str, GroundingIndex]" = OrderedDict()
+
+
+def get_grounding_index(text: str) -> GroundingIndex:
+    """Index of `text`, built once per distinct text and kept in a small LRU."""
+    key = hashlib.sha256(text.encode("utf-8")).hexdigest()[:20]
+    with _INDEX_LOCK:
+        index = _INDEXES.get(key)
+        if index is not None:
+            _INDEXES.move_to_end(key)
+            return index
+    index = GroundingIndex(text)
+    with _INDEX_LOCK:
+        _INDEXES[key] = index
+        while len(_INDEXES) > INDEX_CACHE_SIZE:
+            _INDEXES.popitem(last=False)
+    logger.debug(f"🧷 Grounding index built ({len(index.tokens)} tokens, {len(index.postings)} n-grams)")
+    return index
+
+
+# ==============================
+# Claim Verification
+# ==============================
+
+@dataclass
+class Claim:
+    text: str
+    source: str  # "summary" or "<publication>:<field>"
+    publications: Optional[List[str]] = None  # publications to check; None means all
+
+
+@dataclass
+class ClaimCheck:
+    claim: str
+    source: str
+    score: float
+    supported: bool
+    evidence: List[dict] = field(default_factory=list)  # {"publication", "start", "end", "text"}
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def score_claim(terms: Sequence[str], index: GroundingIndex) -> float:
+    """
+    Share of the claim's content words found in the document, averaged with
+    the share of its adjacent word pairs (when it has any), so paraphrases
+    score partially and verbatim mentions score 1.0.
+    """
+    if not terms:
+        return 0.0
+    unigrams = sum(1 for t in set(terms) if index.positions((t,))) / len(set(terms))
+    pairs = {tuple(terms[i:i + 2]) for i in range(len(terms) - 1)}
+    if not pairs:
+        return unigrams
+    # Pairs may be separated by stopwords in the document ("F1 on SST-2"); allow a gap of one
+    found = sum(1 for a, b in pairs if _near(index, a, b, gap=2))
+    return round(0.5 * unigrams + 0.5 * found / len(pairs), 3)
+
+
+def _near(index: GroundingIndex, a: str, b: str, gap: int) -> bool:
+    if index.positions((a, b)):
+        return True
+    following = set(index.positions((b,)))
+    return any(p + d in following for p in index.positions((a,)) for d in range(2, gap + 1))
+
+
+def best_windows(terms: Sequence[str], index: GroundingIndex, limit: int = EVIDENCE_SPANS,
+                 window: int = EVIDENCE_WINDOW) -> List[Tuple[int, int, int]]:
+    """
+    Non-overlapping token windows covering the most distinct claim terms,
+    as `(distinct terms, start token, end token)`, best first.
+    """
+    hits = sorted((p, t) for t in set(terms) for p in index.positions((t,)))
+    candidates = []
+    lo, inside = 0, Counter()
+    for hi in range(len(hits)):
+        inside[hits[hi][1]] += 1
+        # Drop hits that are out of range or repeated later, keeping the tightest window
+        while hits[hi][0] - hits[lo][0] >= window or inside[hits[lo][1]] > 1:
+            inside[hits[lo][1]] -= 1
+            if not inside[hits[lo][1]]:
+                del inside[hits[lo][1]]
+            lo += 1
+        candidates.append((len(inside), hits[lo][0], hits[hi][0] + 1))
+    chosen = []
+    for covered, start, end in sorted(candidates, key=lambda c: (-c[0], c[2] - c[1], c[1])):
+        if all(end <= s or start >= e for _, s, e in chosen):
+            chosen.append((covered, start, end))
+        if len(chosen) == limit:
+            break
+    return chosen
+
+
+def verify_claims(
+    claims: Sequence[Claim],
+    documents: Dict[str, str],
+    threshold: float = SUPPORT_THRESHOLD,
+) -> List[ClaimCheck]:
+    """
+    Scores each claim against its publications (all of them when unspecified)
+    and attaches evidence spans with character offsets into the document text.
+    """
+    indexes = {name: get_grounding_index(text) for name, text in documents.items()}
+    checks = []
+    for claim in claims:
+        terms = content_terms(claim.text)
+        scored = sorted(
+            ((score_claim(terms, indexes[name]), name) for name in (claim.publications or indexes) if name in indexes),
+            reverse=True,
+        )
+        score = scored[0][0] if scored else 0.0
+        evidence = []
+        for _, name in scored[:EVIDENCE_SPANS]:
+            index = indexes[name]
+            for _, start, end in best_windows(terms, index, limit=EVIDENCE_SPANS - len(evidence)):
+                lo, hi = index.span(start, end)
+                evidence.append({"publication": name, "start": lo, "end": hi, "text": index.text[lo:hi]})
+            if len(evidence) >= EVIDENCE_SPANS:
+                break
+        checks.append(ClaimCheck(claim.text, claim.source, score, score >= threshold, evidence))
+    return checks
+
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def summary_claims(summary: str, min_terms: int = 3, limit: int = MAX_SUMMARY_CLAIMS) -> List[Claim]:
+    """The first `limit` sentences of a generated summary that carry at least `min_terms` content words."""
+    sentences = (s.strip(" -*#•\t") for s in _SENTENCE.split(summary or ""))
+    return [Claim(s, "summary") for s in sentences if len(content_terms(s)) >= min_terms][:limit]
+
+
+def profile_claims(names: Sequence[str], profiles: Sequence, fields: Sequence[str]) -> List[Claim]:
+    """One claim per extracted entity, checked against its own publication only."""
+    claims = []
+    for name, profile in zip(names, profiles):
+        if not isinstance(profile, dict):
+            continue
+        for f in fields:
+            for value in profile.get(f) or []:
+                if str(value).strip():
+                    claims.append(Claim(str(value).strip(), f"{name}:{f}", [name]))
+    return claims
+
+
+# ==============================
+# CLI
+# ==============================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Find lexical support for a claim in a publication.")
+    parser.add_argument("path", help="A .txt publication.")
+    parser.add_argument("claim", help="Claim to verify.")
+    args = parser.parse_args(argv)
+
+    with open(args.path, "r", encoding="utf-8") as f:
+        text = f.read()
+    check = verify_claims([Claim(args.claim, "cli")], {args.path: text})[0]
+    print(f"{'✅' if check.supported else '⚠️'} support {check.score:.2f}: {check.claim}")
+    for span in check.evidence:
+        print(f"  [{span['start']}:{span['end']}] {span['text']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+# ingest.py
+
+"""
+Streaming ingestion of publication dumps into the document corpus.
+
+`iter_records` parses a dump incrementally, record by record: a JSON array
+(like `data/project_1_publications.json`), JSON Lines, or concatenated
+objects. It reads fixed-size chunks and decodes one record at a time, so
+memory is bounded by the largest record, not by the size of the dump.
+
+Each record is normalized (Unicode NFC, `\\n` line endings, no control
+characters) and rendered in the layout of the app's publication files:
+title, `Id`, `Username`, `License`, then `Publication_description`. The
+result is written as `<clean title>.txt` into the directory the app lists,
+`data/sample_publications` by default. A SQLite manifest records each
+document's id, title, username, license, file, content hash (of the
+description) and text hash (of the rendered file):
+
+- Records whose id and text hash are unchanged are skipped without
+  touching their file.
+- Changed records, including metadata-only changes such as a new title or
+  license, are rewritten. The old file is removed when the title (and so
+  the file name) changed.
+- Records whose content hash already belongs to another id are skipped as
+  duplicates.
+
+Records are processed in batches of `--batch-size`. With `--workers` above
+one, batches run in parallel processes. Each batch commits in one
+manifest transaction, so workers, and separate runs on the same manifest,
+never interleave half-applied batches.
+
+Usage:
+    python src/ingest.py data/project_1_publications.json
+    python src/ingest.py dumps/publications.jsonl --workers 4 --batch-size 500 --docs-dir outputs/documents
+"""
+
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import itertools
+import unicodedata
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from paths import CORPUS_DIR, PUBLICATION_FPATH, SAMPLE_PUBLICATION_DIR
+from sqlite_store import SQLiteStore
+from utils import clean_filename
+from logger import logger
+
+
+MANIFEST_PATH = CORPUS_DIR / "documents.sqlite3"
+CHUNK_CHARS = 1 << 16
+MAX_CHUNK_CHARS = 1 << 26
+BATCH_SIZE = 200
+STATUSES = ("new", "changed", "unchanged", "duplicate", "invalid")
+
+_SEPARATORS = re.compile(r"[\s,]*")
+_CONTROL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    username TEXT,
+    license TEXT,
+    file TEXT NOT NULL UNIQUE,
+    content_hash TEXT NOT NULL UNIQUE,
+    text_hash TEXT,
+    chars INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+# ==============================
+# Streaming Parser
+# ==============================
+
+def iter_records(path: Path, chunk_chars: int = CHUNK_CHARS) -> Iterator[dict]:
+    """
+    Yields the JSON objects of a dump one at a time.
+
+    Accepts a top-level array of objects, JSON Lines, or concatenated
+    objects. A record split across chunks is retried with a doubled read
+    size, so a large record costs a few re-parses, not one per chunk.
+
+    Raises:
+        ValueError: On malformed JSON or a top-level value that is not an object.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, consumed = "", 0, 0
+    read_chars, eof, in_array = chunk_chars, False, False
+    with open(path, "r", encoding="utf-8") as f:
+
+        def refill(n: int) -> None:
+            nonlocal buf, pos, consumed, eof
+            chunk = f.read(n)
+            eof = not chunk
+            consumed += pos
+            buf, pos = buf[pos:] + chunk, 0
+
+        while True:
+            pos = _SEPARATORS.match(buf, pos).end()
+            if pos >= len(buf):
+                if eof:
+                    return
+                refill(read_chars)
+                continue
+            if buf[pos] == "[" and not in_array:
+                in_array, pos = True, pos + 1
+                continue
+            if buf[pos] == "]" and in_array:
+                in_array, pos = False, pos + 1
+                continue
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as exc:
+                if eof:
+                    raise ValueError(f"{path}: malformed JSON at char {consumed + exc.pos}: {exc.msg}") from None
+                read_chars = min(read_chars * 2, MAX_CHUNK_CHARS)
+                refill(read_chars)
+                continue
+            if not isinstance(record, dict):
+                raise ValueError(f"{path}: expected an object at char {consumed + pos}, got {type(record).__name__}")
+            read_chars, pos = chunk_chars, end
+            yield record
+
+
+def _batched(records: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    it = iter(records)
+    while batch := list(itertools.islice(it, size)):
+        yield batch
+
+
+# ==============================
+# Documents
+# ==============================
+
+@dataclass
+class Document:
+    id: str
+    title: str
+    username: str
+    license: str
+    text: str
+    content_hash: str  # of the description: duplicates across ids
+    text_hash: str  # of the rendered file: changes of this id
+
+    @property
+    def stem(self) -> str:
+        return clean_filename(self.title) or self.id
+
+
+def normalize_field(value) -> str:
+    text = unicodedata.normalize("NFC", str(value if value is not None else ""))
+    return _CONTROL.sub("", text.replace("\r\n", "\n").replace("\r", "\n"))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def to_document(record: dict) -> Optional[Document]:
+    """Normalized document of a record; None when it has no id or no description."""
+    pub_id = normalize_field(record.get("id")).strip()
+    body = normalize_field(record.get("publication_description"))
+    if not pub_id or not body.strip():
+        return None
+    title = " ".join(normalize_field(record.get("title")).split()) or pub_id
+    username = normalize_field(record.get("username")).strip()
+    license_ = normalize_field(record.get("license")).strip()
+    text = (
+        f"{title}\n\nId:\n{pub_id}\n\nUsername:\n{username}\n\nLicense:\n{license_}\n\n"
+        f"Publication_description:\n{body}\n\n"
+    )
+    return Document(pub_id, title, username, license_, text, content_hash(body), content_hash(text))
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
+
+
+# ==============================
+# Manifest
+# ==============================
+
+class DocumentManifest(SQLiteStore):
+    """
+    SQLite index of ingested documents (one row per publication id); any
+    number of processes can open the same file (see `sqlite_store.SQLiteStore`).
+
+    Args:
+        path (Path): Database file (created on first use).
+    """
+
+    SCHEMA = _SCHEMA
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        super().__init__(path)
+
+    def _migrate(self, db) -> None:
+        if "text_hash" not in {r["name"] for r in db.execute("PRAGMA table_info(documents)")}:
+            db.execute("ALTER TABLE documents ADD COLUMN text_hash TEXT")  # manifests written before it existed
+
+    def documents(self) -> List[dict]:
+        with self._connect() as db:
+            return [dict(r) for r in db.execute("SELECT * FROM documents ORDER BY title, id")]
+
+    def apply(self, docs: List[Document], docs_dir: Path) -> Counter:
+        """
+        Writes new and changed documents to `docs_dir` and records them, in
+        one transaction. Returns counts per status.
+        """
+        counts = Counter()
+        with self._transaction() as db:
+            for doc in docs:
+                row = db.execute("SELECT * FROM documents WHERE id = ?", (doc.id,)).fetchone()
+                if row is not None and row["text_hash"] == doc.text_hash and (docs_dir / row["file"]).exists():
+                    counts["unchanged"] += 1
+                    continue
+                owner = db.execute("SELECT id FROM documents WHERE content_hash = ?", (doc.content_hash,)).fetchone()
+                if owner is not None and owner["id"] != doc.id:
+                    counts["duplicate"] += 1
+                    logger.debug(f"♻️ {doc.id} duplicates {owner['id']}; skipped")
+                    continue
+
+                file = f"{doc.stem}.txt"
+                taken = db.execute("SELECT id FROM documents WHERE file = ?", (file,)).fetchone()
+                if taken is not None and taken["id"] != doc.id:
+                    file = f"{doc.stem}_{doc.id}.txt"  # another publication has the same title
+                target = docs_dir / file
+                # A file already holding this exact text (e.g. a first run over existing documents) is left untouched
+                if not target.exists() or target.read_text(encoding="utf-8") != doc.text:
+                    _write_atomic(target, doc.text)
+                if row is not None and row["file"] != file:
+                    (docs_dir / row["file"]).unlink(missing_ok=True)
+
+                db.execute(
+                    "INSERT OR REPLACE INTO documents"
+                    " (id, title, username, license, file, content_hash, text_hash, chars, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (doc.id, doc.title, doc.username, doc.license, file, doc.content_hash, doc.text_hash,
+                     len(doc.text), time.time()),
+                )
+                counts["changed" if row is not None else "new"] += 1
+        return counts
+
+
+# ==============================
+# Ingestion
+# ==============================
+
+def _ingest_batch(records: List[dict], docs_dir: str, manifest_path: str) -> Counter:
+    docs = [to_document(r) for r in records]
+    counts = DocumentManifest(Path(manifest_path)).apply([d for d in docs if d is not None], Path(docs_dir))
+    counts["invalid"] += sum(1 for d in docs if d is None)
+    return counts
+
+
+def ingest(
+    path: Path = PUBLICATION_FPATH,
+    docs_dir: Path = SAMPLE_PUBLICATION_DIR,
+    manifest_path: Path = MANIFEST_PATH,
+    workers: int = 1,
+    batch_size: int = BATCH_SIZE,
+) -> Dict[str, int]:
+    """
+    Ingests a publication dump.
+
+    Args:
+        path (Path): JSON array, JSON Lines or concatenated-objects dump.
+        docs_dir (Path): Directory receiving the `.txt` documents.
+        manifest_path (Path): Document manifest to update.
+        workers (int): Processes applying batches in parallel (1: inline).
+        batch_size (int): Records per batch and manifest transaction.
+
+    Returns:
+        dict: Record counts per status (`new`, `changed`, `unchanged`, `duplicate`, `invalid`).
+    """
+    docs_dir = Path(docs_dir)
+    docs_dir.mkdir(parents=True, exist_ok=True)
+    DocumentManifest(manifest_path)  # create the schema once, before workers race for it
+    start = time.perf_counter()
+    totals = Counter({status: 0 for status in STATUSES})
+    batches = _batched(iter_records(Path(path)), batch_size)
+
+    if workers <= 1:
+        for batch in batches:
+            totals.update(_ingest_batch(batch, str(docs_dir), str(manifest_path)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for batch in batches:
+                if len(pending) >= 2 * workers:  # bound batches in flight, keeping memory constant
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        totals.update(future.result())
+                pending.add(pool.submit(_ingest_batch, batch, str(docs_dir), str(manifest_path)))
+            for future in pending:
+                totals.update(future.result())
+
+    logger.info(
+        f"📥 Ingested {sum(totals.values())} records from {path} in {time.perf_counter() - start:.1f}s: "
+        + ", ".join(f"{totals[s]} {s}" for s in STATUSES)
+    )
+    return dict(totals)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream a publication dump into the document corpus.")
+    parser.add_argument("input", nargs="?", default=str(PUBLICATION_FPATH), help="JSON array or JSON Lines dump.")
+    parser.add_argument("--docs-dir", default=str(SAMPLE_PUBLICATION_DIR), help="Directory of the .txt documents.")
+    parser.add_argument("--manifest", default=str(MANIFEST_PATH), help="SQLite document manifest.")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel batch processes.")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Records per batch.")
+    args = parser.parse_args(argv)
+
+    counts = ingest(Path(args.input), Path(args.docs_dir), Path(args.manifest), args.workers, args.batch_size)
+    print("📚 " + " | ".join(f"{status}: {counts[status]}" for status in STATUSES))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
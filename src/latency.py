@@ -0,0 +1,242 @@
+# latency.py
+
+"""
+Adaptive node timeouts and hedged LLM requests from observed latency.
+
+`LatencyTracker` keeps a rolling window of latencies per graph node (whole
+node runs) and per node's LLM calls. Node timeouts are derived from it:
+`TIMEOUT_P99_MULTIPLIER` × the node's p99, clamped between the node's static
+default and twice that. Observed latency can therefore extend a timeout for
+slow nodes but never cut it below the default, so a run of quick cached or
+fast-mode executions cannot starve the next LLM-backed run.
+
+`hedged_call` fires a duplicate LLM request once a call has been running
+longer than its node's p95 and returns whichever answer arrives first. A
+`HedgeBudget` caps duplicates to a fraction of all calls, bounding the
+extra cost; the losing request is cancelled if it has not started, and its
+answer is discarded otherwise.
+
+Usage:
+    python src/latency.py --simulate 200
+"""
+
+import sys
+import math
+import time
+import random
+import argparse
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, List, Optional
+
+from logger import logger
+
+
+WINDOW = 200
+MIN_SAMPLES = 20
+TIMEOUT_P99_MULTIPLIER = 3.0
+HEDGE_MIN_DELAY_S = 0.2
+HEDGE_MAX_FRACTION = 0.1  # duplicates per call, over the process lifetime
+HEDGE_BURST = 2
+
+
+def percentile(samples, q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in [0, 100])."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+# ==============================
+# Tracker
+# ==============================
+
+class LatencyTracker:
+    """
+    Rolling latency windows (ms) per key. Node runs are keyed by node name
+    (fast-mode runs, which make no LLM calls, by `"<node>:fast"`), LLM calls
+    by `"<node>:llm"`.
+
+    Args:
+        window (int): Samples kept per key.
+        min_samples (int): Samples required before percentiles are trusted.
+        hedge_min_delay_s (float): Earliest point at which a call is hedged.
+    """
+
+    def __init__(self, window: int = WINDOW, min_samples: int = MIN_SAMPLES,
+                 hedge_min_delay_s: float = HEDGE_MIN_DELAY_S):
+        self.window = window
+        self.min_samples = min_samples
+        self.hedge_min_delay_s = hedge_min_delay_s
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def record(self, key: str, ms: float) -> None:
+        with self._lock:
+            self._samples[key].append(ms)
+
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        with self._lock:
+            samples = list(self._samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return percentile(samples, q)
+
+    def node_timeout(self, node: str, default_s: int) -> int:
+        """Whole-second timeout for a node run, between `default_s` and twice that."""
+        p99 = self.percentile(node, 99)
+        if p99 is None:
+            return default_s
+        adaptive = math.ceil(TIMEOUT_P99_MULTIPLIER * p99 / 1000)
+        return int(min(max(adaptive, default_s), 2 * default_s))
+
+    def hedge_delay(self, node: str) -> Optional[float]:
+        """Seconds after which an LLM call of `node` is hedged; None while unknown."""
+        p95 = self.percentile(f"{node}:llm", 95)
+        return None if p95 is None else max(p95 / 1000, self.hedge_min_delay_s)
+
+    def snapshot(self) -> dict:
+        """Sample count and p50/p95/p99 (ms) per key."""
+        with self._lock:
+            samples = {key: list(values) for key, values in self._samples.items()}
+        return {
+            key: {"samples": len(values), **{f"p{q}": percentile(values, q) for q in (50, 95, 99)}}
+            for key, values in samples.items()
+        }
+
+
+_TRACKER = LatencyTracker()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Process-wide tracker, so successive runs (e.g. in one Streamlit server) share observations."""
+    return _TRACKER
+
+
+# ==============================
+# Hedging
+# ==============================
+
+class HedgeBudget:
+    """
+    Caps hedged duplicates at `max_fraction` of calls (plus a small burst),
+    which bounds the extra LLM cost of hedging.
+    """
+
+    def __init__(self, max_fraction: float = HEDGE_MAX_FRACTION, burst: int = HEDGE_BURST):
+        self.max_fraction = max_fraction
+        self.burst = burst
+        self.calls = 0
+        self.hedges = 0
+        self.wins = 0
+        self._lock = threading.Lock()
+
+    def count_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.hedges < self.max_fraction * self.calls + self.burst:
+                self.hedges += 1
+                return True
+            return False
+
+    def count_win(self) -> None:
+        with self._lock:
+            self.wins += 1
+
+    @property
+    def stats(self) -> dict:
+        return {"calls": self.calls, "hedges": self.hedges, "hedge_wins": self.wins}
+
+
+_HEDGE_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+
+
+def hedged_call(fn: Callable[[], object], delay_s: Optional[float], budget: HedgeBudget):
+    """
+    Runs `fn`; if it has not returned after `delay_s` and the budget allows,
+    runs a duplicate and returns the first successful result. Errors are
+    raised only when every attempt failed.
+    """
+    budget.count_call()
+    if delay_s is None:
+        return fn()
+    primary = _HEDGE_POOL.submit(fn)
+    done, _ = wait([primary], timeout=delay_s)
+    if done or not budget.try_acquire():
+        return primary.result()
+
+    logger.debug(f"🪃 Hedging a call still running after {delay_s:.2f}s")
+    hedge = _HEDGE_POOL.submit(fn)
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for loser in pending:
+                    loser.cancel()  # only succeeds if it has not started; otherwise its answer is dropped
+                if future is hedge:
+                    budget.count_win()
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+# ==============================
+# Simulation
+# ==============================
+
+def simulate(calls: int, fast_ms: float = 40, slow_ms: float = 800, slow_rate: float = 0.05,
+             hedging: bool = True, seed: int = 7) -> dict:
+    """
+    Latency of `calls` sequential calls whose latency is `fast_ms`, except a
+    `slow_rate` share of stuck calls taking `slow_ms`, with or without hedging.
+    Statistics exclude the warm-up calls that fill the latency window.
+    """
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    tracker = LatencyTracker(min_samples=10, hedge_min_delay_s=2 * fast_ms / 1000)
+    budget = HedgeBudget()
+
+    def call():
+        with lock:
+            slow = rng.random() < slow_rate
+        time.sleep((slow_ms if slow else fast_ms) / 1000)
+        return slow
+
+    observed = []
+    for i in range(tracker.min_samples + calls):
+        start = time.perf_counter()
+        delay = tracker.hedge_delay("node") if hedging else None
+        hedged_call(call, delay, budget)
+        ms = (time.perf_counter() - start) * 1000
+        tracker.record("node:llm", ms)
+        if i >= tracker.min_samples:
+            observed.append(ms)
+    return {
+        "p50_ms": round(percentile(observed, 50), 1),
+        "p95_ms": round(percentile(observed, 95), 1),
+        "p99_ms": round(percentile(observed, 99), 1),
+        **budget.stats,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate tail latency with and without hedged requests.")
+    parser.add_argument("--simulate", type=int, default=200, help="Number of simulated LLM calls.")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="Share of stuck calls.")
+    args = parser.parse_args(argv)
+
+    for hedging in (False, True):
+        result = simulate(args.simulate, slow_rate=args.slow_rate, hedging=hedging)
+        print(f"{'🪃 hedged  ' if hedging else '⏳ baseline'} {result}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+# load_test.py
+
+"""
+Concurrent load generator for the comparison pipeline.
+
+Drives K concurrent comparison sessions, each running a number of
+comparisons over rotating publication pairs and query types, and reports
+throughput plus p50/p95/p99 session latency. Two targets are supported:
+
+- `explorer`: each session owns a `PublicationExplorer` and invokes its graph.
+- `app`: each comparison runs the Streamlit script headlessly (`AppTest`),
+  selecting publications and a query and clicking "Run Comparison", so the
+  app's own per-run work (explorer construction, saving profiles) is included.
+
+By default the OpenAI and Tavily APIs are served by an in-process
+`mock_server.MockServer` with the given latency, error and rate-limit
+behaviour, so load tests cost nothing. `--no-mock` keeps the configured
+endpoints instead (e.g. a mock server started separately next to the
+Docker container).
+
+Usage:
+    python src/load_test.py --sessions 8 --iterations 3 --latency lognormal:300:0.4
+    python src/load_test.py --target app --sessions 4 --error-rate 0.05 --rate-limit 10
+"""
+
+import os
+import sys
+import json
+import time
+import itertools
+import argparse
+import threading
+from pathlib import Path
+from dataclasses import asdict, dataclass, field
+from typing import Callable, List, Optional, Sequence
+
+from paths import SAMPLE_PUBLICATION_DIR, SRC_DIR
+from latency import get_latency_tracker, percentile
+from mock_server import MockServer, add_behavior_arguments, behaviors_from_args
+from logger import logger
+
+
+QUERIES = ("Tool Usage", "Evaluation Methods", "Task Types", "Datasets", "Results")
+APP_TIMEOUT_S = 300
+
+
+@dataclass
+class SessionResult:
+    session: int
+    iteration: int
+    ok: bool
+    latency_ms: float
+    error: Optional[str] = None
+
+
+@dataclass
+class LoadReport:
+    target: str
+    sessions: int
+    comparisons: int
+    errors: int
+    wall_s: float
+    throughput_per_s: float
+    p50_ms: Optional[float]
+    p95_ms: Optional[float]
+    p99_ms: Optional[float]
+    node_latency: dict = field(default_factory=dict)
+    mock_stats: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def summarize(target: str, sessions: int, results: Sequence[SessionResult], wall_s: float,
+              node_latency: Optional[dict] = None, mock_stats: Optional[dict] = None) -> LoadReport:
+    """Throughput counts successful comparisons; percentiles cover successful ones only."""
+    latencies = [r.latency_ms for r in results if r.ok]
+    q = {f"p{p}_ms": round(percentile(latencies, p), 1) if latencies else None for p in (50, 95, 99)}
+    return LoadReport(
+        target=target,
+        sessions=sessions,
+        comparisons=len(results),
+        errors=sum(1 for r in results if not r.ok),
+        wall_s=round(wall_s, 3),
+        throughput_per_s=round(len(latencies) / wall_s, 3) if wall_s else 0.0,
+        node_latency=node_latency or {},
+        mock_stats=mock_stats or {},
+        **q,
+    )
+
+
+# ==============================
+# Workload
+# ==============================
+
+def workload(count: int, publications: Optional[List[str]] = None, queries: Sequence[str] = QUERIES):
+    """`count` (publication pair, query) combinations, rotating through pairs and queries."""
+    pubs = publications or sorted(p.name for p in Path(SAMPLE_PUBLICATION_DIR).glob("*.txt"))
+    if len(pubs) < 2:
+        raise ValueError("Load tests need at least two publications")
+    pairs = itertools.cycle(itertools.combinations(pubs, 2))
+    return [(list(next(pairs)), queries[i % len(queries)]) for i in range(count)]
+
+
+def explorer_session(fast: bool = False, fake_model: bool = False) -> Callable[[], Callable]:
+    """
+    Session factory for the `explorer` target: builds one explorer per session
+    (outside the timed region) and returns a function running one comparison.
+    """
+    def start():
+        from work_queue import build_explorer, handle_compare
+
+        explorer = build_explorer(fake_model=fake_model)
+
+        def compare(pubs: List[str], query: str) -> None:
+            paths = [str(Path(SAMPLE_PUBLICATION_DIR) / p) for p in pubs]
+            handle_compare(explorer, {"paths": paths, "query": query, "fast": fast})
+        return compare
+    return start
+
+
+def app_session(fast: bool = False, timeout_s: int = APP_TIMEOUT_S) -> Callable[[], Callable]:
+    """Session factory for the `app` target: one headless Streamlit run per comparison."""
+    def start():
+        from streamlit.testing.v1 import AppTest
+
+        def compare(pubs: List[str], query: str) -> None:
+            at = AppTest.from_file(str(SRC_DIR / "app.py"), default_timeout=timeout_s)
+            at.run()
+            at.multiselect(key="pubs").set_value(pubs)
+            next(s for s in at.selectbox if s.label == "Select a query type").set_value(query)
+            if fast:
+                next(c for c in at.checkbox if c.label.startswith("⚡ Fast compare")).check()
+            next(b for b in at.button if b.label == "🚀 Run Comparison").click()
+            at.run()
+            if at.exception:
+                raise RuntimeError(at.exception[0].value)
+            if not at.subheader or not any(h.value == "✅ Summary" for h in at.subheader):
+                raise RuntimeError("app run produced no summary")
+        return compare
+    return start
+
+
+# ==============================
+# Runner
+# ==============================
+
+def run_load(session_factory: Callable[[], Callable], sessions: int, iterations: int,
+             publications: Optional[List[str]] = None) -> tuple:
+    """
+    Runs `sessions` concurrent sessions of `iterations` comparisons each, all
+    starting together once every session is set up. Returns
+    `(results, wall seconds)`.
+    """
+    jobs = workload(sessions * iterations, publications)
+    results: List[SessionResult] = []
+    lock = threading.Lock()
+    ready = threading.Barrier(sessions + 1)
+
+    def session(index: int) -> None:
+        compare, setup_error = None, None
+        try:
+            compare = session_factory()
+        except Exception as exc:
+            setup_error = f"session setup failed: {type(exc).__name__}: {exc}"
+            logger.error(f"❌ Session {index}: {setup_error}")
+        finally:
+            ready.wait()
+        for iteration in range(iterations):
+            pubs, query = jobs[index * iterations + iteration]
+            start = time.perf_counter()
+            error = setup_error
+            try:
+                if compare is not None:
+                    compare(pubs, query)
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                logger.warning(f"⚠️ Session {index} comparison {iteration} failed: {error}")
+            result = SessionResult(index, iteration, error is None, round((time.perf_counter() - start) * 1000, 3), error)
+            with lock:
+                results.append(result)
+
+    threads = [threading.Thread(target=session, args=(i,), name=f"load-session-{i}") for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+# ==============================
+# CLI
+# ==============================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test concurrent comparison sessions against mock APIs.")
+    parser.add_argument("--target", choices=("explorer", "app"), default="explorer", help="What each session drives.")
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent sessions (K).")
+    parser.add_argument("--iterations", type=int, default=2, help="Comparisons per session.")
+    parser.add_argument("--fast", action="store_true", help="Run comparisons in fast (gazetteer) mode.")
+    parser.add_argument("--no-mock", action="store_true", help="Use the configured API endpoints instead of a local mock.")
+    parser.add_argument("--output", help="Write the JSON report to this path.")
+    add_behavior_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = None
+    if not args.no_mock:
+        chat, search = behaviors_from_args(args)
+        server = MockServer(chat, search, seed=args.seed).start()
+        os.environ.update(server.env())
+        os.environ.setdefault("OPENAI_API_KEY", "sk-mock")
+        os.environ.setdefault("TAVILY_API_KEY", "tvly-mock")
+
+    factory = app_session(args.fast) if args.target == "app" else explorer_session(args.fast)
+    logger.info(f"🏋️ Load test: {args.sessions} {args.target} sessions × {args.iterations} comparisons")
+    try:
+        results, wall_s = run_load(factory, args.sessions, args.iterations)
+    finally:
+        if server is not None:
+            server.stop()
+
+    report = summarize(
+        args.target, args.sessions, results, wall_s,
+        node_latency=get_latency_tracker().snapshot() if args.target == "explorer" else {},
+        mock_stats=server.stats() if server is not None else {},
+    )
+    print(f"🏁 {report.comparisons} comparisons ({report.errors} failed) in {report.wall_s:.1f}s "
+          f"→ {report.throughput_per_s:.2f}/s | p50 {report.p50_ms} ms | p95 {report.p95_ms} ms | p99 {report.p99_ms} ms")
+    if report.mock_stats:
+        print(f"🧪 Mock API: {report.mock_stats}")
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report.to_dict(), indent=2), encoding="utf-8")
+        logger.info(f"💾 Load report saved to {args.output}")
+    return 1 if report.errors == len(results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
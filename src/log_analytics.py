@@ -0,0 +1,405 @@
+# log_analytics.py
+
+"""
+Streaming analytics over the structured pipeline logs written by `logger.py`.
+
+Reads `logs/pipeline.log` plus its rotated (and zip-compressed) siblings one
+line at a time, rebuilds per-run timelines from the `traced_node` records in
+`explorer.py`, and reports per-node latency percentiles, error rates, timeout
+counts and the slowest runs for a time window.
+
+Usage:
+    python src/log_analytics.py --since 7d --workers 4
+    python src/log_analytics.py --since 2025-08-01 --until 2025-08-31 --json
+"""
+
+import io
+import re
+import sys
+import json
+import math
+import time
+import zipfile
+import argparse
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+
+from paths import LOGS_DIR
+
+
+# ==============================
+# Constants
+# ==============================
+
+LOG_PATTERN = "pipeline*.log*"
+NODE_ORDER = [
+    "analyze_pubs", "analyze_pub1", "analyze_pub2", "compare", "aggregate_trends",
+    "summarize", "fact_check_node", "react_agent_tool",
+]
+# Nodes that open a run (`analyze_pub1` in legacy logs)
+RUN_START_NODES = ("analyze_pubs", "analyze_pub1")
+
+# Relative width of a latency histogram bucket (~2% error on percentiles)
+BUCKET_GROWTH = 1.02
+_LOG_GROWTH = math.log(BUCKET_GROWTH)
+
+# Records written before `traced_node` existed carry no run_id; their node is
+# inferred from the completion message the node logged (see `_legacy_node`).
+# Processes that emit traced records are never inferred from, since their
+# nodes log other messages from the same functions.
+_LEGACY_MESSAGES = {
+    "📊 Comparison complete": "compare",
+    "📈 Trend aggregation complete": "aggregate_trends",
+    "📝 Summary generated": "summarize",
+    "🔍 Fact-check complete": "fact_check_node",
+    "🤖 Agent completed enrichment step": "react_agent_tool",
+}
+# Cheap per-line test that lets bulky DEBUG records skip JSON decoding; legacy
+# candidates pass on their logging function, as messages may be \u-escaped
+_LEGACY_FUNCTIONS = ("compare", "aggregate_trends", "summarize", "fact_check", "react_agent_tool")
+_PREFILTER = re.compile(
+    r'"duration_ms"|"node": "|"name": "ERROR"|"message": "\[PUB[12]\] Validated|"function": "(?:'
+    + "|".join(_LEGACY_FUNCTIONS) + r')"'
+)
+_RELATIVE = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+# ==============================
+# Aggregates
+# ==============================
+
+def bucket_index(ms: float) -> int:
+    """Histogram bucket of a latency (shared with the aggregates in `run_history.py`)."""
+    return int(math.log(ms) / _LOG_GROWTH) if ms > 1 else 0
+
+
+class LatencyHistogram:
+    """Log-bucketed, mergeable latency histogram with constant memory."""
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        index = bucket_index(ms)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.max_ms = max(self.max_ms, ms)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.count += other.count
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Approximate the q-th percentile (0-100) in milliseconds."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(BUCKET_GROWTH ** (index + 0.5), self.max_ms)
+        return self.max_ms
+
+
+@dataclass
+class NodeStats:
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def merge(self, other: "NodeStats") -> None:
+        self.calls += other.calls
+        self.errors += other.errors
+        self.timeouts += other.timeouts
+        self.latency.merge(other.latency)
+
+
+@dataclass
+class RunSummary:
+    run_id: str
+    start: float
+    end: float
+    nodes: Dict[str, float] = field(default_factory=dict)
+    failures: int = 0
+
+    def merge(self, other: "RunSummary") -> None:
+        self.start = min(self.start, other.start)
+        self.end = max(self.end, other.end)
+        self.nodes.update(other.nodes)
+        self.failures += other.failures
+
+    @property
+    def duration_s(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class LogStats:
+    files: int = 0
+    lines: int = 0
+    events: int = 0
+    error_records: int = 0
+    nodes: Dict[str, NodeStats] = field(default_factory=dict)
+    runs: Dict[str, RunSummary] = field(default_factory=dict)
+
+    def merge(self, other: "LogStats") -> None:
+        self.files += other.files
+        self.lines += other.lines
+        self.events += other.events
+        self.error_records += other.error_records
+        for name, stats in other.nodes.items():
+            self.nodes.setdefault(name, NodeStats()).merge(stats)
+        for run_id, run in other.runs.items():
+            if run_id in self.runs:
+                self.runs[run_id].merge(run)
+            else:
+                self.runs[run_id] = run
+
+
+# ==============================
+# Log Discovery & Streaming
+# ==============================
+
+def discover_log_files(logs_dir: Path, since: Optional[float] = None) -> List[Path]:
+    """
+    Lists the live and rotated pipeline logs, oldest first.
+
+    Rotated files whose last modification predates `since` cannot contain
+    records inside the window and are skipped without being opened.
+    """
+    files = [p for p in Path(logs_dir).glob(LOG_PATTERN) if p.is_file()]
+    if since is not None:
+        files = [p for p in files if p.stat().st_mtime >= since]
+    return sorted(files, key=lambda p: p.stat().st_mtime)
+
+
+def iter_log_lines(path: Path) -> Iterator[str]:
+    """Yields lines from a plain or zip-compressed log without loading it whole."""
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.namelist():
+                with archive.open(member) as raw:
+                    yield from io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+    else:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            yield from f
+
+
+def _legacy_node(record: dict) -> Optional[str]:
+    message = record.get("message", "")
+    if record.get("function") == "validate_profile":
+        if message.startswith("[PUB1] Validated"):
+            return "analyze_pub1"
+        if message.startswith("[PUB2] Validated"):
+            return "analyze_pub2"
+        return None
+    return _LEGACY_MESSAGES.get(message.strip())
+
+
+def scan_file(path: Path, since: Optional[float] = None, until: Optional[float] = None) -> LogStats:
+    """Aggregates one log file into a mergeable `LogStats`."""
+    stats = LogStats(files=1)
+    # Legacy runs are split per process/thread and started at analyze_pub1
+    legacy: Dict[Tuple[int, int], Tuple[str, float]] = {}
+    legacy_seq = 0
+    traced_processes = set()
+
+    for line in iter_log_lines(Path(path)):
+        stats.lines += 1
+        if not _PREFILTER.search(line):
+            continue
+        try:
+            record = json.loads(line)["record"]
+        except (ValueError, KeyError, TypeError):
+            continue
+
+        extra = record.get("extra") or {}
+        if "node" in extra:
+            traced_processes.add(record["process"]["id"])
+            if "duration_ms" not in extra and record["level"]["name"] != "ERROR":
+                continue  # a node's start record
+
+        ts = record["time"]["timestamp"]
+        if (since is not None and ts < since) or (until is not None and ts > until):
+            continue
+        stats.events += 1
+        if record["level"]["name"] == "ERROR":
+            stats.error_records += 1
+
+        if "duration_ms" in extra and "node" in extra:
+            node, run_id = extra["node"], extra.get("run_id") or "-"
+            duration_ms, status = float(extra["duration_ms"]), extra.get("status", "ok")
+        else:
+            node = _legacy_node(record)
+            if node is None or record["process"]["id"] in traced_processes:
+                continue
+            key = (record["process"]["id"], record["thread"]["id"])
+            run_id, last_ts = legacy.get(key, (None, None))
+            if run_id is None or node in RUN_START_NODES:
+                legacy_seq += 1
+                run_id, last_ts = f"legacy-{Path(path).name}-{legacy_seq}", None
+            legacy[key] = (run_id, ts)
+            if last_ts is None:
+                continue
+            duration_ms, status = (ts - last_ts) * 1000, "ok"
+
+        node_stats = stats.nodes.setdefault(node, NodeStats())
+        node_stats.calls += 1
+        node_stats.latency.add(duration_ms)
+        if status == "timeout":
+            node_stats.timeouts += 1
+        elif status != "ok":
+            node_stats.errors += 1
+
+        start = ts - duration_ms / 1000
+        run = stats.runs.get(run_id)
+        if run is None:
+            run = stats.runs[run_id] = RunSummary(run_id=run_id, start=start, end=ts)
+        else:
+            run.start, run.end = min(run.start, start), max(run.end, ts)
+        run.nodes[node] = duration_ms
+        if status != "ok":
+            run.failures += 1
+
+    return stats
+
+
+def analyze_logs(
+    logs_dir: Path = LOGS_DIR,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    workers: int = 1,
+) -> LogStats:
+    """
+    Scans all pipeline logs in `logs_dir`, optionally one process per file.
+
+    Args:
+        logs_dir (Path): Directory holding `pipeline.log` and its rotations.
+        since (float, optional): Window start as a UNIX timestamp.
+        until (float, optional): Window end as a UNIX timestamp.
+        workers (int): Number of worker processes; 1 scans in-process.
+
+    Returns:
+        LogStats: Merged aggregates for the window.
+    """
+    files = discover_log_files(logs_dir, since)
+    total = LogStats()
+    if workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for partial in pool.map(scan_file, files, [since] * len(files), [until] * len(files)):
+                total.merge(partial)
+    else:
+        for path in files:
+            total.merge(scan_file(path, since, until))
+    return total
+
+
+# ==============================
+# Reporting
+# ==============================
+
+def parse_time(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Parses `7d`/`12h`/`30m`/`45s` offsets or ISO dates into a UNIX timestamp."""
+    if not value:
+        return None
+    match = _RELATIVE.match(value.strip())
+    if match:
+        now = time.time() if now is None else now
+        return now - float(match.group(1)) * _UNITS[match.group(2)]
+    return datetime.fromisoformat(value).timestamp()
+
+
+def build_report(stats: LogStats, top: int = 5) -> dict:
+    """Turns merged `LogStats` into a JSON-serializable report."""
+    def _round(value):
+        return None if value is None else round(value, 1)
+
+    ordered = sorted(stats.nodes, key=lambda n: (NODE_ORDER.index(n) if n in NODE_ORDER else len(NODE_ORDER), n))
+    nodes = {}
+    for name in ordered:
+        s = stats.nodes[name]
+        nodes[name] = {
+            "calls": s.calls,
+            "p50_ms": _round(s.latency.percentile(50)),
+            "p95_ms": _round(s.latency.percentile(95)),
+            "p99_ms": _round(s.latency.percentile(99)),
+            "max_ms": _round(s.latency.max_ms),
+            "errors": s.errors,
+            "timeouts": s.timeouts,
+            "error_rate": round((s.errors + s.timeouts) / s.calls, 4) if s.calls else 0.0,
+        }
+
+    slowest = sorted(stats.runs.values(), key=lambda r: r.duration_s, reverse=True)[:top]
+    return {
+        "files": stats.files,
+        "lines": stats.lines,
+        "events": stats.events,
+        "error_records": stats.error_records,
+        "runs": len(stats.runs),
+        "nodes": nodes,
+        "slowest_runs": [
+            {
+                "run_id": r.run_id,
+                "start": datetime.fromtimestamp(r.start).isoformat(timespec="seconds"),
+                "duration_s": round(r.duration_s, 2),
+                "slowest_node": max(r.nodes, key=r.nodes.get) if r.nodes else None,
+                "failures": r.failures,
+            }
+            for r in slowest
+        ],
+    }
+
+
+def format_report(report: dict) -> str:
+    """Renders a report as a plain-text table."""
+    lines = [
+        f"📁 Files: {report['files']} | Lines: {report['lines']} | "
+        f"Events: {report['events']} | Errors: {report['error_records']} | Runs: {report['runs']}",
+        "",
+        f"{'node':<20}{'calls':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+        f"{'errors':>8}{'timeouts':>10}{'err %':>8}",
+    ]
+    for name, n in report["nodes"].items():
+        lines.append(
+            f"{name:<20}{n['calls']:>7}{n['p50_ms'] or 0:>10.0f}{n['p95_ms'] or 0:>10.0f}"
+            f"{n['p99_ms'] or 0:>10.0f}{n['max_ms'] or 0:>10.0f}{n['errors']:>8}{n['timeouts']:>10}"
+            f"{n['error_rate'] * 100:>8.1f}"
+        )
+    if report["slowest_runs"]:
+        lines += ["", "🐢 Slowest runs:"]
+        for r in report["slowest_runs"]:
+            lines.append(
+                f"  {r['run_id']:<34} {r['start']}  {r['duration_s']:>8.2f} s  "
+                f"slowest={r['slowest_node']}  failures={r['failures']}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-node latency and error analytics over pipeline logs.")
+    parser.add_argument("--logs-dir", default=str(LOGS_DIR), help="Directory containing pipeline.log and rotations.")
+    parser.add_argument("--since", help="Window start: ISO date/time or offset such as 7d, 12h, 30m.")
+    parser.add_argument("--until", help="Window end: ISO date/time or offset.")
+    parser.add_argument("--workers", type=int, default=1, help="Scan files in N parallel processes.")
+    parser.add_argument("--top", type=int, default=5, help="Number of slowest runs to list.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args(argv)
+
+    stats = analyze_logs(Path(args.logs_dir), parse_time(args.since), parse_time(args.until), args.workers)
+    report = build_report(stats, top=args.top)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
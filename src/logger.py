@@ -4,9 +4,8 @@ from loguru import logger
 import sys
 from pathlib import Path
 
-# Central log directory
+# Central log directory; the file sinks below are opened (and the directory created) on first write
 LOGS_DIR = Path("logs")
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
 # Remove default logger to avoid duplicate logs
 logger.remove()
@@ -31,6 +30,7 @@ logger.add(
     rotation="5 MB",        # allow larger file before rotation
     retention="30 days",    # keep logs for 30 days
     compression="zip",
+    delay=True,             # no file until the first record
     enqueue=True,
     serialize=True,         # structured JSON logs
     backtrace=True,
@@ -44,6 +44,7 @@ logger.add(
     rotation="1 MB",
     retention="14 days",
     compression="zip",
+    delay=True,
     enqueue=True,
     serialize=True
 )
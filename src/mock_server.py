@@ -0,0 +1,393 @@
+# mock_server.py
+
+"""
+Local HTTP server that speaks the OpenAI chat-completions and Tavily search
+APIs, for load tests that must not spend real API credit.
+
+Chat completions are answered by `fake_model.fake_answer` (profile prompts
+get the gazetteer profile of the embedded publication), searches by the
+local corpus backend. Each API has its own `MockBehavior`: a latency
+distribution with an optional stuck-call tail, an error rate (HTTP 500) and
+a token-bucket rate limit (HTTP 429 with `Retry-After`), so the explorer's
+retries, hedging and timeouts see realistic provider behaviour.
+
+Point the app at it with:
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+    TAVILY_API_URL=http://127.0.0.1:8765
+    SEARCH_BACKEND=tavily
+
+Usage:
+    python src/mock_server.py --port 8765 --latency lognormal:400:0.5 --error-rate 0.02 --rate-limit 20
+"""
+
+import sys
+import json
+import time
+import uuid
+import math
+import random
+import argparse
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from logger import logger
+
+
+DEFAULT_PORT = 8765
+LATENCY_KINDS = ("fixed", "uniform", "normal", "lognormal")
+
+
+# ==============================
+# Behaviour
+# ==============================
+
+@dataclass(frozen=True)
+class LatencyDistribution:
+    """
+    Response latency in milliseconds, parsed from specs such as `fixed:50`,
+    `uniform:20:80` (low, high), `normal:200:40` (mean, std) or
+    `lognormal:300:0.5` (median, sigma).
+    """
+
+    kind: str = "fixed"
+    params: Tuple[float, ...] = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        kind, *params = spec.strip().split(":")
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}.get(kind)
+        if expected is None or len(params) != expected:
+            raise ValueError(f"Invalid latency spec {spec!r} (kinds: {', '.join(LATENCY_KINDS)})")
+        return cls(kind, tuple(float(p) for p in params))
+
+    def sample_ms(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(*self.params))
+        median, sigma = self.params
+        return rng.lognormvariate(math.log(max(median, 1e-3)), sigma)
+
+
+@dataclass(frozen=True)
+class MockBehavior:
+    """
+    How one mocked API responds.
+
+    Attributes:
+        latency (LatencyDistribution): Latency of regular calls.
+        tail_rate (float): Share of stuck calls taking `tail_ms` instead.
+        tail_ms (float): Latency of stuck calls.
+        error_rate (float): Share of calls answered with HTTP 500.
+        rate_limit (float): Sustained requests per second; 0 disables limiting.
+        burst (int): Token-bucket size; defaults to one second of `rate_limit`.
+    """
+
+    latency: LatencyDistribution = LatencyDistribution()
+    tail_rate: float = 0.0
+    tail_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit: float = 0.0
+    burst: Optional[int] = None
+
+
+class TokenBucket:
+    """Thread-safe token bucket; `acquire` returns `(allowed, retry_after_s)`."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = float(burst or max(1, math.ceil(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Tuple[bool, float]:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True, 0.0
+            return False, (1 - self.tokens) / self.rate
+
+
+class _Endpoint:
+    """Behaviour, limiter, random draws and counters of one mocked API."""
+
+    def __init__(self, behavior: MockBehavior, seed: Optional[int]):
+        self.behavior = behavior
+        self.bucket = TokenBucket(behavior.rate_limit, behavior.burst) if behavior.rate_limit > 0 else None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0}
+
+    def admit(self) -> Tuple[Optional[int], float, float]:
+        """`(error status or None, retry-after s, latency s)` for the next call."""
+        with self._lock:
+            self.stats["requests"] += 1
+            fail = self._random.random() < self.behavior.error_rate
+            stuck = self._random.random() < self.behavior.tail_rate
+            latency_ms = self.behavior.tail_ms if stuck else self.behavior.latency.sample_ms(self._random)
+        if self.bucket is not None:
+            allowed, retry_after = self.bucket.acquire()
+            if not allowed:
+                self.count("rate_limited")
+                return 429, retry_after, 0.0
+        if fail:
+            self.count("errors")
+            return 500, 0.0, latency_ms / 1000
+        self.count("ok")
+        return None, 0.0, latency_ms / 1000
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+
+# ==============================
+# Responses
+# ==============================
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _message_text(content) -> str:
+    if isinstance(content, list):  # multi-part content
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def chat_completion(body: dict) -> dict:
+    """OpenAI chat-completion response for a request body."""
+    from fake_model import fake_answer
+
+    messages = body.get("messages") or []
+    prompt = _message_text(messages[-1].get("content")) if messages else ""
+    answer = fake_answer(prompt)
+    stop = body.get("stop") or []
+    for marker in [stop] if isinstance(stop, str) else stop:
+        answer = answer.split(marker, 1)[0]
+    prompt_tokens = sum(_approx_tokens(_message_text(m.get("content"))) for m in messages)
+    completion_tokens = _approx_tokens(answer)
+    return {
+        "id": f"chatcmpl-mock-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": answer},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+_CORPUS = None
+_CORPUS_LOCK = threading.Lock()
+
+
+def tavily_search(body: dict, started: float) -> dict:
+    """Tavily search response served from the local publication corpus."""
+    from search import CorpusSearchBackend
+
+    global _CORPUS
+    with _CORPUS_LOCK:
+        if _CORPUS is None:
+            _CORPUS = CorpusSearchBackend(max_results=20)
+    query = body.get("query", "")
+    hits = _CORPUS.search(query)[: int(body.get("max_results", 5))]
+    return {
+        "query": query,
+        "answer": None,
+        "images": [],
+        "results": [
+            {"title": hit["url"].split("://", 1)[-1], "url": hit["url"], "content": hit["content"],
+             "score": round(1 - i / (len(hits) + 1), 3), "raw_content": None}
+            for i, hit in enumerate(hits)
+        ],
+        "response_time": round(time.perf_counter() - started, 3),
+    }
+
+
+# ==============================
+# Server
+# ==============================
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_MockHTTPServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # keep the per-request access log out of stderr
+        logger.trace(f"🧪 mock {self.address_string()} {format % args}")
+
+    def _send(self, status: int, payload: dict, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send(200, self.server.mock.stats())
+        else:
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        started = time.perf_counter()
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send(400, {"error": {"message": "Request body is not JSON", "type": "invalid_request_error"}})
+            return
+        if self.path.rstrip("/") in ("/v1/chat/completions", "/chat/completions"):
+            endpoint, respond = self.server.mock.chat, lambda: chat_completion(body)
+        elif self.path.rstrip("/") == "/search":
+            endpoint, respond = self.server.mock.search, lambda: tavily_search(body, started)
+        else:
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        status, retry_after, latency_s = endpoint.admit()
+        if status == 429:
+            self._send(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                       {"Retry-After": f"{retry_after:.3f}"})
+            return
+        time.sleep(latency_s)
+        if status == 500:
+            self._send(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+            return
+        self._send(200, respond())
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    mock: "MockServer"
+
+
+class MockServer:
+    """
+    Threaded mock API server; usable as a context manager.
+
+    Args:
+        chat (MockBehavior, optional): Behaviour of `/v1/chat/completions`.
+        search (MockBehavior, optional): Behaviour of the Tavily `/search` endpoint.
+        host (str): Bind address.
+        port (int): Bind port; 0 picks a free one.
+        seed (int, optional): Seed for latency and error draws.
+    """
+
+    def __init__(self, chat: Optional[MockBehavior] = None, search: Optional[MockBehavior] = None,
+                 host: str = "127.0.0.1", port: int = 0, seed: Optional[int] = None):
+        self.chat = _Endpoint(chat or MockBehavior(), seed)
+        self.search = _Endpoint(search or MockBehavior(), None if seed is None else seed + 1)
+        self._httpd = _MockHTTPServer((host, port), _Handler)
+        self._httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that route the explorer's API calls to this server."""
+        return {
+            "OPENAI_BASE_URL": f"{self.url}/v1",
+            "TAVILY_API_URL": self.url,
+            "SEARCH_BACKEND": "tavily",
+        }
+
+    def stats(self) -> dict:
+        return {"chat": dict(self.chat.stats), "search": dict(self.search.stats)}
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True, name="mock-server")
+        self._thread.start()
+        logger.info(f"🧪 Mock API server listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+# ==============================
+# CLI
+# ==============================
+
+def add_behavior_arguments(parser: argparse.ArgumentParser) -> None:
+    """Arguments shared with `load_test.py` that configure the mocked APIs."""
+    parser.add_argument("--latency", default="lognormal:300:0.4", help="Chat latency spec, e.g. fixed:50 or lognormal:300:0.4 (ms).")
+    parser.add_argument("--search-latency", default="uniform:50:200", help="Search latency spec (ms).")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="Share of stuck chat calls.")
+    parser.add_argument("--tail-ms", type=float, default=5000, help="Latency of stuck chat calls (ms).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls answered with HTTP 500.")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Chat requests per second (0: unlimited).")
+    parser.add_argument("--burst", type=int, default=None, help="Rate-limit burst size.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for latency and error draws.")
+
+
+def behaviors_from_args(args: argparse.Namespace) -> Tuple[MockBehavior, MockBehavior]:
+    chat = MockBehavior(
+        LatencyDistribution.parse(args.latency),
+        tail_rate=args.tail_rate,
+        tail_ms=args.tail_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+    )
+    search = MockBehavior(LatencyDistribution.parse(args.search_latency), error_rate=args.error_rate)
+    return chat, search
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve mock OpenAI chat-completions and Tavily search APIs.")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (0.0.0.0 inside Docker).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Bind port.")
+    add_behavior_arguments(parser)
+    args = parser.parse_args(argv)
+
+    chat, search = behaviors_from_args(args)
+    server = MockServer(chat, search, host=args.host, port=args.port, seed=args.seed)
+    for name, value in server.env().items():
+        print(f"{name}={value}")
+    server.start()
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(f"🧪 Mock API stats: {server.stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+# model_tiers.py
+
+"""
+Per-node model configuration, latency/cost routing and tier metrics.
+
+Every graph node gets its own model tier, output cap and temperature
+(`NODE_MODEL_SETTINGS`). With routing enabled, prompts of routable nodes that
+are short enough go to the cheaper "fast" tier; the explorer falls back to
+the "strong" tier when a fast answer fails validation or the call errors.
+`TierMetrics` records calls, latency, tokens and cost per tier and estimates
+what the fast tier saved against the strong one.
+
+Environment:
+    MODEL_STRONG     Strong tier model (default gpt-3.5-turbo)
+    MODEL_FAST       Fast tier model (default gpt-4o-mini)
+    MODEL_ROUTING    1 to route short prompts to the fast tier (default 0)
+    ROUTER_SHORT_TOKENS  Prompt size up to which a prompt counts as short (default 1500)
+    NODE_TIERS       Per-node tier overrides, e.g. "summarize=fast,compare=strong"
+"""
+
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+from logger import logger
+
+
+STRONG = "strong"
+FAST = "fast"
+DEFAULT_MODELS = {STRONG: "gpt-3.5-turbo", FAST: "gpt-4o-mini"}
+ROUTER_SHORT_TOKENS = 1500
+
+# USD per 1K (input, output) tokens
+MODEL_PRICES = {
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4": (0.03, 0.06),
+}
+
+
+@dataclass(frozen=True)
+class NodeModelSettings:
+    tier: str = STRONG
+    max_tokens: Optional[int] = None
+    temperature: float = 0.0
+    routable: bool = False  # short prompts may be routed to the fast tier
+
+
+NODE_MODEL_SETTINGS = {
+    "analyze_pubs": NodeModelSettings(STRONG, max_tokens=800, routable=True),
+    "compare": NodeModelSettings(STRONG, max_tokens=900, routable=True),
+    "aggregate_trends": NodeModelSettings(STRONG, max_tokens=900),
+    "summarize": NodeModelSettings(STRONG, max_tokens=600, temperature=0.2, routable=True),
+    "fact_check_node": NodeModelSettings(STRONG, max_tokens=900, routable=True),
+    "react_agent_tool": NodeModelSettings(STRONG, max_tokens=600),
+}
+
+
+def cost_usd(model: str, input_tokens: int, output_tokens: int) -> float:
+    price_in, price_out = MODEL_PRICES.get(model, MODEL_PRICES[DEFAULT_MODELS[STRONG]])
+    return input_tokens / 1000 * price_in + output_tokens / 1000 * price_out
+
+
+# ==============================
+# Router
+# ==============================
+
+class ModelRouter:
+    """
+    Chooses a tier per call.
+
+    Args:
+        models (dict): Tier → model name.
+        node_settings (dict): Node → `NodeModelSettings`.
+        routing (bool): Send short prompts of routable nodes to the fast tier.
+        short_tokens (int): Largest prompt routed to the fast tier.
+    """
+
+    def __init__(
+        self,
+        models: Optional[Dict[str, str]] = None,
+        node_settings: Optional[Dict[str, NodeModelSettings]] = None,
+        routing: bool = False,
+        short_tokens: int = ROUTER_SHORT_TOKENS,
+    ):
+        self.models = dict(models or DEFAULT_MODELS)
+        self.node_settings = dict(NODE_MODEL_SETTINGS if node_settings is None else node_settings)
+        self.routing = routing
+        self.short_tokens = short_tokens
+
+    @classmethod
+    def from_env(cls, strong_model: Optional[str] = None) -> "ModelRouter":
+        models = {
+            STRONG: os.getenv("MODEL_STRONG", strong_model or DEFAULT_MODELS[STRONG]),
+            FAST: os.getenv("MODEL_FAST", DEFAULT_MODELS[FAST]),
+        }
+        settings = dict(NODE_MODEL_SETTINGS)
+        for item in filter(None, (s.strip() for s in os.getenv("NODE_TIERS", "").split(","))):
+            node, _, tier = item.partition("=")
+            if tier.strip() not in models:
+                logger.warning(f"⚠️ Ignoring NODE_TIERS entry {item!r} (tiers: {', '.join(models)})")
+                continue
+            settings[node.strip()] = replace(settings.get(node.strip(), NodeModelSettings()), tier=tier.strip())
+        return cls(
+            models,
+            settings,
+            routing=os.getenv("MODEL_ROUTING", "0").strip().lower() in ("1", "true", "yes"),
+            short_tokens=int(os.getenv("ROUTER_SHORT_TOKENS", ROUTER_SHORT_TOKENS)),
+        )
+
+    def settings(self, node: str) -> NodeModelSettings:
+        return self.node_settings.get(node, NodeModelSettings())
+
+    def invoke_kwargs(self, node: str) -> dict:
+        """Per-node request parameters passed to the chat model."""
+        settings = self.settings(node)
+        kwargs = {"temperature": settings.temperature}
+        if settings.max_tokens:
+            kwargs["max_tokens"] = settings.max_tokens
+        return kwargs
+
+    def route(self, node: str, prompt_tokens: int) -> str:
+        settings = self.settings(node)
+        if self.routing and settings.routable and prompt_tokens <= self.short_tokens:
+            return FAST
+        return settings.tier
+
+
+# ==============================
+# Metrics
+# ==============================
+
+class TierMetrics:
+    """Thread-safe per-tier call statistics with fast-tier savings estimates."""
+
+    def __init__(self, models: Dict[str, str]):
+        self.models = models
+        self._lock = threading.Lock()
+        self._calls = defaultdict(lambda: {"calls": 0, "latency_ms": 0.0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0})
+        self._node_tokens = defaultdict(lambda: [0, 0])
+        self.fallbacks = defaultdict(int)
+
+    def record(self, node: str, tier: str, latency_ms: float, input_tokens: int, output_tokens: int) -> None:
+        with self._lock:
+            stats = self._calls[tier]
+            stats["calls"] += 1
+            stats["latency_ms"] += latency_ms
+            stats["input_tokens"] += input_tokens
+            stats["output_tokens"] += output_tokens
+            stats["cost_usd"] += cost_usd(self.models[tier], input_tokens, output_tokens)
+            self._node_tokens[node][0] += input_tokens
+            self._node_tokens[node][1] += output_tokens
+
+    def node_tokens(self, node: str) -> tuple:
+        """Input and output tokens of `node`'s LLM calls so far."""
+        with self._lock:
+            return tuple(self._node_tokens.get(node, (0, 0)))
+
+    def record_fallback(self, node: str) -> None:
+        with self._lock:
+            self.fallbacks[node] += 1
+
+    def summary(self) -> dict:
+        """
+        Calls, mean latency, tokens and cost per tier, plus the cost the fast
+        tier saved at strong-tier prices and the mean latency it saved when
+        both tiers have been observed.
+        """
+        with self._lock:
+            tiers = {
+                tier: {
+                    "model": self.models[tier],
+                    "calls": s["calls"],
+                    "mean_latency_ms": round(s["latency_ms"] / s["calls"], 1),
+                    "input_tokens": s["input_tokens"],
+                    "output_tokens": s["output_tokens"],
+                    "cost_usd": round(s["cost_usd"], 6),
+                }
+                for tier, s in self._calls.items() if s["calls"]
+            }
+            fast = self._calls.get(FAST)
+            savings = {"cost_usd": 0.0, "latency_ms_per_call": None}
+            if fast and fast["calls"]:
+                at_strong = cost_usd(self.models[STRONG], fast["input_tokens"], fast["output_tokens"])
+                savings["cost_usd"] = round(at_strong - fast["cost_usd"], 6)
+                strong = self._calls.get(STRONG)
+                if strong and strong["calls"]:
+                    savings["latency_ms_per_call"] = round(
+                        strong["latency_ms"] / strong["calls"] - fast["latency_ms"] / fast["calls"], 1
+                    )
+            return {"tiers": tiers, "fallbacks": dict(self.fallbacks), "savings": savings}
@@ -0,0 +1,274 @@
+# normalize.py
+
+"""
+Text normalization stage applied to publications before prompting.
+
+Sample publications are raw Ready Tensor exports: markdown image links,
+`--DIVIDER--` markers, HTML table markup, code blocks, repeated headers and
+long whitespace runs. `normalize_lines` streams a document line by line and
+drops that low-information content (and, optionally, reference lists and
+appendices) so the same character budget carries more prose. `TextNormalizer`
+applies it once per document, caching the result by content hash.
+
+Usage:
+    python src/normalize.py data/sample_publications --drop-appendices
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from paths import OUTPUTS_DIR
+from logger import logger
+
+
+NORMALIZER_VERSION = 1
+NORMALIZE_CACHE_DIR = Path(OUTPUTS_DIR) / "cache" / "normalized"
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK = re.compile(r"\[([^\]]+)\]\((?:https?://|/|#)[^)]*\)")
+_HTML_BREAK = re.compile(r"<br\s*/?>|</?(?:p|tr|table|thead|tbody|h[1-6])\b[^>]*>", re.IGNORECASE)
+_HTML_TAG = re.compile(r"</?[a-zA-Z][^>]*>")
+_TABLE_RULE = re.compile(r"^\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$")
+_SPACES = re.compile(r"[ \t ]+")
+_REFERENCES = re.compile(r"^(references|bibliography|citations|works cited|sources)\b", re.IGNORECASE)
+_APPENDIX = re.compile(r"^(appendix|appendices|supplementary)\b", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class NormalizeOptions:
+    drop_code: bool = True
+    drop_references: bool = True
+    drop_appendices: bool = False
+
+    def fingerprint(self) -> str:
+        return json.dumps({"v": NORMALIZER_VERSION, **asdict(self)}, sort_keys=True)
+
+
+@dataclass
+class NormalizedText:
+    text: str
+    original_chars: int
+    chars: int
+    content_hash: str
+
+    @property
+    def ratio(self) -> float:
+        """Compression ratio (original / normalized characters)."""
+        return round(self.original_chars / max(self.chars, 1), 3)
+
+
+# ==============================
+# Streaming Normalization
+# ==============================
+
+def _clean_line(line: str) -> str:
+    line = line.replace("--DIVIDER--", "\n")
+    line = _IMAGE.sub("", line)
+    line = _LINK.sub(r"\1", line)
+    line = _HTML_BREAK.sub(" ", line)
+    line = _HTML_TAG.sub("", line)
+    return _SPACES.sub(" ", line).strip()
+
+
+def normalize_lines(lines: Iterable[str], options: NormalizeOptions = NormalizeOptions()) -> Iterator[str]:
+    """
+    Yields cleaned lines of a document, one input line at a time.
+
+    Args:
+        lines (iterable): Raw document lines (e.g. an open file).
+        options (NormalizeOptions): Which optional sections to drop.
+
+    Yields:
+        str: Non-redundant lines; blank runs are collapsed to one empty line.
+    """
+    in_code = False
+    skip_level = 0  # heading level of a dropped section, 0 when not skipping
+    seen_headings = set()
+    blank = True
+
+    for raw in lines:
+        if _FENCE.match(raw):
+            in_code = not in_code
+            if options.drop_code:
+                continue
+        if in_code and options.drop_code:
+            continue
+
+        for line in _clean_line(raw).split("\n"):
+            line = line.strip()
+            heading = _HEADING.match(line)
+            if heading:
+                level, title = len(heading.group(1)), heading.group(2).strip()
+                if skip_level and level > skip_level:
+                    continue
+                skip_level = 0
+                if (options.drop_references and _REFERENCES.match(title)) or \
+                        (options.drop_appendices and _APPENDIX.match(title)):
+                    skip_level = level
+                    continue
+                key = title.lower()
+                if key in seen_headings:
+                    continue
+                seen_headings.add(key)
+            elif skip_level:
+                continue
+
+            if _TABLE_RULE.match(line):
+                continue
+            if not line:
+                if not blank:
+                    blank = True
+                    yield ""
+                continue
+            blank = False
+            yield line
+
+
+def normalize_text(text: str, options: NormalizeOptions = NormalizeOptions()) -> NormalizedText:
+    """Normalizes a whole document and reports its compression."""
+    cleaned = "\n".join(normalize_lines(text.splitlines(), options)).strip()
+    return NormalizedText(cleaned, len(text), len(cleaned), content_hash(text, options))
+
+
+def content_hash(text: str, options: NormalizeOptions = NormalizeOptions()) -> str:
+    digest = hashlib.sha256(options.fingerprint().encode("utf-8"))
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+# ==============================
+# Cached Normalizer
+# ==============================
+
+class TextNormalizer:
+    """
+    Normalizes each distinct document once.
+
+    Results are kept in memory and, when `cache_dir` is set, on disk as
+    `<content hash>.json`, so re-runs and other processes skip the work.
+
+    Args:
+        options (NormalizeOptions): Normalization switches.
+        cache_dir (Path, optional): Persistent cache directory; None disables it.
+        enabled (bool): When False, text is passed through unchanged.
+    """
+
+    def __init__(
+        self,
+        options: NormalizeOptions = NormalizeOptions(),
+        cache_dir: Optional[Path] = NORMALIZE_CACHE_DIR,
+        enabled: bool = True,
+    ):
+        self.options = options
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.enabled = enabled
+        self._memory: Dict[str, NormalizedText] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @classmethod
+    def from_env(cls) -> "TextNormalizer":
+        """Reads `NORMALIZE_TEXT`, `NORMALIZE_DROP_REFERENCES` and `NORMALIZE_DROP_APPENDICES` (1/0)."""
+        flag = lambda name, default: os.getenv(name, default).strip().lower() not in ("0", "false", "no")
+        return cls(
+            NormalizeOptions(
+                drop_references=flag("NORMALIZE_DROP_REFERENCES", "1"),
+                drop_appendices=flag("NORMALIZE_DROP_APPENDICES", "0"),
+            ),
+            enabled=flag("NORMALIZE_TEXT", "1"),
+        )
+
+    def normalize(self, text: str, name: str = "document") -> NormalizedText:
+        if not self.enabled:
+            return NormalizedText(text, len(text), len(text), "")
+        key = content_hash(text, self.options)
+        with self._lock:
+            cached = self._memory.get(key)
+        if cached is None:
+            cached = self._load(key)
+        if cached is not None:
+            self.stats["hits"] += 1
+            return cached
+
+        self.stats["misses"] += 1
+        result = normalize_text(text, self.options)
+        logger.info(
+            f"🧹 Normalized {name}: {result.original_chars} → {result.chars} chars (ratio {result.ratio}x)"
+        )
+        with self._lock:
+            self._memory[key] = result
+        self._store(result)
+        return result
+
+    def read(self, path) -> NormalizedText:
+        with open(path, "r", encoding="utf-8") as f:
+            return self.normalize(f.read(), Path(path).stem)
+
+    def _load(self, key: str) -> Optional[NormalizedText]:
+        if self.cache_dir is None:
+            return None
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = NormalizedText(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        with self._lock:
+            self._memory[key] = result
+        return result
+
+    def _store(self, result: NormalizedText) -> None:
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_dir / f"{result.content_hash}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(asdict(result), f, ensure_ascii=False)
+            tmp.replace(self.cache_dir / f"{result.content_hash}.json")
+        except OSError as e:
+            logger.warning(f"⚠️ Could not cache normalized text: {e}")
+
+
+# ==============================
+# CLI
+# ==============================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report how much boilerplate normalization removes.")
+    parser.add_argument("path", help="A .txt publication or a directory of them.")
+    parser.add_argument("--keep-references", action="store_true", help="Keep reference lists.")
+    parser.add_argument("--drop-appendices", action="store_true", help="Drop appendices.")
+    parser.add_argument("--keep-code", action="store_true", help="Keep fenced code blocks.")
+    args = parser.parse_args(argv)
+
+    root = Path(args.path)
+    files = sorted(root.glob("*.txt")) if root.is_dir() else [root]
+    options = NormalizeOptions(
+        drop_code=not args.keep_code,
+        drop_references=not args.keep_references,
+        drop_appendices=args.drop_appendices,
+    )
+    total_in = total_out = 0
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            result = normalize_text(f.read(), options)
+        total_in += result.original_chars
+        total_out += result.chars
+        print(f"{result.original_chars:>8} → {result.chars:>8}  {result.ratio:>6.2f}x  {path.name}")
+    print(f"{total_in:>8} → {total_out:>8}  {total_in / max(total_out, 1):>6.2f}x  TOTAL ({len(files)} files)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# pages/1_History.py
+
+"""
+Streamlit page with trends over every saved comparison, read from the
+incrementally maintained aggregates of `run_history.py`, and a flowchart of
+the compiled pipeline graph colored by measured node metrics (`flowchart.py`).
+"""
+
+import sys
+from pathlib import Path
+
+import streamlit as st
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from paths import COMPARISONS_DIR
+from flowchart import HEAT_METRICS, bottleneck, collect_metrics, pipeline_topology, to_dot
+from run_history import ALL_TIME, RunHistory
+from trends import TREND_FIELDS
+
+
+st.set_page_config(page_title="Comparison History", layout="wide")
+st.title("📈 Comparison History")
+st.markdown("What users compared, and how the pipeline performed, across every saved comparison.")
+
+history = RunHistory()
+
+# 📂 Sidebar
+with st.sidebar:
+    st.header("📈 History")
+    period = st.selectbox(
+        "Period", history.periods(), key="history_period",
+        format_func=lambda p: "All time" if p == ALL_TIME else p,
+    )
+    top = st.slider("Entries per ranking", 5, 50, 10, key="history_top")
+    if st.button("🔄 Rebuild from saved comparisons"):
+        runs = history.rebuild(COMPARISONS_DIR)
+        st.success(f"✅ Rebuilt from {runs} saved comparisons in `outputs/comparisons/`")
+
+runs = history.run_count(period)
+st.metric("Comparisons", runs)
+if not runs:
+    st.info("⚠️ No comparisons saved for this period yet. Run one on the main page, or rebuild from saved comparisons.")
+    st.stop()
+
+# 🏷️ Entities
+st.subheader("🏷️ Most Compared Entities")
+labels = {"tools": "🛠️ Tools", "datasets": "🗂️ Datasets", "evaluation_methods": "📏 Evaluation Methods", "task_types": "🎯 Task Types"}
+for column, field_name in zip(st.columns(len(TREND_FIELDS)), TREND_FIELDS):
+    with column:
+        st.markdown(f"**{labels.get(field_name, field_name)}**")
+        entities = history.top_entities(field_name, period, top)
+        if entities:
+            st.dataframe([{"Entity": e["entity"], "Profiles": e["count"]} for e in entities], hide_index=True)
+        else:
+            st.caption("None yet")
+
+# 🧠 Queries & pairs
+queries_column, pairs_column = st.columns(2)
+with queries_column:
+    st.subheader("🧠 Query Types")
+    st.dataframe([{"Query": q["query"], "Runs": q["runs"]} for q in history.query_counts(period)], hide_index=True)
+with pairs_column:
+    st.subheader("🔗 Popular Pairs")
+    st.dataframe(
+        [{"Publication A": p["publications"][0], "Publication B": p["publications"][1], "Runs": p["runs"]}
+         for p in history.top_pairs(period, top)],
+        hide_index=True,
+    )
+
+# 🗺️ Pipeline heatmap
+st.subheader("🗺️ Pipeline Heatmap")
+heat_column, logs_column = st.columns(2)
+with heat_column:
+    heat = st.selectbox("Color nodes by", list(HEAT_METRICS), format_func=HEAT_METRICS.get, key="history_heat")
+with logs_column:
+    with_logs = st.checkbox(
+        "Include failures from pipeline logs", key="history_logs",
+        help="Runs that failed are never saved; `logs/pipeline.log` still records them. Scanning the logs takes longer.",
+    )
+topology = pipeline_topology()
+metrics = collect_metrics(period, history, logs=with_logs)
+hottest = bottleneck(metrics, heat)
+if hottest:
+    st.warning(f"Bottleneck: `{hottest[0]}` ({HEAT_METRICS[heat]}, {hottest[1]:.0%} of the pipeline total)", icon="🐢")
+st.graphviz_chart(to_dot(topology, metrics, heat))
+
+# ⏱️ Nodes
+st.subheader("⏱️ Node Latency")
+stats = history.node_stats(period)
+nodes = {n: stats[n] for n in topology.steps if n in stats} | {n: s for n, s in stats.items() if n not in topology.steps}
+if nodes:
+    st.dataframe(
+        [
+            {
+                "Node": node,
+                "Runs": s["calls"],
+                "p50 (ms)": s["p50_ms"],
+                "p95 (ms)": s["p95_ms"],
+                "Mean (ms)": s["mean_ms"],
+                "Failure rate": f"{s['failure_rate']:.1%}",
+                "Tokens in/out": f"{s['input_tokens']}/{s['output_tokens']}",
+            }
+            for node, s in nodes.items()
+        ],
+        hide_index=True,
+    )
+else:
+    st.caption("No node timings recorded for this period (comparisons saved before the history existed carry none).")
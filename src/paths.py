@@ -23,9 +23,14 @@ OUTPUTS_DIR = ROOT_DIR / "outputs"
 
 PROFILES_DIR = OUTPUTS_DIR / "profiles"
 COMPARISONS_DIR = OUTPUTS_DIR / "comparisons"
+CASSETTES_DIR = OUTPUTS_DIR / "cassettes"
+CORPUS_DIR = OUTPUTS_DIR / "corpus"
+HISTORY_DIR = OUTPUTS_DIR / "history"
+RUN_PROFILES_DIR = OUTPUTS_DIR / "run_profiles"
 TESTS_DIR = ROOT_DIR / "tests"
 
-#PUBLICATION_FPATH = DATA_DIR / "project_1_publications.json"
+PUBLICATION_FPATH = DATA_DIR / "project_1_publications.json"
+GOLD_PROFILES_FPATH = DATA_DIR / "gold_profiles.json"
 DOCS_DIR = ROOT_DIR / "docs"
 SRC_DIR = ROOT_DIR / "src"
 RAILS_DIR = SRC_DIR / "rails"
@@ -57,5 +62,9 @@ if __name__ == "__main__":
     print(f"LOGS_DIR: {LOGS_DIR}")
     print(f"PROFILES_DIR:{PROFILES_DIR}")
     print(f"COMPARISONS_DIR: {COMPARISONS_DIR}")      
+    print(f"CASSETTES_DIR: {CASSETTES_DIR}")
+    print(f"CORPUS_DIR: {CORPUS_DIR}")
+    print(f"RUN_PROFILES_DIR: {RUN_PROFILES_DIR}")
+    print(f"PUBLICATION_FPATH: {PUBLICATION_FPATH}")
     print(f"TESTS_DIR: {TESTS_DIR}") 
    
@@ -0,0 +1,361 @@
+# profile_diff.py
+
+"""
+Deterministic structural diff of publication profiles.
+
+`diff_profiles` matches entities across any number of profiles with
+normalized, alias-aware and fuzzy comparison ("HF Transformers" ≈
+"HuggingFace Transformers", "sklearn" ≈ "scikit-learn") and reports, per
+field, the entities shared by all publications, shared by some, unique to
+one, and conflicting versions of the same entity ("Python 3.8" vs
+"Python 3.10"). The compare node sends this compact diff to the LLM instead
+of the raw profiles, and fast runs use it as the comparison outright.
+
+Usage:
+    python src/profile_diff.py --benchmark --pairs 50
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+from pathlib import Path
+from difflib import SequenceMatcher
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from paths import PROFILES_DIR
+from trends import CORPUS_PROFILES_PATH, normalize_entity
+
+
+DIFF_FIELDS = ("tools", "datasets", "evaluation_methods", "task_types")
+# Fields where one name at two versions is a conflict (datasets like SST-2/SST-5 are distinct)
+CONFLICT_FIELDS = ("tools",)
+FUZZY_THRESHOLD = 0.88
+
+# Alias → canonical spelling, applied to whole words/phrases of a normalized name
+ALIASES = {
+    "hf": "huggingface",
+    "hugging face": "huggingface",
+    "sklearn": "scikit learn",
+    "scikitlearn": "scikit learn",
+    "torch": "pytorch",
+    "gpt4": "gpt 4",
+    "gpt4o": "gpt 4o",
+    "chatgpt": "gpt 3.5",
+    "llms": "llm",
+    "large language models": "llm",
+    "large language model": "llm",
+    "auc roc": "roc auc",
+    "area under the curve": "auc",
+    "f1 score": "f1",
+    "f1score": "f1",
+    "accuracy score": "accuracy",
+    "mean squared error": "mse",
+    "root mean squared error": "rmse",
+    "mean absolute error": "mae",
+}
+# Canonical name → what it is usually short for
+EXPANSIONS = {
+    "tf": "tensorflow",
+    "transformers": "huggingface transformers",
+    "openai": "openai api",
+}
+
+_SEPARATORS = re.compile(r"[\s_\-/]+")
+_PUNCT = re.compile(r"[^\w+#.\s]")
+_ALIAS_RE = re.compile(
+    r"\b(" + "|".join(re.escape(a) for a in sorted(ALIASES, key=len, reverse=True)) + r")\b"
+)
+_VERSION = re.compile(r"\bv?\d+(?:\.\d+)*[a-z]?\b")
+
+
+def canonical_entity(name: str) -> str:
+    """Normalized, alias-resolved key of an entity name."""
+    key = normalize_entity(name)
+    key = _PUNCT.sub(" ", key)
+    key = _SEPARATORS.sub(" ", key).strip(" .")
+    key = _ALIAS_RE.sub(lambda m: ALIASES[m.group(1)], key)
+    return EXPANSIONS.get(key, key)
+
+
+def _split_version(key: str) -> Tuple[str, str]:
+    versions = _VERSION.findall(key)
+    base = _VERSION.sub(" ", key)
+    return " ".join(base.split()), " ".join(versions)
+
+
+def _similar(a: str, b: str) -> bool:
+    a, b = a.replace(" ", ""), b.replace(" ", "")
+    if not a or not b:
+        return False
+    return SequenceMatcher(None, a, b).ratio() >= FUZZY_THRESHOLD
+
+
+def entities_match(a: str, b: str) -> bool:
+    """Whether two entity names match: same canonical key, or fuzzily similar keys."""
+    a, b = canonical_entity(a), canonical_entity(b)
+    return a == b or _similar(a, b)
+
+
+# ==============================
+# Diff Structures
+# ==============================
+
+@dataclass
+class FieldDiff:
+    shared: List[str] = field(default_factory=list)
+    partial: List[Tuple[str, List[str]]] = field(default_factory=list)
+    unique: Dict[str, List[str]] = field(default_factory=dict)
+    conflicts: List[Dict[str, object]] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not (self.shared or self.partial or any(self.unique.values()) or self.conflicts)
+
+
+@dataclass
+class ProfileDiff:
+    names: List[str]
+    fields: Dict[str, FieldDiff]
+    results: Dict[str, List[str]]
+
+    def to_dict(self) -> dict:
+        return {
+            "publications": self.names,
+            "fields": {
+                f: {
+                    "shared": d.shared,
+                    "partial": [{"entity": e, "publications": pubs} for e, pubs in d.partial],
+                    "unique": d.unique,
+                    "conflicts": d.conflicts,
+                }
+                for f, d in self.fields.items()
+            },
+            "results": self.results,
+        }
+
+    def to_text(self, fields: Optional[Sequence[str]] = None) -> str:
+        """
+        Compact, line-oriented rendering used in prompts and as the fast-mode
+        comparison. Publications are named once in a legend and referred to
+        as pub1, pub2, ... afterwards, so long titles are not repeated.
+        """
+        labels = {n: f"pub{i}" for i, n in enumerate(self.names, start=1)}
+
+        def refer(pubs):
+            return ", ".join(labels.get(p, p) for p in pubs)
+
+        lines = ["Publications: " + "; ".join(f"{labels[n]} = {n}" for n in self.names)]
+        for f in fields or self.fields:
+            d = self.fields.get(f)
+            if d is None:
+                continue
+            lines.append(f"{f}:")
+            if d.is_empty():
+                lines.append("  none reported")
+                continue
+            if d.shared:
+                lines.append(f"  shared by all: {', '.join(d.shared)}")
+            for entity, pubs in d.partial:
+                lines.append(f"  {entity}: only {refer(pubs)}")
+            for pub, entities in d.unique.items():
+                if entities:
+                    lines.append(f"  only {refer([pub])}: {', '.join(entities)}")
+            for conflict in d.conflicts:
+                values = "; ".join(f"{refer([pub])}: {v}" for pub, v in conflict["values"].items())
+                lines.append(f"  conflicting {conflict['entity']}: {values}")
+        if any(self.results.values()):
+            lines.append("results:")
+            for pub, results in self.results.items():
+                if results:
+                    lines.append(f"  {refer([pub])}: {'; '.join(results)}")
+        return "\n".join(lines)
+
+
+# ==============================
+# Matching
+# ==============================
+
+def _entities(profile, field_name: str) -> List[str]:
+    if not isinstance(profile, dict):
+        return []
+    values = profile.get(field_name) or []
+    values = values if isinstance(values, list) else [values]
+    return [str(v).strip() for v in values if str(v).strip()]
+
+
+def _diff_field(names: List[str], profiles: Sequence, field_name: str) -> FieldDiff:
+    # Cluster entities of all publications by canonical key, merging fuzzy matches
+    clusters: List[dict] = []
+    by_key: Dict[str, dict] = {}
+    for pub, profile in zip(names, profiles):
+        for surface in _entities(profile, field_name):
+            key = canonical_entity(surface)
+            if not key:
+                continue
+            cluster = by_key.get(key)
+            if cluster is None:
+                base, version = _split_version(key)
+                cluster = next(
+                    (c for c in clusters
+                     if c["version"] == version and _similar(c["base"], base)),
+                    None,
+                )
+                if cluster is None:
+                    cluster = {"key": key, "base": base, "version": version, "pubs": {}}
+                    clusters.append(cluster)
+                by_key[key] = cluster
+            cluster["pubs"].setdefault(pub, surface)
+
+    result = FieldDiff(unique={pub: [] for pub in names})
+
+    # Same entity at different versions in different publications
+    conflicted = set()
+    by_base: Dict[str, List[dict]] = {}
+    if field_name in CONFLICT_FIELDS:
+        for cluster in clusters:
+            if cluster["version"]:
+                by_base.setdefault(cluster["base"], []).append(cluster)
+    for group in by_base.values():
+        pubs = {pub for c in group for pub in c["pubs"]}
+        if len(group) > 1 and len(pubs) > 1 and not any(len(c["pubs"]) == len(pubs) for c in group):
+            values = {}
+            for c in group:
+                for pub, surface in c["pubs"].items():
+                    values.setdefault(pub, surface)
+            label = " ".join(_VERSION.sub(" ", next(iter(values.values()))).split())
+            result.conflicts.append({"entity": label, "values": values})
+            conflicted.update(id(c) for c in group)
+
+    for cluster in clusters:
+        if id(cluster) in conflicted:
+            continue
+        label = next(iter(cluster["pubs"].values()))
+        pubs = [pub for pub in names if pub in cluster["pubs"]]
+        if len(pubs) == len(names) and len(names) > 1:
+            result.shared.append(label)
+        elif len(pubs) > 1:
+            result.partial.append((label, pubs))
+        else:
+            result.unique[pubs[0]].append(label)
+    return result
+
+
+def diff_profiles(names: Sequence[str], profiles: Sequence, fields: Sequence[str] = DIFF_FIELDS) -> ProfileDiff:
+    """
+    Structural diff of N profiles.
+
+    Args:
+        names (list): Display name per publication.
+        profiles (list): Validated profile dicts (non-dicts count as empty).
+        fields (list): Profile fields to diff; `results` is passed through.
+
+    Returns:
+        ProfileDiff: Shared / partial / unique / conflicting entities per field.
+    """
+    names = list(names)
+    return ProfileDiff(
+        names=names,
+        fields={f: _diff_field(names, profiles, f) for f in fields},
+        results={pub: _entities(profile, "results") for pub, profile in zip(names, profiles)},
+    )
+
+
+# ==============================
+# Benchmark
+# ==============================
+
+def _load_profiles(path: Optional[Path]) -> List[Tuple[str, dict]]:
+    if path and path.suffix == ".json" and path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f).get("profiles", {})
+        return [(r.get("title") or pid, r["profile"]) for pid, r in records.items() if isinstance(r.get("profile"), dict)]
+    profiles = []
+    for file in sorted(Path(path or PROFILES_DIR).glob("*.json")):
+        with open(file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            profiles.append((file.stem, data))
+    return profiles
+
+
+def benchmark(profiles: List[Tuple[str, dict]], pairs: int = 50, live: bool = False, seed: int = 0) -> dict:
+    """
+    Compares the compare-node payload of today's path (raw profiles) with the
+    structural diff: prompt tokens, local diff latency and, with `live`, the
+    LLM latency of both prompts.
+    """
+    from prompt_budget import PromptBudgeter
+
+    budgeter = PromptBudgeter()
+    rng = random.Random(seed)
+    samples = [rng.sample(profiles, 2) for _ in range(pairs)]
+    raw_tokens, diff_tokens, diff_us = [], [], []
+    prompts = []
+    for (name_a, a), (name_b, b) in samples:
+        raw = f"Publication 1 Attributes:\n{a}\n\nPublication 2 Attributes:\n{b}"
+        start = time.perf_counter()
+        diff = diff_profiles([name_a, name_b], [a, b]).to_text()
+        diff_us.append((time.perf_counter() - start) * 1e6)
+        raw_tokens.append(budgeter.count(raw))
+        diff_tokens.append(budgeter.count(diff))
+        prompts.append((raw, diff))
+
+    report = {
+        "pairs": len(samples),
+        "tokenizer": budgeter.tokenizer.name,
+        "raw_prompt_tokens_mean": round(statistics.mean(raw_tokens), 1),
+        "diff_prompt_tokens_mean": round(statistics.mean(diff_tokens), 1),
+        "token_reduction": round(1 - sum(diff_tokens) / max(sum(raw_tokens), 1), 3),
+        "diff_latency_us_p50": round(statistics.median(diff_us), 1),
+        "diff_latency_us_max": round(max(diff_us), 1),
+    }
+    if live:
+        from langchain_openai import ChatOpenAI
+        from langchain_core.messages import SystemMessage
+
+        model = ChatOpenAI(model=budgeter.model, temperature=0)
+        header = "Compare the research publications on tools, evaluation methods, task types, datasets and results.\n\n"
+        for label, index in (("raw", 0), ("diff", 1)):
+            latencies = []
+            for pair in prompts[:5]:
+                start = time.perf_counter()
+                model.invoke([SystemMessage(content=header + pair[index])])
+                latencies.append((time.perf_counter() - start) * 1000)
+            report[f"{label}_llm_latency_ms_mean"] = round(statistics.mean(latencies), 1)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Diff publication profiles or benchmark the diff against raw profiles.")
+    parser.add_argument("profiles", nargs="*", help="Profile JSON files to diff.")
+    parser.add_argument("--benchmark", action="store_true", help="Benchmark prompt size and latency.")
+    parser.add_argument("--source", default=None, help="Corpus profile store or directory of profile JSON files.")
+    parser.add_argument("--pairs", type=int, default=50, help="Random profile pairs to benchmark.")
+    parser.add_argument("--live", action="store_true", help="Also time real LLM calls (needs OPENAI_API_KEY).")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        source = Path(args.source) if args.source else (CORPUS_PROFILES_PATH if CORPUS_PROFILES_PATH.exists() else None)
+        profiles = _load_profiles(source)
+        if len(profiles) < 2:
+            print("Need at least two profiles (run `python src/corpus.py` or the app first).")
+            return 1
+        print(json.dumps(benchmark(profiles, args.pairs, args.live), indent=2))
+        return 0
+
+    if len(args.profiles) < 2:
+        parser.error("pass at least two profile JSON files, or --benchmark")
+    loaded = []
+    for path in args.profiles:
+        with open(path, "r", encoding="utf-8") as f:
+            loaded.append(json.load(f))
+    print(diff_profiles([Path(p).stem for p in args.profiles], loaded).to_text())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# profile_store.py
+
+"""
+Field-level store of extracted publication profiles for lazy extraction.
+
+Single-aspect queries ("Datasets", "Evaluation Methods") need one of the five
+profile fields, yet a full extraction asks the LLM for all of them.
+`extraction_fields_for_query` maps a query to the fields it needs, and
+`ProfileStore` keeps every field extracted so far per document, so later
+queries merge the cached fields and only request the missing ones.
+
+Entries are keyed by the normalized publication text and the extraction
+model, kept in memory and, when `cache_dir` is set, on disk as
+`outputs/cache/profiles/<key>.json`.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from paths import OUTPUTS_DIR
+from logger import logger
+
+
+PROFILE_FIELDS = ("tools", "evaluation_methods", "datasets", "task_types", "results")
+PROFILE_STORE_VERSION = 1
+PROFILE_CACHE_DIR = Path(OUTPUTS_DIR) / "cache" / "profiles"
+
+# Fields a UI query type needs extracted; custom queries extract all of them.
+# `trends.QUERY_FIELDS` is the different mapping of which fields a query's trends cover.
+EXTRACTION_FIELDS = {
+    "tool usage": ("tools",),
+    "evaluation methods": ("evaluation_methods",),
+    "task types": ("task_types",),
+    "datasets": ("datasets",),
+    "results": ("results",),
+}
+
+
+def extraction_fields_for_query(query: str) -> Tuple[str, ...]:
+    return EXTRACTION_FIELDS.get(" ".join(str(query or "").lower().split()), PROFILE_FIELDS)
+
+
+class ProfileStore:
+    """
+    Partial profiles per document, merged field by field.
+
+    Args:
+        model (str): Extraction model; profiles of other models are not reused.
+        cache_dir (Path, optional): Persistent cache directory; None disables it.
+    """
+
+    def __init__(self, model: str, cache_dir: Optional[Path] = PROFILE_CACHE_DIR):
+        self.model = model
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._memory: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.stats = {"cached_fields": 0, "extracted_fields": 0}
+
+    @classmethod
+    def from_env(cls, model: str) -> "ProfileStore":
+        """Reads `PROFILE_CACHE` (1/0) to enable the on-disk cache."""
+        enabled = os.getenv("PROFILE_CACHE", "1").strip().lower() not in ("0", "false", "no")
+        return cls(model, PROFILE_CACHE_DIR if enabled else None)
+
+    def key(self, text: str) -> str:
+        digest = hashlib.sha256(f"{PROFILE_STORE_VERSION}:{self.model}:".encode("utf-8"))
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()[:20]
+
+    def get(self, text: str) -> dict:
+        """Every field extracted so far for `text` (possibly none)."""
+        key = self.key(text)
+        with self._lock:
+            cached = self._memory.get(key)
+        if cached is None:
+            cached = self._load(key)
+        return dict(cached or {})
+
+    def missing(self, text: str, fields: Iterable[str]) -> Tuple[dict, Tuple[str, ...]]:
+        """Cached fields of `text` and the requested fields still to extract."""
+        cached = self.get(text)
+        missing = tuple(f for f in fields if f not in cached)
+        with self._lock:
+            self.stats["cached_fields"] += sum(1 for f in fields if f in cached)
+            self.stats["extracted_fields"] += len(missing)
+        return cached, missing
+
+    def merge(self, text: str, fields: dict) -> dict:
+        """Adds newly extracted fields to the stored profile and returns the merged profile."""
+        key = self.key(text)
+        current = self.get(text)
+        with self._lock:
+            merged = {**self._memory.get(key, current), **fields}
+            self._memory[key] = merged
+        self._store(key, merged)
+        return dict(merged)
+
+    def _load(self, key: str) -> Optional[dict]:
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self.cache_dir / f"{key}.json", "r", encoding="utf-8") as f:
+                profile = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(profile, dict):
+            return None
+        with self._lock:
+            self._memory.setdefault(key, profile)
+        return profile
+
+    def _store(self, key: str, profile: dict) -> None:
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_dir / f"{key}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(profile, f, ensure_ascii=False)
+            tmp.replace(self.cache_dir / f"{key}.json")
+        except OSError as e:
+            logger.warning(f"⚠️ Could not cache profile fields: {e}")
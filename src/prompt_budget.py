@@ -0,0 +1,191 @@
+# prompt_budget.py
+
+"""
+Tokenizer-accurate prompt budgeting.
+
+`PromptBudgeter` counts tokens with the target model's tokenizer (memoized
+per text), shares a node's token budget across its variable passages
+(publication text, profiles, intermediate answers) and truncates each on
+token and sentence boundaries. Every prompt is checked against the model's
+context window before it is sent, so oversized requests fail locally with
+`PromptBudgetExceeded` instead of at the API.
+"""
+
+import os
+import re
+import functools
+from typing import Dict, List, Optional, Sequence
+
+from logger import logger
+
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+RESERVED_OUTPUT_TOKENS = 1024
+MESSAGE_OVERHEAD_TOKENS = 7  # role/separator tokens of a single chat message
+
+# Prompt budgets per graph node (whole prompt, excluding reserved output)
+NODE_TOKEN_BUDGETS = {
+    "analyze_pubs": 3500,
+    "compare": 2500,
+    "aggregate_trends": 3000,
+    "summarize": 2500,
+    "fact_check_node": 8000,
+    "react_agent_tool": 2000,
+}
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+class PromptBudgetExceeded(ValueError):
+    """Raised when a prompt would not fit the model context window."""
+
+
+# ==============================
+# Tokenizers
+# ==============================
+
+class ApproxTokenizer:
+    """
+    Offline stand-in for BPE tokenizers: words split into chunks of up to six
+    letters (with their leading space), numbers into groups of three digits and
+    other characters one by one, which tracks cl100k counts on English prose.
+    Decoding is lossless.
+    """
+
+    name = "approx"
+    _PIECE = re.compile(r" ?[^\W\d_]{1,6}| ?\d{1,3}| ?\S|\s+")
+
+    def encode(self, text: str) -> List[str]:
+        return self._PIECE.findall(text)
+
+    def decode(self, tokens: Sequence[str]) -> str:
+        return "".join(tokens)
+
+
+class TiktokenTokenizer:
+    """The model's own BPE encoding via `tiktoken`."""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self.name = encoding.name
+
+    def encode(self, text: str) -> List[int]:
+        return self.encoding.encode(text, disallowed_special=())
+
+    def decode(self, tokens: Sequence[int]) -> str:
+        return self.encoding.decode(list(tokens))
+
+
+@functools.lru_cache(maxsize=None)
+def get_tokenizer(model: str = DEFAULT_MODEL):
+    """
+    Tokenizer for `model`. `TOKENIZER=approx` forces the offline approximation,
+    which is also used when tiktoken or its encoding files are unavailable.
+    """
+    if os.getenv("TOKENIZER", "").lower() != "approx":
+        try:
+            import tiktoken
+            return TiktokenTokenizer(tiktoken.encoding_for_model(model))
+        except Exception as e:
+            logger.warning(f"⚠️ tiktoken unavailable for {model} ({type(e).__name__}); using approximate token counts")
+    return ApproxTokenizer()
+
+
+# ==============================
+# Budgeter
+# ==============================
+
+class PromptBudgeter:
+    """
+    Allocates and enforces token budgets for one model.
+
+    Args:
+        model (str): Target chat model; selects tokenizer and context window.
+        reserve_output (int): Tokens kept free for the completion.
+        node_budgets (dict): Prompt budget per graph node.
+    """
+
+    def __init__(
+        self,
+        model: str = DEFAULT_MODEL,
+        reserve_output: int = RESERVED_OUTPUT_TOKENS,
+        node_budgets: Optional[Dict[str, int]] = None,
+        tokenizer=None,
+    ):
+        self.model = model
+        self.tokenizer = tokenizer or get_tokenizer(model)
+        self.limit = CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW) - reserve_output
+        self.node_budgets = dict(NODE_TOKEN_BUDGETS if node_budgets is None else node_budgets)
+        # Documents are re-counted by several nodes of a run; encode each text once
+        self._encode = functools.lru_cache(maxsize=512)(lambda text: tuple(self.tokenizer.encode(text)))
+
+    def count(self, text: str) -> int:
+        return len(self._encode(text))
+
+    def budget(self, node: str) -> int:
+        return min(self.node_budgets.get(node, self.limit), self.limit)
+
+    def available(self, node: str, *fixed: str) -> int:
+        """Tokens left for variable passages after the node's fixed prompt text."""
+        used = MESSAGE_OVERHEAD_TOKENS + sum(self.count(text) for text in fixed)
+        return max(self.budget(node) - used, 0)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cuts `text` to `max_tokens`, preferring the last sentence boundary in the final 20%."""
+        tokens = self._encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        if max_tokens <= 0:
+            return ""
+        head = self.tokenizer.decode(tokens[:max_tokens])
+        ends = [m.start() for m in _SENTENCE_END.finditer(head)]
+        if ends and ends[-1] >= 0.8 * len(head):
+            return head[:ends[-1]].rstrip()
+        return head.rstrip()
+
+    @staticmethod
+    def allocate(sizes: Sequence[int], budget: int) -> List[int]:
+        """
+        Water-fills `budget` over passages of the given token sizes: short
+        passages keep everything, the rest share what remains equally.
+        """
+        shares = [0] * len(sizes)
+        remaining, open_ = budget, sorted(range(len(sizes)), key=lambda i: sizes[i])
+        while open_:
+            share = remaining // len(open_)
+            i = open_[0]
+            if sizes[i] <= share:
+                shares[i] = sizes[i]
+                remaining -= sizes[i]
+                open_.pop(0)
+            else:
+                for j in open_:
+                    shares[j] = share
+                break
+        return shares
+
+    def fit(self, passages: Sequence[str], budget: int) -> List[str]:
+        """Truncates passages so their combined token count fits `budget`."""
+        sizes = [self.count(p) for p in passages]
+        if sum(sizes) <= budget:
+            return list(passages)
+        return [self.truncate(p, share) for p, share in zip(passages, self.allocate(sizes, budget))]
+
+    def check(self, prompt: str, node: str = "prompt") -> int:
+        """Returns the prompt's token count; raises `PromptBudgetExceeded` if it cannot fit the model."""
+        tokens = self.count(prompt) + MESSAGE_OVERHEAD_TOKENS
+        if tokens > self.limit:
+            raise PromptBudgetExceeded(
+                f"{node} prompt has {tokens} tokens, over the {self.limit}-token limit of {self.model}"
+            )
+        if tokens > self.budget(node):
+            logger.warning(f"⚠️ {node} prompt uses {tokens} tokens (budget {self.budget(node)})")
+        return tokens
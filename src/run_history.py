@@ -0,0 +1,425 @@
+# run_history.py
+
+"""
+Incrementally maintained aggregates over the history of saved comparisons.
+
+Every comparison the app saves is folded into a small SQLite database as
+soon as it is written. The database keeps one row per aggregate key, so
+reading it costs the same however long the history grows:
+
+- entity counts per profile field (how many compared profiles name a tool,
+  dataset, evaluation method or task type);
+- runs per query type;
+- pair popularity (how often two publications were compared together);
+- per-node calls, failures, tokens and a log-bucketed latency histogram
+  (p50/p95 without keeping individual samples).
+
+Each aggregate is kept per month (`YYYY-MM`) and for all time. The raw
+comparison JSON files in `outputs/comparisons/` stay the source of truth:
+`--rebuild` recomputes every table from them, including files saved before
+this module existed.
+
+Usage:
+    python src/run_history.py --rebuild
+    python src/run_history.py --period 2026-10 --field tools --top 10
+"""
+
+import re
+import sys
+import json
+import sqlite3
+import argparse
+import itertools
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from paths import COMPARISONS_DIR, HISTORY_DIR
+from sqlite_store import SQLiteStore
+from log_analytics import LatencyHistogram, bucket_index
+from trends import TREND_FIELDS, normalize_entity
+from logger import logger
+
+
+HISTORY_PATH = HISTORY_DIR / "run_history.sqlite3"
+ALL_TIME = "all"
+LEDGER_RUNS = 64
+_TIMESTAMP = re.compile(r"_(\d{8}_\d{6})$")
+# Graph-state keys of comparisons saved before the `run` block existed
+_STATE_KEYS = {"pub_paths", "pub1_path", "pub2_path", "user_query", "profiles", "pub1_profile", "pub2_profile"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    saved_at TEXT NOT NULL,
+    query TEXT NOT NULL,
+    publications TEXT NOT NULL,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS entity_counts (
+    period TEXT NOT NULL,
+    field TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    label TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    PRIMARY KEY (period, field, entity)
+);
+CREATE INDEX IF NOT EXISTS entity_counts_top ON entity_counts (period, field, runs DESC);
+CREATE TABLE IF NOT EXISTS query_counts (
+    period TEXT NOT NULL,
+    query TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    PRIMARY KEY (period, query)
+);
+CREATE TABLE IF NOT EXISTS pair_counts (
+    period TEXT NOT NULL,
+    pub_a TEXT NOT NULL,
+    pub_b TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    PRIMARY KEY (period, pub_a, pub_b)
+);
+CREATE INDEX IF NOT EXISTS pair_counts_top ON pair_counts (period, runs DESC);
+CREATE TABLE IF NOT EXISTS node_stats (
+    period TEXT NOT NULL,
+    node TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    total_ms REAL NOT NULL,
+    max_ms REAL NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    PRIMARY KEY (period, node)
+);
+CREATE TABLE IF NOT EXISTS node_latency (
+    period TEXT NOT NULL,
+    node TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (period, node, bucket)
+);
+"""
+_AGGREGATES = ("entity_counts", "query_counts", "pair_counts", "node_stats", "node_latency")
+
+
+# ==============================
+# Run Records
+# ==============================
+
+@dataclass
+class RunRecord:
+    """
+    What the history keeps of one saved comparison.
+
+    Args:
+        run_id (str): Run (or API job) id; a run is counted once.
+        saved_at (str): ISO timestamp; its month is the aggregate period.
+        query (str): Comparison query.
+        publications (list): Compared publication names (file stems).
+        profiles (list): Extracted profiles, one per publication.
+        nodes (dict): Per-node `duration_ms`, `status`, `input_tokens`, `output_tokens`.
+        source (str): Comparison JSON the record came from.
+    """
+
+    run_id: str
+    saved_at: str
+    query: str
+    publications: List[str]
+    profiles: List[dict] = field(default_factory=list)
+    nodes: Dict[str, dict] = field(default_factory=dict)
+    source: str = ""
+
+    @property
+    def month(self) -> str:
+        return self.saved_at[:7]
+
+    def meta(self) -> dict:
+        """The `run` block stored in the comparison JSON, from which the record can be rebuilt."""
+        return {
+            "run_id": self.run_id,
+            "saved_at": self.saved_at,
+            "query": self.query,
+            "publications": self.publications,
+            "nodes": self.nodes,
+        }
+
+
+def _stem(path: str) -> str:
+    # Older comparisons were saved on Windows
+    return Path(re.split(r"[\\/]", str(path))[-1]).stem
+
+
+def _as_profile(profile) -> Optional[dict]:
+    if isinstance(profile, str):
+        try:
+            profile = json.loads(profile)
+        except ValueError:
+            return None
+    return profile if isinstance(profile, dict) else None
+
+
+def record_from_comparison(path: Path) -> Optional[RunRecord]:
+    """
+    Reads a saved comparison JSON back into a `RunRecord`. Files without a
+    `run` block (saved before the history existed) fall back to the graph
+    state keys and the timestamp in the file name. Files with neither are
+    not comparisons (e.g. profiler reports) and give None.
+    """
+    path = Path(path)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Skipping unreadable comparison {path.name}: {e}")
+        return None
+    if not isinstance(data, dict) or not (data.get("run") or _STATE_KEYS & data.keys()):
+        return None
+    meta = data.get("run") or {}
+    saved_at = meta.get("saved_at")
+    if not saved_at:
+        match = _TIMESTAMP.search(path.stem)
+        stamp = datetime.strptime(match.group(1), "%Y%m%d_%H%M%S") if match else datetime.fromtimestamp(path.stat().st_mtime)
+        saved_at = stamp.isoformat(timespec="seconds")
+    paths = data.get("pub_paths") or [p for p in (data.get("pub1_path"), data.get("pub2_path")) if p]
+    profiles = data.get("profiles") or [data.get("pub1_profile"), data.get("pub2_profile")]
+    return RunRecord(
+        run_id=meta.get("run_id") or data.get("run_id") or path.stem,
+        saved_at=saved_at,
+        query=meta.get("query") or data.get("user_query") or "",
+        publications=meta.get("publications") or [_stem(p) for p in paths],
+        profiles=[p for p in map(_as_profile, profiles) if p is not None],
+        nodes=meta.get("nodes") or {},
+        source=str(path),
+    )
+
+
+class NodeLedger:
+    """
+    Per-run node outcomes (duration, status, tokens) of the most recent runs,
+    filled by `explorer.traced_node` and collected when a run is saved.
+
+    Args:
+        keep (int): Runs kept; older, uncollected runs are dropped.
+    """
+
+    def __init__(self, keep: int = LEDGER_RUNS):
+        self.keep = keep
+        self._runs: "OrderedDict[str, Dict[str, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, run_id: str, node: str, status: str, duration_ms: float,
+               input_tokens: int = 0, output_tokens: int = 0) -> None:
+        with self._lock:
+            nodes = self._runs.setdefault(run_id, {})
+            self._runs.move_to_end(run_id)
+            nodes[node] = {
+                "duration_ms": duration_ms,
+                "status": status,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+            }
+            while len(self._runs) > self.keep:
+                self._runs.popitem(last=False)
+
+    def pop(self, run_id: str) -> Dict[str, dict]:
+        with self._lock:
+            return self._runs.pop(run_id, {})
+
+
+# ==============================
+# History Store
+# ==============================
+
+class RunHistory(SQLiteStore):
+    """
+    SQLite store of run-history aggregates; the app, API workers and the CLI
+    can share one file (see `sqlite_store.SQLiteStore`).
+
+    Args:
+        path (Path, optional): Database file, `HISTORY_PATH` by default (created on first use).
+    """
+
+    SCHEMA = _SCHEMA
+
+    def __init__(self, path: Optional[Path] = None):
+        super().__init__(path or HISTORY_PATH)
+
+    # ------------------------------
+    # Updates
+    # ------------------------------
+
+    def record(self, run: RunRecord) -> bool:
+        """Folds one run into the aggregates; False if the run was already counted."""
+        with self._transaction() as db:
+            added = self._apply(db, run)
+        if added:
+            logger.info(f"📈 Run {run.run_id} added to the history aggregates")
+        return added
+
+    def rebuild(self, comparisons_dir: Path = COMPARISONS_DIR) -> int:
+        """
+        Recomputes every aggregate from the saved `comparison_*.json` files
+        (other JSON files in the directory are ignored); returns the runs counted.
+        """
+        runs = 0
+        with self._transaction() as db:
+            for table in ("runs",) + _AGGREGATES:
+                db.execute(f"DELETE FROM {table}")
+            for path in sorted(Path(comparisons_dir).glob("comparison_*.json")):
+                run = record_from_comparison(path)
+                if run is not None and self._apply(db, run):
+                    runs += 1
+        logger.info(f"📈 Rebuilt the history aggregates from {runs} comparisons in {comparisons_dir}")
+        return runs
+
+    @staticmethod
+    def _apply(db: sqlite3.Connection, run: RunRecord) -> bool:
+        cursor = db.execute(
+            "INSERT OR IGNORE INTO runs (run_id, saved_at, query, publications, source) VALUES (?, ?, ?, ?, ?)",
+            (run.run_id, run.saved_at, run.query, json.dumps(run.publications, ensure_ascii=False), run.source),
+        )
+        if cursor.rowcount == 0:
+            return False
+
+        # An entity counts once per profile that names it
+        entities: Dict[tuple, list] = {}
+        for profile in run.profiles:
+            for field_name in TREND_FIELDS:
+                names = {normalize_entity(v): str(v).strip() for v in profile.get(field_name) or [] if str(v).strip()}
+                for entity, label in names.items():
+                    entities.setdefault((field_name, entity), [label, 0])[1] += 1
+        pairs = list(itertools.combinations(sorted(set(run.publications)), 2))
+
+        for period in (run.month, ALL_TIME):
+            db.executemany(
+                "INSERT INTO entity_counts VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT DO UPDATE SET runs = runs + excluded.runs, label = excluded.label",
+                [(period, f, entity, label, n) for (f, entity), (label, n) in entities.items()],
+            )
+            if run.query:
+                db.execute(
+                    "INSERT INTO query_counts VALUES (?, ?, 1) ON CONFLICT DO UPDATE SET runs = runs + 1",
+                    (period, run.query),
+                )
+            db.executemany(
+                "INSERT INTO pair_counts VALUES (?, ?, ?, 1) ON CONFLICT DO UPDATE SET runs = runs + 1",
+                [(period, a, b) for a, b in pairs],
+            )
+            for node, stats in run.nodes.items():
+                ms = float(stats.get("duration_ms") or 0)
+                failed = int(stats.get("status", "ok") != "ok")
+                db.execute(
+                    "INSERT INTO node_stats VALUES (?, ?, 1, ?, ?, ?, ?, ?) ON CONFLICT DO UPDATE SET "
+                    "calls = calls + 1, failures = failures + excluded.failures, total_ms = total_ms + excluded.total_ms, "
+                    "max_ms = MAX(max_ms, excluded.max_ms), input_tokens = input_tokens + excluded.input_tokens, "
+                    "output_tokens = output_tokens + excluded.output_tokens",
+                    (period, node, failed, ms, ms, int(stats.get("input_tokens") or 0), int(stats.get("output_tokens") or 0)),
+                )
+                if not failed:
+                    db.execute(
+                        "INSERT INTO node_latency VALUES (?, ?, ?, 1) ON CONFLICT DO UPDATE SET count = count + 1",
+                        (period, node, bucket_index(ms)),
+                    )
+        return True
+
+    # ------------------------------
+    # Queries
+    # ------------------------------
+
+    def periods(self) -> List[str]:
+        """`ALL_TIME` followed by the months with runs, newest first."""
+        with self._connect() as db:
+            months = [r[0] for r in db.execute(
+                "SELECT DISTINCT period FROM query_counts WHERE period != ? ORDER BY period DESC", (ALL_TIME,)
+            )]
+        return [ALL_TIME] + months
+
+    def run_count(self, period: str = ALL_TIME) -> int:
+        with self._connect() as db:
+            return db.execute("SELECT COALESCE(SUM(runs), 0) FROM query_counts WHERE period = ?", (period,)).fetchone()[0]
+
+    def top_entities(self, field_name: str, period: str = ALL_TIME, limit: int = 10) -> List[dict]:
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT label, runs FROM entity_counts WHERE period = ? AND field = ? ORDER BY runs DESC, entity LIMIT ?",
+                (period, field_name, limit),
+            )
+            return [{"entity": r["label"], "count": r["runs"]} for r in rows]
+
+    def query_counts(self, period: str = ALL_TIME) -> List[dict]:
+        with self._connect() as db:
+            rows = db.execute("SELECT query, runs FROM query_counts WHERE period = ? ORDER BY runs DESC, query", (period,))
+            return [{"query": r["query"], "runs": r["runs"]} for r in rows]
+
+    def top_pairs(self, period: str = ALL_TIME, limit: int = 10) -> List[dict]:
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT pub_a, pub_b, runs FROM pair_counts WHERE period = ? ORDER BY runs DESC, pub_a, pub_b LIMIT ?",
+                (period, limit),
+            )
+            return [{"publications": [r["pub_a"], r["pub_b"]], "runs": r["runs"]} for r in rows]
+
+    def node_stats(self, period: str = ALL_TIME) -> Dict[str, dict]:
+        """Calls, failure rate, mean/p50/p95 latency (ms) and tokens per node."""
+        with self._connect() as db:
+            stats = {r["node"]: dict(r) for r in db.execute("SELECT * FROM node_stats WHERE period = ?", (period,))}
+            histograms = {node: LatencyHistogram() for node in stats}
+            for r in db.execute("SELECT node, bucket, count FROM node_latency WHERE period = ?", (period,)):
+                hist = histograms[r["node"]]
+                hist.buckets[r["bucket"]] = r["count"]
+                hist.count += r["count"]
+        result = {}
+        for node, s in stats.items():
+            hist = histograms[node]
+            hist.max_ms = s["max_ms"]
+            p50, p95 = hist.percentile(50), hist.percentile(95)
+            result[node] = {
+                "calls": s["calls"],
+                "failures": s["failures"],
+                "failure_rate": round(s["failures"] / s["calls"], 4),
+                "mean_ms": round(s["total_ms"] / s["calls"], 1),
+                "p50_ms": None if p50 is None else round(p50, 1),
+                "p95_ms": None if p95 is None else round(p95, 1),
+                "input_tokens": s["input_tokens"],
+                "output_tokens": s["output_tokens"],
+            }
+        return result
+
+    def report(self, period: str = ALL_TIME, limit: int = 10) -> dict:
+        return {
+            "period": period,
+            "runs": self.run_count(period),
+            "entities": {f: self.top_entities(f, period, limit) for f in TREND_FIELDS},
+            "queries": self.query_counts(period),
+            "pairs": self.top_pairs(period, limit),
+            "nodes": self.node_stats(period),
+        }
+
+
+# ==============================
+# CLI
+# ==============================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run-history aggregates over saved comparisons.")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute the aggregates from the saved comparisons.")
+    parser.add_argument("--comparisons-dir", default=str(COMPARISONS_DIR), help="Saved comparison JSON files.")
+    parser.add_argument("--db", default=str(HISTORY_PATH), help="History database.")
+    parser.add_argument("--period", default=ALL_TIME, help=f"Month (YYYY-MM) or '{ALL_TIME}'.")
+    parser.add_argument("--field", choices=TREND_FIELDS, help="Only print the top entities of this field.")
+    parser.add_argument("--top", type=int, default=10, help="Entries per ranking.")
+    args = parser.parse_args(argv)
+
+    history = RunHistory(Path(args.db))
+    if args.rebuild:
+        print(f"📈 {history.rebuild(Path(args.comparisons_dir))} runs aggregated")
+    if args.field:
+        print(json.dumps(history.top_entities(args.field, args.period, args.top), indent=2, ensure_ascii=False))
+    else:
+        print(json.dumps(history.report(args.period, args.top), indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+# run_profiler.py
+
+"""
+On-demand profiling of single comparison runs.
+
+`RunProfiler` is switched on per run: the app's "Profile this run" toggle,
+an `X-Profile: 1` header (or `"profile": true`) on the job API, or this
+module's CLI. While active it:
+
+- samples the Python stacks of all threads every few milliseconds (wall
+  clock, so time spent waiting on the LLM shows up as socket reads) and
+  writes them in collapsed-stack format (`<base>.folded`), ready for
+  `flamegraph.pl`, speedscope or inferno;
+- takes tracemalloc snapshots around each graph node (via the
+  `traced_node` hook in `explorer.py`) and writes the per-node allocation
+  growth, peak and top allocation sites (`<base>.alloc.json`);
+- buckets samples into LLM / Guardrails / JSON / file I/O / LangGraph /
+  other, so the summary says where a slow run's time went.
+
+When no run is being profiled nothing is sampled or traced; the node hook
+is a lookup in an empty dict. The sampler sees every thread in the
+process, so concurrent runs (e.g. other API jobs) show up in each other's
+profiles. tracemalloc is process-wide too: it is traced while any profiler
+is active, and since resetting its peak would wipe another run's, a node's
+`peak_kb` is only reported (otherwise None) when no other run was being
+profiled while it ran.
+
+Usage:
+    python src/run_profiler.py "Image compression with Auto-Encoders.txt" "Ready Tensor Forecasting Benchmark.txt" --query Datasets
+    python src/run_profiler.py a.txt b.txt --query Results --fake-model --interval-ms 2
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from logger import logger
+
+
+INTERVAL_MS = 5.0
+TOP_ALLOCATIONS = 15
+MAX_DEPTH = 96
+
+# Sample buckets in priority order: the first one found anywhere in a stack wins
+CATEGORIES = (
+    ("llm", ("openai", "httpx", "httpcore", "langchain_openai", "requests", "urllib3", "ssl", "socket", "fake_model")),
+    ("guardrails", ("guardrails",)),
+    ("json", ("json",)),
+    ("file_io", ("pathlib", "shutil", "gzip", "tempfile", "_pyio", "sqlite3")),
+    ("langgraph", ("langgraph", "langchain_core.runnables")),
+)
+# Leaf frames of threads that are parked rather than working
+IDLE_LEAVES = {
+    ("threading", "wait"), ("threading", "_wait_for_tstate_lock"), ("threading", "join"),
+    ("concurrent.futures.thread", "_worker"), ("concurrent.futures._base", "wait"),
+    ("queue", "get"), ("selectors", "select"), ("socketserver", "serve_forever"),
+    ("asyncio.base_events", "_run_once"), ("multiprocessing.connection", "_recv"),
+}
+
+_ACTIVE: Dict[str, "RunProfiler"] = {}
+# tracemalloc is shared by all active profilers: started by the first, stopped with the last
+_TRACING_LOCK = threading.Lock()
+_tracing = {"users": 0, "owned": False, "epoch": 0}  # epoch: bumped by every start and peak reset
+
+
+def active_profiler(run_id: Optional[str]) -> Optional["RunProfiler"]:
+    """The profiler of `run_id`, if that run is being profiled (cheap when none is)."""
+    return _ACTIVE.get(run_id) if _ACTIVE and run_id else None
+
+
+def _module(frame) -> str:
+    return frame.f_globals.get("__name__", "?")
+
+
+def categorize(modules: List[str]) -> str:
+    for name, prefixes in CATEGORIES:
+        if any(m == p or m.startswith(p + ".") for m in modules for p in prefixes):
+            return name
+    return "other"
+
+
+# ==============================
+# Profiler
+# ==============================
+
+class RunProfiler:
+    """
+    Sampling profiler plus per-node allocation snapshots for one run; usable
+    as a context manager.
+
+    Args:
+        run_id (str): Run whose graph nodes report to this profiler.
+        interval_ms (float): Stack sampling interval.
+        top (int): Allocation sites kept per node.
+    """
+
+    def __init__(self, run_id: str, interval_ms: float = INTERVAL_MS, top: int = TOP_ALLOCATIONS):
+        self.run_id = run_id
+        self.interval_s = interval_ms / 1000
+        self.top = top
+        self.stacks: Counter = Counter()
+        self.categories: Counter = Counter()
+        self.idle_samples = 0
+        self.nodes: List[dict] = []
+        self.wall_s = 0.0
+        self._open: Dict[str, tuple] = {}
+        self._stopped = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._running = False
+        self._start = 0.0
+
+    def start(self) -> "RunProfiler":
+        with _TRACING_LOCK:
+            if _tracing["users"] == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _tracing["owned"] = True
+            _tracing["users"] += 1
+            _tracing["epoch"] += 1
+            _ACTIVE[self.run_id] = self
+        self._running = True
+        self._start = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample_loop, daemon=True, name=f"profiler-{self.run_id[:8]}")
+        self._sampler.start()
+        return self
+
+    def stop(self) -> "RunProfiler":
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.wall_s = time.perf_counter() - self._start
+        if self._running:
+            self._running = False
+            with _TRACING_LOCK:
+                _ACTIVE.pop(self.run_id, None)
+                _tracing["users"] -= 1
+                if _tracing["users"] == 0 and _tracing["owned"]:
+                    tracemalloc.stop()
+                    _tracing["owned"] = False
+        return self
+
+    def __enter__(self) -> "RunProfiler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ------------------------------
+    # Sampling
+    # ------------------------------
+
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval_s):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self._record(names.get(ident, str(ident)), frame)
+
+    def _record(self, thread_name: str, frame) -> None:
+        leaf = (_module(frame), frame.f_code.co_name)
+        if leaf in IDLE_LEAVES:
+            self.idle_samples += 1
+            return
+        frames, modules = [], []
+        while frame is not None and len(frames) < MAX_DEPTH:
+            module = _module(frame)
+            frames.append(f"{module}:{frame.f_code.co_name}")
+            modules.append(module)
+            frame = frame.f_back
+        frames.append(thread_name.split("_")[0].replace(";", ":"))  # pool threads "<pool>_<n>" share one root
+        self.stacks[";".join(reversed(frames))] += 1
+        self.categories[categorize(modules)] += 1
+
+    # ------------------------------
+    # Node hooks (called by `explorer.traced_node`)
+    # ------------------------------
+
+    def node_started(self, node: str) -> None:
+        with _TRACING_LOCK:
+            # The peak is global: only reset it (and later report it) while this is the only profiled run
+            epoch = None
+            if len(_ACTIVE) == 1:
+                tracemalloc.reset_peak()
+                _tracing["epoch"] += 1
+                epoch = _tracing["epoch"]
+        self._open[node] = (time.perf_counter(), tracemalloc.take_snapshot(), tracemalloc.get_traced_memory()[0], epoch)
+
+    def node_finished(self, node: str, status: str = "ok") -> None:
+        opened = self._open.pop(node, None)
+        if opened is None or not tracemalloc.is_tracing():
+            return
+        start, before, current_before, epoch = opened
+        with _TRACING_LOCK:
+            current, peak = tracemalloc.get_traced_memory()
+            solo = epoch is not None and epoch == _tracing["epoch"]
+        diff = tracemalloc.take_snapshot().compare_to(before, "lineno")
+        self.nodes.append({
+            "node": node,
+            "status": status,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            "allocated_kb": round((current - current_before) / 1024, 1),
+            "peak_kb": round((peak - current_before) / 1024, 1) if solo else None,
+            "top": [
+                {"where": f"{s.traceback[0].filename}:{s.traceback[0].lineno}",
+                 "size_kb": round(s.size_diff / 1024, 1), "count": s.count_diff}
+                for s in diff[: self.top]
+            ],
+        })
+
+    # ------------------------------
+    # Reports
+    # ------------------------------
+
+    def summary(self) -> dict:
+        busy = sum(self.categories.values())
+        return {
+            "run_id": self.run_id,
+            "wall_s": round(self.wall_s, 3),
+            "samples": busy,
+            "idle_samples": self.idle_samples,
+            "interval_ms": self.interval_s * 1000,
+            "time_share": {c: round(n / busy, 3) for c, n in self.categories.most_common()} if busy else {},
+            "nodes": [{k: n[k] for k in ("node", "duration_ms", "allocated_kb", "peak_kb")} for n in self.nodes],
+        }
+
+    def save(self, base: Path) -> Dict[str, str]:
+        """Writes `<base>.folded` and `<base>.alloc.json`; returns their paths."""
+        base = Path(base)
+        base.parent.mkdir(parents=True, exist_ok=True)
+        folded = base.with_name(base.name + ".folded")
+        alloc = base.with_name(base.name + ".alloc.json")
+        folded.write_text("".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common()), encoding="utf-8")
+        alloc.write_text(json.dumps({**self.summary(), "nodes": self.nodes}, indent=2), encoding="utf-8")
+        logger.info(f"🔬 Run profile saved to {folded} and {alloc}")
+        return {"flamegraph": str(folded), "allocations": str(alloc)}
+
+
+# ==============================
+# CLI
+# ==============================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from paths import RUN_PROFILES_DIR, SAMPLE_PUBLICATION_DIR
+
+    parser = argparse.ArgumentParser(description="Run one comparison with the sampling and allocation profiler on.")
+    parser.add_argument("publications", nargs="+", help="Publication files (names inside data/sample_publications or paths).")
+    parser.add_argument("--query", default="Datasets", help="Comparison query.")
+    parser.add_argument("--fast", action="store_true", help="Fast (gazetteer) comparison.")
+    parser.add_argument("--fake-model", action="store_true", help="Use the offline fake model.")
+    parser.add_argument("--interval-ms", type=float, default=INTERVAL_MS, help="Stack sampling interval.")
+    parser.add_argument("--output-dir", default=str(RUN_PROFILES_DIR), help="Where the profile files go.")
+    args = parser.parse_args(argv)
+
+    from work_queue import build_explorer
+
+    paths = [p if os.path.exists(p) else str(Path(SAMPLE_PUBLICATION_DIR) / p) for p in args.publications]
+    explorer = build_explorer(fake_model=args.fake_model)
+    run_id = uuid.uuid4().hex
+    state = {"run_id": run_id, "pub_paths": paths, "user_query": args.query, "fast": args.fast, "count": 0}
+    with RunProfiler(run_id, args.interval_ms) as profiler:
+        explorer.graph.invoke(state)
+    files = profiler.save(Path(args.output_dir) / f"profile_{run_id}")
+    summary = profiler.summary()
+    print(f"🔬 {summary['wall_s']:.2f}s, {summary['samples']} samples | time share: {summary['time_share']}")
+    for node in summary["nodes"]:
+        peak = "–" if node["peak_kb"] is None else f"{node['peak_kb']:.0f} KB"
+        print(f"    {node['node']:<18} {node['duration_ms']:>9.1f} ms  +{node['allocated_kb']:.0f} KB (peak {peak})")
+    print(f"🔥 {files['flamegraph']}\n🧠 {files['allocations']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
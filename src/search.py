@@ -0,0 +1,275 @@
+# search.py
+
+"""
+Cached, budgeted web search for the ReAct agent.
+
+`CachedWebSearch` wraps a pluggable search backend with a persistent TTL cache
+(normalized query → results), in-flight deduplication of identical queries and
+a per-run search budget. When the primary backend fails (e.g. no network) a
+local `CorpusSearchBackend` over the sample publications serves results instead.
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+from paths import OUTPUTS_DIR, SAMPLE_PUBLICATION_DIR
+from logger import logger
+
+
+SEARCH_CACHE_PATH = Path(OUTPUTS_DIR) / "cache" / "search_cache.sqlite"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_SEARCHES = 5
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9\-\.+#]*")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercases, strips punctuation and collapses whitespace so equivalent queries share a cache entry."""
+    return " ".join(word.rstrip(".") for word in _WORD.findall(query.lower()))
+
+
+# ==============================
+# Backends
+# ==============================
+
+class TavilySearchBackend:
+    """
+    Live Tavily search; the client is created on first use. With `api_url`
+    (default `TAVILY_API_URL`) the search endpoint is called directly at that
+    base URL instead, e.g. the local mock server used for load tests.
+    """
+
+    name = "tavily"
+
+    def __init__(self, max_results: int = 5, api_url: Optional[str] = None):
+        self.max_results = max_results
+        self.api_url = api_url or os.getenv("TAVILY_API_URL")
+        self._client = None
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        if self.api_url:
+            return self._search_api(query)
+        if self._client is None:
+            from langchain_community.tools.tavily_search.tool import TavilySearchResults
+            self._client = TavilySearchResults(max_results=self.max_results)
+        results = self._client.invoke({"query": query})
+        if isinstance(results, str):
+            raise RuntimeError(f"Tavily search failed: {results}")
+        return results
+
+    def _search_api(self, query: str) -> List[Dict[str, Any]]:
+        import requests
+
+        response = requests.post(
+            f"{self.api_url.rstrip('/')}/search",
+            json={"api_key": os.getenv("TAVILY_API_KEY", ""), "query": query, "max_results": self.max_results},
+            timeout=30,
+        )
+        response.raise_for_status()
+        return [{"url": r["url"], "content": r["content"]} for r in response.json().get("results", [])]
+
+
+class CorpusSearchBackend:
+    """
+    Offline stand-in that ranks paragraphs of the local publication corpus by
+    query-term overlap and returns them in the Tavily result shape.
+    """
+
+    name = "corpus"
+
+    def __init__(self, corpus_dir: str = SAMPLE_PUBLICATION_DIR, max_results: int = 5):
+        self.corpus_dir = Path(corpus_dir)
+        self.max_results = max_results
+        self._paragraphs: Optional[List[tuple]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> List[tuple]:
+        with self._lock:
+            if self._paragraphs is None:
+                paragraphs = []
+                for path in sorted(self.corpus_dir.glob("*.txt")):
+                    text = path.read_text(encoding="utf-8", errors="replace")
+                    for block in re.split(r"\n\s*\n", text):
+                        block = block.strip()
+                        if len(block) > 80:
+                            paragraphs.append((path.stem, block, frozenset(_WORD.findall(block.lower()))))
+                self._paragraphs = paragraphs
+        return self._paragraphs
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        terms = set(normalize_query(query).split())
+        if not terms:
+            return []
+        scored = []
+        for title, block, words in self._load():
+            score = len(terms & words)
+            if score:
+                scored.append((score, title, block))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [
+            {"url": f"corpus://{title}", "content": block[:1000]}
+            for _, title, block in scored[: self.max_results]
+        ]
+
+
+# ==============================
+# Persistent TTL Cache
+# ==============================
+
+class SearchCache:
+    """SQLite-backed TTL cache shared across runs and processes."""
+
+    def __init__(self, path: Path = SEARCH_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "backend TEXT, query TEXT, results TEXT, created REAL, "
+                "PRIMARY KEY (backend, query))"
+            )
+        return self._conn
+
+    def get(self, backend: str, query: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT results, created FROM search_cache WHERE backend = ? AND query = ?",
+                (backend, query),
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def put(self, backend: str, query: str, results: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?)",
+                (backend, query, json.dumps(results, ensure_ascii=False), time.time()),
+            )
+            conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute("DELETE FROM search_cache WHERE created < ?", (time.time() - self.ttl_seconds,))
+            conn.commit()
+        return cursor.rowcount
+
+
+# ==============================
+# Cached Search Tool
+# ==============================
+
+class CachedWebSearch:
+    """
+    Search tool used as the agent's `WebSearch` action.
+
+    Args:
+        backend: Primary backend exposing `name` and `search(query)`.
+        cache (SearchCache, optional): Persistent cache; None disables it.
+        max_searches (int): Backend calls allowed per run (cache hits are free).
+        fallback: Backend used when the primary one raises.
+    """
+
+    def __init__(self, backend, cache: Optional[SearchCache] = None,
+                 max_searches: int = DEFAULT_MAX_SEARCHES, fallback=None):
+        self.backend = backend
+        self.cache = cache
+        self.max_searches = max_searches
+        self.fallback = fallback
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.stats = self._empty_stats()
+        self._searches = 0
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {"hits": 0, "misses": 0, "deduplicated": 0, "fallbacks": 0, "over_budget": 0}
+
+    @classmethod
+    def from_env(cls) -> "CachedWebSearch":
+        """
+        Builds the tool from `SEARCH_BACKEND` (tavily|corpus), `SEARCH_CACHE_TTL`
+        and `SEARCH_MAX_PER_RUN`. Without a Tavily key the corpus backend is used.
+        """
+        choice = os.getenv("SEARCH_BACKEND") or ("tavily" if os.getenv("TAVILY_API_KEY") else "corpus")
+        corpus = CorpusSearchBackend()
+        backend = TavilySearchBackend() if choice == "tavily" else corpus
+        return cls(
+            backend,
+            cache=SearchCache(ttl_seconds=float(os.getenv("SEARCH_CACHE_TTL", DEFAULT_TTL_SECONDS))),
+            max_searches=int(os.getenv("SEARCH_MAX_PER_RUN", DEFAULT_MAX_SEARCHES)),
+            fallback=None if backend is corpus else corpus,
+        )
+
+    def start_run(self) -> None:
+        """Resets the per-run search budget and stats."""
+        with self._lock:
+            self._searches = 0
+            self.stats = self._empty_stats()
+
+    def run(self, query: str) -> List[Dict[str, Any]]:
+        key = normalize_query(query)
+        if self.cache is not None:
+            cached = self.cache.get(self.backend.name, key)
+            if cached is not None:
+                with self._lock:
+                    self.stats["hits"] += 1
+                return cached
+
+        owner = False
+        with self._lock:
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self.stats["deduplicated"] += 1
+            elif self._searches >= self.max_searches:
+                self.stats["over_budget"] += 1
+                logger.warning(f"⚠️ Search budget ({self.max_searches}) exhausted; skipping '{query}'")
+                return [{"url": "", "content": "Search budget exhausted for this run."}]
+            else:
+                self._searches += 1
+                self.stats["misses"] += 1
+                pending = self._inflight[key] = Future()
+                owner = True
+        if not owner:
+            return pending.result()
+
+        try:
+            results = self._search(key)
+            pending.set_result(results)
+            return results
+        except Exception as exc:
+            pending.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _search(self, key: str) -> List[Dict[str, Any]]:
+        try:
+            results = self.backend.search(key)
+            source = self.backend.name
+        except Exception as exc:
+            if self.fallback is None:
+                raise
+            logger.warning(f"⚠️ {self.backend.name} search failed ({exc}); using {self.fallback.name} backend")
+            with self._lock:
+                self.stats["fallbacks"] += 1
+            return self.fallback.search(key)
+        if self.cache is not None:
+            self.cache.put(source, key, results)
+        return results
@@ -0,0 +1,194 @@
+# similarity.py
+
+"""
+"Find similar publications" search over compact profile feature vectors.
+
+Each validated profile is encoded as a sparse vector of interned entity IDs
+(`tools`, `datasets`, `evaluation_methods`, `task_types`), weighted by inverse
+document frequency and L2-normalized. Vectors live in CSR-style numpy arrays,
+so a top-k cosine query is one sparse matrix-vector product plus a partial
+sort, even over tens of thousands of documents.
+"""
+
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from trends import CORPUS_PROFILES_PATH, normalize_entity
+from corpus import load_corpus_profiles
+
+
+SIMILARITY_FIELDS = ("tools", "datasets", "evaluation_methods", "task_types")
+
+
+class SimilarityIndex:
+    """
+    Array-backed index of profile vectors.
+
+    Args:
+        fields (tuple): Profile fields that contribute features.
+    """
+
+    def __init__(self, fields: Tuple[str, ...] = SIMILARITY_FIELDS):
+        self.fields = fields
+        self.terms: Dict[Tuple[str, str], int] = {}
+        self.labels: List[Tuple[str, str]] = []
+        self.doc_ids: List[str] = []
+        self.titles: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        # CSR row pointers and interned term IDs in compact typed arrays
+        self._indptr = array("q", [0])
+        self._indices = array("i")
+        self._matrix = None  # scipy.sparse.csr_matrix, built on first query
+        self._idf: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_records(cls, records: Dict[str, dict], fields: Tuple[str, ...] = SIMILARITY_FIELDS) -> "SimilarityIndex":
+        index = cls(fields)
+        for doc_id, record in records.items():
+            if isinstance(record.get("profile"), dict):
+                index.add(doc_id, record.get("title", doc_id), record["profile"])
+        return index
+
+    @classmethod
+    def from_corpus(cls, path: Path = CORPUS_PROFILES_PATH) -> "SimilarityIndex":
+        return cls.from_records(load_corpus_profiles(path))
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    # ------------------------------
+    # Encoding
+    # ------------------------------
+
+    def _term_ids(self, profile: dict, intern: bool) -> List[int]:
+        ids = set()
+        for f in self.fields:
+            for raw in profile.get(f) or []:
+                key = (f, normalize_entity(raw))
+                if not key[1]:
+                    continue
+                term = self.terms.get(key)
+                if term is None and intern:
+                    term = self.terms[key] = len(self.labels)
+                    self.labels.append((f, str(raw).strip()))
+                if term is not None:
+                    ids.add(term)
+        return sorted(ids)
+
+    def add(self, doc_id: str, title: str, profile: dict) -> None:
+        """Appends (or replaces) a document; the matrix is rebuilt on the next query."""
+        with self._lock:
+            if doc_id in self._row_of:
+                self._rebuild_without(doc_id)
+            self._row_of[doc_id] = len(self.doc_ids)
+            self.doc_ids.append(doc_id)
+            self.titles.append(title)
+            self._indices.extend(self._term_ids(profile, intern=True))
+            self._indptr.append(len(self._indices))
+            self._matrix = None
+
+    def _rebuild_without(self, doc_id: str) -> None:
+        row = self._row_of.pop(doc_id)
+        start, end = self._indptr[row], self._indptr[row + 1]
+        del self._indices[start:end]
+        width = end - start
+        self._indptr = self._indptr[: row + 1] + array("q", (p - width for p in self._indptr[row + 2:]))
+        del self.doc_ids[row]
+        del self.titles[row]
+        self._row_of = {d: i for i, d in enumerate(self.doc_ids)}
+
+    def _ensure_matrix(self):
+        from scipy import sparse  # deferred: scipy dominates this module's import time
+
+        with self._lock:
+            if self._matrix is None:
+                n_docs, n_terms = len(self.doc_ids), len(self.labels)
+                indptr = np.frombuffer(self._indptr, dtype=np.int64).copy()
+                indices = np.frombuffer(self._indices, dtype=np.int32).copy()
+                df = np.bincount(indices, minlength=n_terms)
+                self._idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+                data = self._idf[indices]
+                rows = np.repeat(np.arange(n_docs), np.diff(indptr))
+                norms = np.sqrt(np.bincount(rows, weights=data ** 2, minlength=n_docs))
+                data = (data / np.where(norms > 0, norms, 1)[rows]).astype(np.float32)
+                self._matrix = sparse.csr_matrix((data, indices, indptr), shape=(n_docs, n_terms))
+            return self._matrix
+
+    def _query_vector(self, term_ids: List[int]) -> np.ndarray:
+        matrix = self._ensure_matrix()
+        vector = np.zeros(matrix.shape[1], dtype=np.float32)
+        if term_ids:
+            vector[term_ids] = self._idf[term_ids]
+            vector /= np.linalg.norm(vector)
+        return vector
+
+    # ------------------------------
+    # Queries
+    # ------------------------------
+
+    def _rank(self, term_ids: List[int], k: int, exclude: Optional[int] = None) -> List[dict]:
+        matrix = self._ensure_matrix()
+        if not term_ids or matrix.shape[0] == 0:
+            return []
+        scores = matrix @ self._query_vector(term_ids)
+        if exclude is not None:
+            scores[exclude] = -1
+        k = min(k, int((scores > 0).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        query_terms = set(term_ids)
+        results = []
+        for row in top:
+            doc_terms = self._indices[self._indptr[row]: self._indptr[row + 1]]
+            shared = [self.labels[t] for t in doc_terms if t in query_terms]
+            results.append({
+                "id": self.doc_ids[row],
+                "title": self.titles[row],
+                "score": round(float(scores[row]), 4),
+                "shared": {f: [name for field, name in shared if field == f] for f in self.fields},
+            })
+        return results
+
+    def similar_to(self, doc_id: str, k: int = 5) -> List[dict]:
+        """Top-k publications most similar to an indexed one (itself excluded)."""
+        row = self._row_of[doc_id]
+        term_ids = self._indices[self._indptr[row]: self._indptr[row + 1]]
+        return self._rank(list(term_ids), k, exclude=row)
+
+    def query(self, profile: dict, k: int = 5) -> List[dict]:
+        """Top-k publications most similar to an ad-hoc profile."""
+        return self._rank(self._term_ids(profile, intern=False), k)
+
+    def find_id(self, title: str) -> Optional[str]:
+        for doc_id, doc_title in zip(self.doc_ids, self.titles):
+            if doc_title == title:
+                return doc_id
+        return None
+
+
+# ==============================
+# Shared Instance
+# ==============================
+
+_INDEX_LOCK = threading.Lock()
+_INDEX_CACHE: Dict[str, tuple] = {}
+
+
+def get_similarity_index(path: Path = CORPUS_PROFILES_PATH) -> Optional[SimilarityIndex]:
+    """Returns a process-wide index for `path`, rebuilt only when the file changes."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    mtime = path.stat().st_mtime
+    with _INDEX_LOCK:
+        cached = _INDEX_CACHE.get(str(path))
+        if cached is None or cached[0] != mtime:
+            cached = _INDEX_CACHE[str(path)] = (mtime, SimilarityIndex.from_corpus(path))
+    return cached[1]
@@ -0,0 +1,61 @@
+# sqlite_store.py
+
+"""
+Base class of the SQLite-backed stores: the work queue (`work_queue.py`),
+the document manifest (`ingest.py`) and the run history (`run_history.py`).
+
+Every call uses its own short-lived connection, so one instance can be
+shared by threads and any number of processes can open the same file. The
+database runs in WAL mode, so readers do not block the writer. Writes go
+through `_transaction`, which takes the write lock with its first
+statement (`BEGIN IMMEDIATE`); concurrent writers wait up to
+`BUSY_TIMEOUT_S` instead of failing halfway through a read-then-write.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class SQLiteStore:
+    """
+    SQLite file with the subclass's `SCHEMA`, created on first use.
+
+    Args:
+        path (Path): Database file.
+    """
+
+    SCHEMA = ""
+    BUSY_TIMEOUT_S = 60.0
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(self.SCHEMA)
+            self._migrate(db)
+
+    def _migrate(self, db: sqlite3.Connection) -> None:
+        """Upgrades files written by older versions of the schema; nothing by default."""
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=self.BUSY_TIMEOUT_S, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that holds the database lock from its first statement."""
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
@@ -0,0 +1,176 @@
+# startup_profile.py
+
+"""
+Import-time profile and time-to-first-render benchmark.
+
+Cold start of the container and every Streamlit script rerun pay for what
+the app imports. This module measures both in fresh interpreters, so
+results are not flattered by modules already cached in the current one:
+
+- `import_profile` runs `python -X importtime -c "import <module>"` and
+  reports the total import time, the slowest imports and which of the
+  heavy LLM dependencies (`HEAVY_MODULES`) were loaded.
+- `time_to_first_render` runs the Streamlit app headlessly (`AppTest`)
+  and times its first script run.
+
+Usage:
+    python src/startup_profile.py
+    python src/startup_profile.py --modules explorer app --top 15 --render --max-render-s 10
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from paths import SRC_DIR
+from logger import logger
+
+
+HEAVY_MODULES = (
+    "langchain",
+    "langchain_community",
+    "langchain_openai",
+    "langgraph",
+    "guardrails",
+    "openai",
+    "IPython",
+    "scipy",
+)
+FIRST_RENDER_BUDGET_S = 2.5  # eager LLM imports took ~4 s; lazy ones ~0.5 s
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)$")
+
+
+@dataclass
+class ImportProfile:
+    module: str
+    total_ms: float
+    slowest: List[Dict] = field(default_factory=list)
+    heavy_loaded: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _run_python(args: List[str], timeout_s: float) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get("PYTHONPATH")]))}
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, timeout=timeout_s)
+
+
+# ==============================
+# Import Time
+# ==============================
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """`-X importtime` lines as `{"module", "self_ms", "cumulative_ms", "depth"}`, in import order."""
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": (len(indent) - 1) // 2,
+            })
+    return rows
+
+
+def import_profile(module: str, top: int = 10, timeout_s: float = 120) -> ImportProfile:
+    """
+    Profiles `import <module>` in a fresh interpreter.
+
+    Args:
+        module (str): Module to import (resolved from `src/`).
+        top (int): Number of slowest imports (by cumulative time) to report.
+        timeout_s (float): Subprocess timeout.
+
+    Returns:
+        ImportProfile: Total time, slowest imports and heavy modules loaded.
+    """
+    proc = _run_python(["-X", "importtime", "-c", f"import {module}"], timeout_s)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {proc.stderr.strip().splitlines()[-1:]}")
+    rows = parse_importtime(proc.stderr)
+    loaded = {r["module"] for r in rows}
+    total = next((r["cumulative_ms"] for r in rows if r["module"] == module and r["depth"] == 0), 0.0)
+    slowest = sorted((r for r in rows if r["module"] != module), key=lambda r: -r["cumulative_ms"])[:top]
+    return ImportProfile(
+        module=module,
+        total_ms=round(total, 1),
+        slowest=[{"module": r["module"], "cumulative_ms": round(r["cumulative_ms"], 1)} for r in slowest],
+        heavy_loaded=[m for m in HEAVY_MODULES if m in loaded],
+    )
+
+
+# ==============================
+# First Render
+# ==============================
+
+_RENDER_SCRIPT = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({path!r}, default_timeout={timeout!r})
+start = time.perf_counter()
+at.run()
+elapsed = time.perf_counter() - start
+if at.exception:
+    sys.exit("app raised: " + str(at.exception[0].value))
+print(elapsed)
+"""
+
+
+def time_to_first_render(app_path: Path = SRC_DIR / "app.py", timeout_s: float = 120) -> float:
+    """Seconds the first headless run of the Streamlit app takes in a fresh interpreter."""
+    script = _RENDER_SCRIPT.format(path=str(Path(app_path).resolve()), timeout=timeout_s)
+    proc = _run_python(["-c", script], timeout_s + 30)
+    if proc.returncode != 0:
+        raise RuntimeError(f"first render failed: {proc.stderr.strip() or proc.stdout.strip()}")
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+# ==============================
+# CLI
+# ==============================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report import time and time-to-first-render.")
+    parser.add_argument("--modules", nargs="+", default=["explorer", "app"], help="Modules to profile.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per module.")
+    parser.add_argument("--render", action="store_true", help="Also time the app's first render.")
+    parser.add_argument("--max-render-s", type=float, default=FIRST_RENDER_BUDGET_S,
+                        help="Fail when the first render takes longer than this.")
+    parser.add_argument("--output", help="Write the JSON report to this path.")
+    args = parser.parse_args(argv)
+
+    report = {"imports": [], "first_render_s": None}
+    for module in args.modules:
+        profile = import_profile(module, args.top)
+        report["imports"].append(profile.to_dict())
+        print(f"📦 import {module}: {profile.total_ms:.0f} ms | heavy: {', '.join(profile.heavy_loaded) or 'none'}")
+        for row in profile.slowest:
+            print(f"    {row['cumulative_ms']:>8.1f} ms  {row['module']}")
+
+    status = 0
+    if args.render:
+        seconds = time_to_first_render()
+        report["first_render_s"] = round(seconds, 3)
+        within = seconds <= args.max_render_s
+        print(f"{'✅' if within else '❌'} First render: {seconds:.2f}s (budget {args.max_render_s:.1f}s)")
+        status = 0 if within else 1
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        logger.info(f"💾 Startup report saved to {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
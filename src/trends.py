@@ -0,0 +1,228 @@
+# trends.py
+
+"""
+Vectorized trend statistics over precomputed corpus profiles.
+
+`TrendEngine` encodes every profile as a row of a sparse document × entity
+matrix (one column block per field) and answers frequency, co-occurrence and
+time-bucketed count queries with sparse matrix products, so `aggregate_trends`
+can ground its answer in corpus-wide numbers instead of two profiles.
+"""
+
+import re
+import json
+import threading
+from pathlib import Path
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from paths import CORPUS_DIR
+
+
+CORPUS_PROFILES_PATH = CORPUS_DIR / "corpus_profiles.json"
+TREND_FIELDS = ("tools", "datasets", "evaluation_methods", "task_types")
+UNDATED = "undated"
+
+# Fields a UI query type's trends cover; custom queries use all of them.
+# Extraction uses `profile_store.EXTRACTION_FIELDS` instead ("Results" extracts only results).
+QUERY_FIELDS = {
+    "tool usage": ("tools",),
+    "evaluation methods": ("evaluation_methods",),
+    "task types": ("task_types",),
+    "datasets": ("datasets",),
+    "results": TREND_FIELDS,
+}
+
+
+def normalize_entity(name: str) -> str:
+    return re.sub(r"\s+", " ", str(name)).strip().lower()
+
+
+def fields_for_query(query: str) -> Tuple[str, ...]:
+    return QUERY_FIELDS.get(normalize_entity(query), TREND_FIELDS)
+
+
+def _top_k(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest positive values, largest first."""
+    k = min(k, int((values > 0).sum()))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-values, k - 1)[:k]
+    return top[np.argsort(-values[top], kind="stable")]
+
+
+# ==============================
+# Trend Engine
+# ==============================
+
+class TrendEngine:
+    """
+    Sparse document × entity index over corpus profiles.
+
+    Args:
+        records (list): Items with a `profile` dict and an optional `date`
+            (ISO string); dates are bucketed by month.
+    """
+
+    def __init__(self, records: Iterable[dict], fields: Tuple[str, ...] = TREND_FIELDS):
+        self.fields = fields
+        self.vocab: Dict[str, Dict[str, int]] = {f: {} for f in fields}
+        self.labels: Dict[str, List[str]] = {f: [] for f in fields}
+        spellings: Dict[str, List[Counter]] = {f: [] for f in fields}
+        rows: Dict[str, List[int]] = {f: [] for f in fields}
+        cols: Dict[str, List[int]] = {f: [] for f in fields}
+        buckets: List[str] = []
+
+        n_docs = 0
+        for record in records:
+            profile = record.get("profile")
+            if not isinstance(profile, dict):
+                continue
+            for f in fields:
+                seen = set()
+                for raw in profile.get(f) or []:
+                    key = normalize_entity(raw)
+                    if not key or key in seen:
+                        continue
+                    seen.add(key)
+                    col = self.vocab[f].setdefault(key, len(self.vocab[f]))
+                    if col == len(spellings[f]):
+                        spellings[f].append(Counter())
+                    spellings[f][col][str(raw).strip()] += 1
+                    rows[f].append(n_docs)
+                    cols[f].append(col)
+            date = record.get("date") or ""
+            buckets.append(date[:7] if len(date) >= 7 else UNDATED)
+            n_docs += 1
+
+        from scipy import sparse  # deferred: scipy dominates this module's import time
+
+        self.n_docs = n_docs
+        self.matrices: Dict[str, sparse.csr_matrix] = {}
+        for f in fields:
+            self.labels[f] = [c.most_common(1)[0][0] for c in spellings[f]]
+            data = np.ones(len(rows[f]), dtype=np.int32)
+            self.matrices[f] = sparse.csr_matrix(
+                (data, (rows[f], cols[f])), shape=(n_docs, len(self.vocab[f]))
+            )
+
+        self.bucket_names = sorted(set(buckets))
+        bucket_index = {b: i for i, b in enumerate(self.bucket_names)}
+        self.bucket_matrix = sparse.csr_matrix(
+            (np.ones(n_docs, dtype=np.int32), ([bucket_index[b] for b in buckets], np.arange(n_docs))),
+            shape=(len(self.bucket_names), n_docs),
+        )
+        self._counts = {f: np.asarray(m.sum(axis=0)).ravel() for f, m in self.matrices.items()}
+        # The index is immutable, so query results can be memoized
+        self._memo: Dict[tuple, object] = {}
+
+    @classmethod
+    def from_file(cls, path: Path = CORPUS_PROFILES_PATH) -> "TrendEngine":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("profiles", {}).values())
+
+    # ------------------------------
+    # Queries
+    # ------------------------------
+
+    def frequencies(self, field: str, top_k: int = 10) -> List[Tuple[str, int]]:
+        """Most common entities of a field with the number of documents mentioning them."""
+        counts = self._counts[field]
+        return [(self.labels[field][i], int(counts[i])) for i in _top_k(counts, top_k)]
+
+    def prevalence(self, field: str, names: Iterable[str]) -> Dict[str, int]:
+        """Corpus document counts for specific entities (0 when unseen)."""
+        counts = self._counts[field]
+        vocab = self.vocab[field]
+        return {
+            name: int(counts[vocab[normalize_entity(name)]]) if normalize_entity(name) in vocab else 0
+            for name in names
+        }
+
+    def cooccurrence(self, field_a: str, field_b: Optional[str] = None, top_k: int = 10) -> List[Tuple[str, str, int]]:
+        """Entity pairs that appear in the same documents most often."""
+        field_b = field_b or field_a
+        key = ("cooccurrence", field_a, field_b, top_k)
+        if key not in self._memo:
+            self._memo[key] = self._cooccurrence(field_a, field_b, top_k)
+        return self._memo[key]
+
+    def _cooccurrence(self, field_a: str, field_b: str, top_k: int) -> List[Tuple[str, str, int]]:
+        co = (self.matrices[field_a].T @ self.matrices[field_b]).tocoo()
+        mask = co.data > 0
+        if field_a == field_b:
+            mask &= co.row < co.col
+        rows, cols, data = co.row[mask], co.col[mask], co.data[mask]
+        return [
+            (self.labels[field_a][rows[i]], self.labels[field_b][cols[i]], int(data[i]))
+            for i in _top_k(data.astype(np.float64), top_k)
+        ]
+
+    def time_buckets(self, field: str, top_k: int = 5) -> Dict[str, List[Tuple[str, int]]]:
+        """Top entities per month bucket."""
+        key = ("time_buckets", field, top_k)
+        if key in self._memo:
+            return self._memo[key]
+        per_bucket = (self.bucket_matrix @ self.matrices[field]).toarray()
+        self._memo[key] = {
+            bucket: [(self.labels[field][i], int(per_bucket[b, i])) for i in _top_k(per_bucket[b].astype(np.float64), top_k)]
+            for b, bucket in enumerate(self.bucket_names)
+        }
+        return self._memo[key]
+
+    def summary(self, fields: Optional[Iterable[str]] = None, top_k: int = 10) -> dict:
+        fields = tuple(fields or self.fields)
+        return {
+            "documents": self.n_docs,
+            "frequencies": {f: self.frequencies(f, top_k) for f in fields},
+            "cooccurrence": {f: self.cooccurrence(f, top_k=top_k) for f in fields},
+            "time_buckets": {f: self.time_buckets(f, top_k=3) for f in fields} if len(self.bucket_names) > 1 else {},
+        }
+
+    def to_prompt(self, query: str, profiles: Iterable[dict] = (), top_k: int = 8) -> str:
+        """Compact text block of corpus statistics relevant to `query` and the given profiles."""
+        fields = fields_for_query(query)
+        lines = [f"Corpus size: {self.n_docs} publications."]
+        for f in fields:
+            top = ", ".join(f"{name} ({n})" for name, n in self.frequencies(f, top_k))
+            lines.append(f"Most common {f}: {top or 'none'}")
+            pairs = ", ".join(f"{a} + {b} ({n})" for a, b, n in self.cooccurrence(f, top_k=3))
+            if pairs:
+                lines.append(f"Frequent {f} pairs: {pairs}")
+            mentioned = [e for p in profiles if isinstance(p, dict) for e in (p.get(f) or [])]
+            if mentioned:
+                counts = self.prevalence(f, dict.fromkeys(mentioned))
+                lines.append(
+                    f"Corpus prevalence of these publications' {f}: "
+                    + ", ".join(f"{name} ({n}/{self.n_docs})" for name, n in counts.items())
+                )
+        if len(self.bucket_names) > 1:
+            for f in fields:
+                recent = self.time_buckets(f, top_k=3)
+                trail = "; ".join(f"{b}: " + ", ".join(n for n, _ in top) for b, top in recent.items() if top)
+                lines.append(f"{f} by month: {trail}")
+        return "\n".join(lines)
+
+
+# ==============================
+# Shared Instance
+# ==============================
+
+_ENGINE_LOCK = threading.Lock()
+_ENGINE_CACHE: Dict[str, tuple] = {}
+
+
+def get_trend_engine(path: Path = CORPUS_PROFILES_PATH) -> Optional[TrendEngine]:
+    """Returns a process-wide engine for `path`, rebuilt only when the file changes."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    mtime = path.stat().st_mtime
+    with _ENGINE_LOCK:
+        cached = _ENGINE_CACHE.get(str(path))
+        if cached is None or cached[0] != mtime:
+            cached = _ENGINE_CACHE[str(path)] = (mtime, TrendEngine.from_file(path))
+    return cached[1]
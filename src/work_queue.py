@@ -0,0 +1,430 @@
+# work_queue.py
+
+"""
+Durable work queue for distributed batch extraction and comparison.
+
+One LangGraph process cannot saturate the LLM quota (Guardrails parsing and
+JSON work hold the GIL) and cannot span machines. Jobs are therefore kept in
+a SQLite database that any number of worker processes, on one host or on
+several hosts sharing the file, lease with a visibility timeout:
+
+- `lease` atomically hands the oldest runnable job to one worker for
+  `lease_s` seconds; a heartbeat extends it while the job runs, and a job
+  whose worker died becomes visible again once the lease expires.
+- `complete` commits a result only while the job is still open, so a job
+  finished twice (e.g. after a lease expired) keeps the first result.
+- `fail` retries with exponential backoff; after `max_attempts` the job is
+  moved to the dead-letter state with its last error.
+
+Jobs are identified by a hash of their kind and payload, so enqueueing the
+same batch again is a no-op for jobs that already exist.
+
+Usage:
+    python src/work_queue.py enqueue data/sample_publications --query "Datasets"
+    python src/work_queue.py work --workers 4 [--fake-model]
+    python src/work_queue.py status
+    python src/work_queue.py dead [--requeue]
+    python src/work_queue.py results --out outputs/queue/results.json
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import hashlib
+import argparse
+import itertools
+import threading
+import multiprocessing
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from paths import OUTPUTS_DIR
+from sqlite_store import SQLiteStore
+from logger import logger
+
+
+QUEUE_PATH = Path(os.getenv("WORK_QUEUE_PATH", Path(OUTPUTS_DIR) / "queue" / "jobs.sqlite3"))
+LEASE_S = 120.0
+MAX_ATTEMPTS = 3
+BACKOFF_S = 5.0
+POLL_S = 0.5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',  -- queued | leased | done | dead
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_runnable ON jobs (status, available_at);
+"""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+
+
+def job_id(kind: str, payload: dict) -> str:
+    key = json.dumps({"kind": kind, "payload": payload}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+# ==============================
+# Queue
+# ==============================
+
+class WorkQueue(SQLiteStore):
+    """
+    SQLite-backed job queue with visibility-timeout leases and dead letters
+    (see `sqlite_store.SQLiteStore` for how connections are shared).
+
+    Args:
+        path (Path): Database file (created on first use).
+        backoff_s (float): Base retry delay, doubled on every failed attempt.
+    """
+
+    SCHEMA = _SCHEMA
+    BUSY_TIMEOUT_S = 30.0
+
+    def __init__(self, path: Path = QUEUE_PATH, backoff_s: float = BACKOFF_S):
+        self.backoff_s = backoff_s
+        super().__init__(path)
+
+    def enqueue(self, kind: str, payload: dict, max_attempts: int = MAX_ATTEMPTS) -> str:
+        """Adds a job unless an identical one exists; returns its id."""
+        jid = job_id(kind, payload)
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "INSERT OR IGNORE INTO jobs (id, kind, payload, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (jid, kind, json.dumps(payload, ensure_ascii=False), max_attempts, now, now, now),
+            )
+        return jid
+
+    def lease(self, worker: str, lease_s: float = LEASE_S, kinds: Optional[Iterable[str]] = None) -> Optional[Job]:
+        """Leases the oldest runnable job (queued, or leased with an expired lease) to `worker`."""
+        now = time.time()
+        kinds = list(kinds or [])
+        kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})" if kinds else ""
+        with self._transaction() as db:
+            # Jobs whose worker died on their last attempt go straight to the dead letters
+            db.execute(
+                "UPDATE jobs SET status = 'dead', lease_owner = NULL, updated_at = ?, "
+                "error = COALESCE(error, 'lease expired') || ' (lease expired on final attempt)' "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now),
+            )
+            row = db.execute(
+                "SELECT * FROM jobs WHERE ((status = 'queued' AND available_at <= ?) "
+                "OR (status = 'leased' AND lease_expires < ?))" + kind_filter +
+                " ORDER BY available_at, created_at LIMIT 1",
+                (now, now, *kinds),
+            ).fetchone()
+            if row is None:
+                return None
+            if row["status"] == "leased":
+                logger.warning(f"⏰ Lease of job {row['id']} held by {row['lease_owner']} expired; re-leasing")
+            db.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, updated_at = ? WHERE id = ?",
+                (worker, now + lease_s, now, row["id"]),
+            )
+        return Job(row["id"], row["kind"], json.loads(row["payload"]), row["attempts"] + 1, row["max_attempts"])
+
+    def heartbeat(self, jid: str, worker: str, lease_s: float = LEASE_S) -> bool:
+        """Extends `worker`'s lease; False when the lease was lost."""
+        now = time.time()
+        with self._transaction() as db:
+            cur = db.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (now + lease_s, now, jid, worker),
+            )
+        return cur.rowcount == 1
+
+    def complete(self, jid: str, worker: str, result) -> bool:
+        """Commits a result once; later commits for the same job are ignored."""
+        now = time.time()
+        with self._transaction() as db:
+            cur = db.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_owner = ?, "
+                "lease_expires = NULL, updated_at = ? WHERE id = ? AND status = 'leased'",
+                (json.dumps(result, ensure_ascii=False, default=str), worker, now, jid),
+            )
+        if cur.rowcount == 0:
+            logger.info(f"↩️ Result of job {jid} from {worker} ignored (already committed)")
+        return cur.rowcount == 1
+
+    def fail(self, jid: str, worker: str, error: str) -> str:
+        """Records a failed attempt; returns the job's new status (`queued` or `dead`)."""
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (jid, worker),
+            ).fetchone()
+            if row is None:
+                return "lost"
+            status = "dead" if row["attempts"] >= row["max_attempts"] else "queued"
+            delay = self.backoff_s * 2 ** (row["attempts"] - 1)
+            db.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires = NULL, "
+                "available_at = ?, updated_at = ? WHERE id = ?",
+                (status, error, now + delay, now, jid),
+            )
+        return status
+
+    def requeue_dead(self, ids: Optional[Iterable[str]] = None) -> int:
+        """Moves dead-lettered jobs (all, or `ids`) back to the queue with fresh attempts."""
+        ids = list(ids or [])
+        id_filter = f" AND id IN ({','.join('?' * len(ids))})" if ids else ""
+        now = time.time()
+        with self._transaction() as db:
+            cur = db.execute(
+                "UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, updated_at = ? "
+                "WHERE status = 'dead'" + id_filter,
+                (now, now, *ids),
+            )
+        return cur.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        with self._connect() as db:
+            rows = db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = {"queued": 0, "leased": 0, "done": 0, "dead": 0}
+        counts.update({r["status"]: r["n"] for r in rows})
+        return counts
+
+    def pending(self) -> int:
+        """Jobs that may still run (queued or leased)."""
+        counts = self.stats()
+        return counts["queued"] + counts["leased"]
+
+    def jobs(self, status: Optional[str] = None) -> List[dict]:
+        with self._connect() as db:
+            if status:
+                rows = db.execute("SELECT * FROM jobs WHERE status = ? ORDER BY created_at", (status,)).fetchall()
+            else:
+                rows = db.execute("SELECT * FROM jobs ORDER BY created_at").fetchall()
+        return [
+            {**dict(r), "payload": json.loads(r["payload"]), "result": json.loads(r["result"]) if r["result"] else None}
+            for r in rows
+        ]
+
+
+# ==============================
+# Job Handlers
+# ==============================
+
+RESULT_KEYS = (
+    "profiles", "profile_sources", "profile_diff", "comparison", "trends",
+    "summary", "fact_check", "grounding", "extra_info",
+)
+
+
+def handle_extract(explorer, payload: dict) -> dict:
+    """Profile fields of one publication (cached fields are reused)."""
+    from profile_store import PROFILE_FIELDS
+
+    fields = tuple(payload.get("fields") or PROFILE_FIELDS)
+    return explorer.ensure_profile(payload["path"], Path(payload["path"]).stem, fields, save=False)
+
+
+def handle_compare(explorer, payload: dict) -> dict:
+    """Full comparison graph over the payload's publications."""
+    state = {
+        "run_id": payload.get("run_id") or uuid.uuid4().hex,
+        "pub_paths": payload["paths"],
+        "user_query": payload["query"],
+        "fast": bool(payload.get("fast")),
+        "count": 0,
+    }
+    result = explorer.graph.invoke(state)
+    return {k: result.get(k) for k in RESULT_KEYS}
+
+
+HANDLERS: Dict[str, Callable] = {"extract": handle_extract, "compare": handle_compare}
+
+
+# ==============================
+# Worker
+# ==============================
+
+class _Heartbeat(threading.Thread):
+    """Keeps a job's lease alive while its handler runs."""
+
+    def __init__(self, queue: WorkQueue, job: Job, worker: str, lease_s: float):
+        super().__init__(daemon=True)
+        self.queue, self.job, self.worker, self.lease_s = queue, job, worker, lease_s
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.lease_s / 3):
+            if not self.queue.heartbeat(self.job.id, self.worker, self.lease_s):
+                logger.warning(f"⚠️ {self.worker} lost the lease of job {self.job.id}")
+                return
+
+
+def build_explorer(fake_model: bool = False, latency_s: float = 0.0):
+    from explorer import PublicationExplorer
+
+    if fake_model:
+        from fake_model import use_fake_models
+
+        explorer = PublicationExplorer()
+        use_fake_models(explorer, latency_s=latency_s)
+        return explorer
+    return PublicationExplorer()
+
+
+def run_worker(
+    queue_path: Path = QUEUE_PATH,
+    worker: Optional[str] = None,
+    fake_model: bool = False,
+    latency_s: float = 0.0,
+    lease_s: float = LEASE_S,
+    backoff_s: float = BACKOFF_S,
+    drain: bool = True,
+    max_jobs: Optional[int] = None,
+) -> int:
+    """
+    Leases and runs jobs until the queue is drained (or forever with
+    `drain=False`). Returns the number of jobs this worker processed.
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    queue = WorkQueue(queue_path, backoff_s=backoff_s)
+    explorer = build_explorer(fake_model, latency_s)
+    processed = 0
+    logger.info(f"👷 Worker {worker} started")
+    while max_jobs is None or processed < max_jobs:
+        job = queue.lease(worker, lease_s)
+        if job is None:
+            if drain and queue.pending() == 0:
+                break
+            time.sleep(POLL_S)
+            continue
+        heartbeat = _Heartbeat(queue, job, worker, lease_s)
+        heartbeat.start()
+        start = time.perf_counter()
+        try:
+            result = HANDLERS[job.kind](explorer, job.payload)
+        except Exception as e:
+            status = queue.fail(job.id, worker, f"{type(e).__name__}: {e}")
+            logger.warning(f"❌ Job {job.id} ({job.kind}) attempt {job.attempts}/{job.max_attempts} failed: {e} → {status}")
+        else:
+            queue.complete(job.id, worker, result)
+            logger.info(f"✅ Job {job.id} ({job.kind}) done by {worker} in {time.perf_counter() - start:.2f}s")
+        finally:
+            heartbeat.stopped.set()
+        processed += 1
+    logger.info(f"👷 Worker {worker} finished after {processed} jobs")
+    return processed
+
+
+def run_workers(n: int, queue_path: Path = QUEUE_PATH, **kwargs) -> List[int]:
+    """Runs `n` worker processes until the queue is drained; returns their exit codes."""
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(target=run_worker, args=(queue_path,), kwargs={"worker": f"{socket.gethostname()}:w{i}", **kwargs})
+        for i in range(n)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    return [p.exitcode for p in procs]
+
+
+# ==============================
+# CLI
+# ==============================
+
+def enqueue_batch(queue: WorkQueue, paths: List[str], query: str, fast: bool = False,
+                  group_size: int = 2, max_attempts: int = MAX_ATTEMPTS) -> Dict[str, int]:
+    """Extraction jobs for every publication, then comparison jobs for every group of `group_size`."""
+    from profile_store import extraction_fields_for_query
+
+    fields = list(extraction_fields_for_query(query))
+    for path in paths:
+        queue.enqueue("extract", {"path": path, "fields": fields}, max_attempts)
+    groups = list(itertools.combinations(paths, group_size))
+    for group in groups:
+        queue.enqueue("compare", {"paths": list(group), "query": query, "fast": fast}, max_attempts)
+    return {"extract": len(paths), "compare": len(groups)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Distributed batch extraction and comparison.")
+    parser.add_argument("--queue", default=str(QUEUE_PATH), help="Queue database (shared storage for many hosts).")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = sub.add_parser("enqueue", help="Queue extraction and comparison jobs.")
+    enqueue.add_argument("directory", help="Directory of .txt publications.")
+    enqueue.add_argument("--query", required=True)
+    enqueue.add_argument("--group-size", type=int, default=2, help="Publications per comparison.")
+    enqueue.add_argument("--limit", type=int, default=None, help="Use only the first N publications.")
+    enqueue.add_argument("--fast", action="store_true", help="Fast comparisons (no compare LLM call).")
+    enqueue.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS)
+
+    work = sub.add_parser("work", help="Run worker processes on this host.")
+    work.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    work.add_argument("--lease", type=float, default=LEASE_S, help="Lease (visibility timeout) in seconds.")
+    work.add_argument("--forever", action="store_true", help="Keep polling once the queue is drained.")
+    work.add_argument("--fake-model", action="store_true", help="Offline fake model (no API calls).")
+    work.add_argument("--latency", type=float, default=0.0, help="Fake model latency per call (s).")
+
+    sub.add_parser("status", help="Job counts by status.")
+    dead = sub.add_parser("dead", help="List dead-lettered jobs.")
+    dead.add_argument("--requeue", action="store_true", help="Move them back to the queue.")
+    results = sub.add_parser("results", help="Export results of finished jobs.")
+    results.add_argument("--out", default=str(Path(OUTPUTS_DIR) / "queue" / "results.json"))
+    args = parser.parse_args(argv)
+
+    queue = WorkQueue(Path(args.queue))
+    if args.command == "enqueue":
+        paths = sorted(str(p.resolve()) for p in Path(args.directory).glob("*.txt"))[:args.limit]
+        counts = enqueue_batch(queue, paths, args.query, args.fast, args.group_size, args.max_attempts)
+        print(f"📥 Queued {counts['extract']} extraction and {counts['compare']} comparison jobs: {queue.stats()}")
+    elif args.command == "work":
+        start = time.perf_counter()
+        kwargs = {"fake_model": args.fake_model, "latency_s": args.latency, "lease_s": args.lease,
+                  "drain": not args.forever}
+        codes = run_workers(args.workers, Path(args.queue), **kwargs)
+        print(f"🏁 {args.workers} workers finished in {time.perf_counter() - start:.1f}s "
+              f"(exit codes {codes}): {queue.stats()}")
+    elif args.command == "status":
+        print(json.dumps(queue.stats()))
+    elif args.command == "dead":
+        for job in queue.jobs("dead"):
+            print(f"💀 {job['id']} {job['kind']} after {job['attempts']} attempts: {job['error']}")
+        if args.requeue:
+            print(f"♻️ Requeued {queue.requeue_dead()} jobs")
+    elif args.command == "results":
+        done = queue.jobs("done")
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump([{k: j[k] for k in ("id", "kind", "payload", "result")} for j in done], f, indent=2, ensure_ascii=False)
+        print(f"💾 Wrote {len(done)} results to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
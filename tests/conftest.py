@@ -11,6 +11,13 @@ SRC_DIR = ROOT_DIR / "src"
 sys.path.insert(0, str(ROOT_DIR))
 sys.path.insert(0, str(SRC_DIR))
 
+# Keep the agent's web search offline during tests
+os.environ.setdefault("SEARCH_BACKEND", "corpus")
+# tiktoken downloads its encodings on first use; count tokens offline instead
+os.environ.setdefault("TOKENIZER", "approx")
+# Extracted profile fields must not leak between tests through the on-disk cache
+os.environ.setdefault("PROFILE_CACHE", "0")
+
 
 @pytest.fixture
 def sample_pub_files(tmp_path):
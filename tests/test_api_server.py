@@ -0,0 +1,109 @@
+# tests/test_api_server.py
+import functools
+import threading
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import run_history
+from api_client import ApiClient, ApiError
+from api_server import ApiServer, JobManager
+from latency import HedgeBudget, LatencyTracker
+from model_tiers import TierMetrics
+from paths import SAMPLE_PUBLICATION_DIR, SRC_DIR
+from run_history import NodeLedger
+from work_queue import build_explorer
+
+PUBS = sorted(p.name for p in Path(SAMPLE_PUBLICATION_DIR).glob("*.txt"))[:2]
+
+
+@pytest.fixture(scope="module")
+def server():
+    manager = JobManager(workers=1, explorer_factory=functools.partial(build_explorer, fake_model=True))
+    with ApiServer(manager) as running:
+        yield running
+
+
+def test_job_streams_node_progress_and_result(server, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # the explorer saves validated profiles under ./outputs/profiles
+    client = ApiClient(server.url)
+    job = client.submit(PUBS, "Datasets")
+    assert job["status"] == "queued" and job["links"]["events"] == f"/jobs/{job['id']}/events"
+
+    events = list(client.events(job["id"]))
+    kinds = [e["event"] for e in events]
+    assert kinds[0] == "queued" and kinds[1] == "running" and kinds[-1] == "done"
+    nodes = [e["node"] for e in events if e["event"] == "node"]
+    assert nodes[:2] == ["analyze_pubs", "compare"] and "summarize" in nodes
+    assert [e["id"] for e in events] == list(range(len(events)))
+
+    result = client.result(job["id"])
+    assert result["summary"] and len(result["profiles"]) == 2
+    assert "calls" in result["hedging"]
+    # The worker reuses its explorer, yet each job reports only its own calls
+    second = client.submit(PUBS, "Datasets")
+    list(client.events(second["id"]))
+    calls = [sum(t["calls"] for t in r["tier_metrics"]["tiers"].values()) for r in (result, client.result(second["id"]))]
+    assert 0 < calls[1] <= calls[0]
+    # A late subscriber replays the finished job's events
+    assert [e["event"] for e in client.events(job["id"])] == kinds
+
+
+def test_invalid_submissions_and_full_queue():
+    release = threading.Event()
+
+    class BlockingGraph:
+        def stream(self, state, stream_mode=None):
+            release.wait(10)
+            raise RuntimeError("stub failure")
+            yield
+
+    class BlockingExplorer:
+        graph = BlockingGraph()
+        tier_metrics = TierMetrics({})
+        hedge_budget = HedgeBudget()
+        latency = LatencyTracker()
+        node_ledger = NodeLedger()
+
+    manager = JobManager(workers=1, max_queued=1, explorer_factory=BlockingExplorer)
+    with ApiServer(manager) as server:
+        client = ApiClient(server.url)
+        with pytest.raises(ApiError, match="HTTP 400"):
+            client.submit(PUBS[:1], "Datasets")
+        with pytest.raises(ApiError, match="unknown publication"):
+            client.submit(["../secrets.txt", PUBS[0]], "Datasets")
+        with pytest.raises(ApiError, match="HTTP 404"):
+            client.job("missing")
+
+        running = client.submit(PUBS, "Datasets")
+        for event in client.events(running["id"]):
+            if event["event"] == "running":
+                break
+        client.submit(PUBS, "Datasets")  # waits for the only worker
+        with pytest.raises(ApiError, match="HTTP 503"):
+            client.submit(PUBS, "Datasets")
+        with pytest.raises(ApiError, match="still running"):
+            client.result(running["id"])
+        release.set()
+        failed = list(client.events(running["id"]))[-1]
+        assert failed["event"] == "failed" and "stub failure" in failed["error"]
+
+
+def test_app_runs_as_thin_client(server, monkeypatch, tmp_path):
+    monkeypatch.setenv("API_URL", server.url)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("src.paths.PROFILES_DIR", tmp_path / "profiles")
+    monkeypatch.setattr("src.paths.COMPARISONS_DIR", tmp_path / "comparisons")
+    monkeypatch.setattr(run_history, "HISTORY_PATH", tmp_path / "run_history.sqlite3")
+    at = AppTest.from_file(str(SRC_DIR / "app.py"), default_timeout=120)
+    at.run()
+    assert next(c for c in at.checkbox if c.label == "🎞️ Record LLM cassette").disabled  # local runs only
+    at.multiselect(key="pubs").set_value(PUBS)
+    next(s for s in at.selectbox if s.label == "Select a query type").set_value("Datasets")
+    next(b for b in at.button if b.label == "🚀 Run Comparison").click()
+    at.run()
+    assert not at.exception
+    assert any(h.value == "✅ Summary" for h in at.subheader)
+    assert at.text_area[0].value
+    assert list((tmp_path / "comparisons").glob("*.json")) and (tmp_path / "run_history.sqlite3").exists()
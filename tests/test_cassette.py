@@ -0,0 +1,62 @@
+# tests/test_cassette.py
+import pytest
+from unittest.mock import MagicMock
+from langchain_core.messages import AIMessage, SystemMessage
+
+from cassette import Cassette, CassetteMiss
+from explorer import PublicationExplorer
+
+
+PROFILE_JSON = '{"tools": ["HuggingFace"], "evaluation_methods": ["BLEU"], "datasets": ["SST-2"], "task_types": ["NLP"], "results": []}'
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        if messages[0].content.startswith("You are an expert scientific reviewer"):
+            return AIMessage(content=PROFILE_JSON)
+        return AIMessage(content=f"answer {self.calls}")
+
+
+def _state(pub1, pub2):
+    return {
+        "run_id": "test", "pub1_path": pub1, "pub2_path": pub2, "user_query": "Datasets",
+        "pub1_profile": "", "pub2_profile": "", "comparison": "", "trends": "", "summary": "",
+        "fact_check": "", "extra_info": "", "lnode": "", "count": 0,
+    }
+
+
+def test_cassette_round_trip(tmp_path):
+    path = tmp_path / "run.jsonl.gz"
+    recorder = Cassette(path)
+    model = recorder.wrap_model(FakeModel())
+    first = model.invoke([SystemMessage(content="hello")]).content
+    recorder.save(state={"user_query": "x"})
+
+    replay = Cassette.load(path, strict=True)
+    assert replay.header["state"] == {"user_query": "x"}
+    assert replay.wrap_model().invoke([SystemMessage(content="hello")]).content == first
+    with pytest.raises(CassetteMiss):
+        replay.wrap_model().invoke([SystemMessage(content="hello")])
+
+
+def test_explorer_replays_recorded_run_offline(tmp_path, sample_pub_files):
+    pub1, pub2 = sample_pub_files
+    path = tmp_path / "run.jsonl.gz"
+
+    recorder = Cassette(path)
+    live = PublicationExplorer(cassette=recorder)
+    live.model.model = FakeModel()
+    live.react_agent.agent = MagicMock()
+    live.react_agent.agent.run.return_value = "Enriched insights."
+    recorded = live.graph.invoke(_state(pub1, pub2))
+    recorder.save(state=_state(pub1, pub2))
+
+    replayed = PublicationExplorer(cassette=Cassette.load(path, strict=True)).graph.invoke(_state(pub1, pub2))
+
+    for key in ("pub1_profile", "comparison", "trends", "summary", "fact_check", "extra_info"):
+        assert replayed[key] == recorded[key]
+    assert replayed["pub1_profile"]["datasets"] == ["SST-2"]
@@ -0,0 +1,70 @@
+# tests/test_enrichment.py
+import time
+
+from langchain.agents import initialize_agent, Tool
+from langchain.agents.agent_types import AgentType
+from langchain_core.language_models import FakeListLLM
+
+from enrichment import EnrichmentBudget, prefetch_tools, run_enrichment
+
+
+LOOPING_STEP = "Thought: I should search.\nAction: WebSearch\nAction Input: SST-2 benchmark"
+FINAL_STEP = "Thought: I know enough.\nFinal Answer: Both papers rely on SST-2."
+
+
+def _agent(responses, tools):
+    return initialize_agent(
+        tools=[Tool(name, fn, f"{name} tool.") for name, fn in tools.items()],
+        llm=FakeListLLM(responses=responses),
+        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        handle_parsing_errors=True,
+    )
+
+
+def test_enrichment_completes_within_budget():
+    tools = {"WebSearch": lambda q: "SST-2 is a sentiment benchmark."}
+    agent = _agent([LOOPING_STEP, FINAL_STEP], tools)
+
+    result = run_enrichment(agent, "Enrich", "context", tools, {}, EnrichmentBudget())
+
+    assert result.complete
+    assert result.answer == "Both papers rely on SST-2."
+    assert [step["kind"] for step in result.steps] == ["llm", "tool", "llm"]
+
+
+def test_iteration_budget_returns_partial_answer():
+    tools = {"WebSearch": lambda q: "SST-2 is a sentiment benchmark."}
+    agent = _agent([LOOPING_STEP] * 10, tools)
+
+    result = run_enrichment(agent, "Enrich", "context", tools, {}, EnrichmentBudget(max_iterations=2))
+
+    assert not result.complete
+    assert result.stop_reason == "max_iterations"
+    assert "Partial enrichment" in result.answer
+    assert "sentiment benchmark" in result.answer
+
+
+def test_prefetch_runs_tools_concurrently():
+    def slow(text):
+        time.sleep(0.3)
+        return f"done: {text}"
+
+    tools = {"KeywordTagExtractor": slow, "RAGRetriever": slow, "WebSearch": slow}
+    start = time.perf_counter()
+    results = prefetch_tools(tools, {name: "query" for name in tools}, timeout_s=5)
+
+    assert time.perf_counter() - start < 0.8
+    assert set(results) == set(tools)
+
+
+def test_prefetched_observations_reach_the_agent():
+    class RecordingAgent:
+        def run(self, prompt, callbacks=None):
+            self.prompt = prompt
+            return "ok"
+
+    agent = RecordingAgent()
+    tools = {"RAGRetriever": lambda q: "retrieved passage"}
+    run_enrichment(agent, "Enrich", "context", tools, {"RAGRetriever": "q"}, EnrichmentBudget())
+
+    assert "RAGRetriever: retrieved passage" in agent.prompt
@@ -0,0 +1,67 @@
+# tests/test_entity_extractor.py
+import json
+import time
+
+from entity_extractor import AhoCorasick, EntityExtractor, get_entity_extractor, tokenize
+from explorer import KeywordTagExtractor
+from paths import PUBLICATION_FPATH
+
+
+GAZETTEER = {
+    "tools": {
+        "Hugging Face": ["huggingface"],
+        "Hugging Face Transformers": ["hf transformers"],
+        "PyTorch": ["torch"],
+        "torchvision": [],
+    },
+    "datasets": {"SST-2": ["sst2"]},
+    "evaluation_methods": {"F1 score": ["f1"]},
+    "task_types": {},
+}
+
+
+def test_automaton_reports_overlapping_matches():
+    automaton = AhoCorasick([(("a", "b"), "ab"), (("b", "c"), "bc"), (("b",), "b")])
+    matches = sorted(automaton.iter_matches(["a", "b", "c", "b"]))
+    assert matches == [(0, 2, "ab"), (1, 2, "b"), (1, 3, "bc"), (3, 4, "b")]
+
+
+def test_extract_prefers_leftmost_longest_and_resolves_aliases():
+    extractor = EntityExtractor(GAZETTEER)
+    hits = extractor.extract(
+        "We use Hugging Face Transformers with torch and torchvision; "
+        "HuggingFace hosts SST2. F1 improves on sst-2."
+    )
+
+    assert hits["tools"] == {"Hugging Face Transformers": 1, "PyTorch": 1, "torchvision": 1, "Hugging Face": 1}
+    assert hits["datasets"]["SST-2"] == 2
+    assert hits["evaluation_methods"]["F1 score"] == 1
+    assert tokenize("C++ and GPT-3.5") == ["c++", "and", "gpt", "3.5"]
+
+
+def test_fallback_profile_and_keyword_tool():
+    extractor = EntityExtractor(GAZETTEER)
+    profile = extractor.fallback_profile("torch, torch and F1 on sst2")
+
+    assert profile == {
+        "tools": ["PyTorch"],
+        "datasets": ["SST-2"],
+        "evaluation_methods": ["F1 score"],
+        "task_types": [],
+        "results": [],
+    }
+    assert KeywordTagExtractor(extractor).run("torch on sst2") == "Keywords: PyTorch, SST-2"
+    assert KeywordTagExtractor(extractor).run("nothing here") == "Keywords: none found"
+
+
+def test_corpus_scan_is_fast():
+    with open(PUBLICATION_FPATH, "r", encoding="utf-8") as f:
+        texts = [p.get("publication_description") or "" for p in json.load(f)]
+    extractor = get_entity_extractor()
+
+    start = time.perf_counter()
+    hits = [extractor.extract(text) for text in texts]
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.0
+    assert sum(sum(h["tools"].values()) for h in hits) > 0
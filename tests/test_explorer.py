@@ -17,7 +17,7 @@ sys.path.insert(0, str(SRC_DIR))
 
 
 
-from src.explorer import PublicationExplorer
+from src.explorer import PublicationExplorer, compress_profile
 
 
 
@@ -31,16 +31,103 @@ def explorer():
     return exp
 
 
-def test_analyze_pub1(explorer, sample_pub_files):
+def test_analyze_pubs(explorer, sample_pub_files):
     pub1, pub2 = sample_pub_files
     state = {"pub1_path": pub1, "pub2_path": pub2, "user_query": "Tool Usage", "count": 0}
 
     explorer.model.invoke.return_value.content = '{"tools": ["HuggingFace"], "evaluation_methods": ["BLEU"], "datasets": [], "task_types": ["NLP"], "results": ["Good performance"]}'
-    result = explorer.analyze_pub1(state)
+    result = explorer.analyze_pubs(state)
 
     assert "pub1_profile" in result
     assert isinstance(result["pub1_profile"], dict)
     assert "HuggingFace" in result["pub1_profile"]["tools"]
+    assert len(result["profiles"]) == 2
+
+
+def test_many_publications_cost_grows_linearly(explorer, tmp_path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"paper_{i}.txt"
+        path.write_text(f"Publication {i} uses PyTorch and dataset D{i}.")
+        paths.append(str(path))
+
+    def invoke(messages, **kwargs):
+        response = MagicMock()
+        prompt = messages[0].content
+        profile = '{"tools": ["PyTorch"], "evaluation_methods": [], "datasets": [], "task_types": [], "results": []}'
+        response.content = profile if prompt.startswith("You are an expert") else prompt
+        return response
+
+    explorer.model.invoke.side_effect = invoke
+    explorer.react_agent.run.return_value = "Enriched insights."
+    state = {"pub_paths": paths, "user_query": "Tool Usage", "count": 0}
+    result = explorer.graph.invoke(state)
+
+    # One extraction per publication plus one pass each for compare, trends, summary and fact check
+    assert explorer.model.invoke.call_count == 5 + 4
+    assert len(result["profiles"]) == 5
+    assert "Compare the 5 research publications" in result["comparison"]
+    assert "pub5 = paper_4" in result["comparison"]
+    assert result["profile_diff"]["fields"]["tools"]["shared"] == ["PyTorch"]
+
+
+def test_lazy_extraction_requests_only_missing_fields(explorer, sample_pub_files):
+    pub1, pub2 = sample_pub_files
+    prompts = []
+
+    def invoke(messages, **kwargs):
+        prompts.append(messages[0].content)
+        response = MagicMock()
+        response.content = '{"tools": ["HuggingFace"], "datasets": ["SST-2"]}'
+        return response
+
+    explorer.model.invoke.side_effect = invoke
+    state = {"pub_paths": [pub1, pub2], "user_query": "Datasets", "count": 0}
+    result = explorer.analyze_pubs(state)
+
+    assert result["profiles"] == [{"datasets": ["SST-2"]}] * 2
+    assert "- `datasets`" in prompts[0] and "- `tools`" not in prompts[0]
+
+    prompts.clear()
+    result = explorer.analyze_pubs({**state, "user_query": "Tool Usage"})
+    assert result["profiles"][0] == {"tools": ["HuggingFace"]}
+    assert len(prompts) == 2 and "- `datasets`" not in prompts[0]
+
+    prompts.clear()
+    explorer.analyze_pubs({**state, "user_query": "Datasets"})
+    assert prompts == []
+    assert explorer.profile_store.get(explorer.read_txt(pub1)) == {"datasets": ["SST-2"], "tools": ["HuggingFace"]}
+
+
+def test_fact_check_escalates_only_weak_claims(explorer, sample_pub_files):
+    pub1, pub2 = sample_pub_files
+    explorer.model.invoke.return_value.content = "1. NOT FOUND"
+    state = {
+        "pub_paths": [pub1, pub2], "user_query": "Datasets", "count": 0,
+        "profiles": [{"datasets": []}, {"datasets": ["SST-2"]}], "profile_fields": ["datasets"],
+        "summary": "Publication 2 benchmarks transformers on SST-2. Both report ImageNet top-1 accuracy gains.",
+    }
+    result = explorer.fact_check(state)
+
+    assert [c["supported"] for c in result["grounding"]] == [True, True, False]
+    assert result["grounding"][0]["evidence"][0]["publication"] == "pub2"
+    prompt = explorer.model.invoke.call_args[0][0][0].content
+    assert "ImageNet" in prompt and "SST-2" not in prompt
+    assert result["fact_check"].startswith("Lexically grounded: 2/3 claims.")
+
+    explorer.model.invoke.reset_mock()
+    result = explorer.fact_check({**state, "summary": ""})
+    explorer.model.invoke.assert_not_called()
+    assert result["fact_check"] == "Lexically grounded: 1/1 claims."
+
+
+def test_compress_profile_fits_budget():
+    profile = {"tools": ["PyTorch", "PyTorch", "JAX"], "datasets": ["D" * 500], "results": []}
+
+    assert compress_profile(profile, 1000) == "tools: PyTorch; JAX\ndatasets: " + "D" * 500
+    compact = compress_profile(profile, 100)
+    assert len(compact) <= 100
+    assert compact.startswith("tools: PyTorch; JAX\ndatasets: DDD")
 
 
 def test_compare(explorer, sample_pub_files):
@@ -61,6 +148,25 @@ def test_compare(explorer, sample_pub_files):
     assert "datasets" in result["comparison"].lower()
 
 
+def test_fast_compare_skips_llm(explorer, sample_pub_files):
+    pub1, pub2 = sample_pub_files
+    state = {
+        "pub1_path": pub1,
+        "pub2_path": pub2,
+        "user_query": "Tool Usage",
+        "fast": True,
+        "pub1_profile": {"tools": ["HF Transformers", "sklearn"]},
+        "pub2_profile": {"tools": ["HuggingFace Transformers"]},
+        "count": 0,
+    }
+
+    result = explorer.compare(state)
+
+    explorer.model.invoke.assert_not_called()
+    assert "shared by all: HF Transformers" in result["comparison"]
+    assert "only pub1: sklearn" in result["comparison"]
+
+
 def test_react_agent_tool(explorer, sample_pub_files):
     pub1, pub2 = sample_pub_files
     state = {"pub1_path": pub1, "pub2_path": pub2, "user_query": "Extra info", "count": 0}
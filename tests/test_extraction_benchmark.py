@@ -0,0 +1,50 @@
+# tests/test_extraction_benchmark.py
+import xml.etree.ElementTree as ET
+
+from extraction_benchmark import (
+    ExtractionSettings,
+    FieldScore,
+    SettingResult,
+    build_benchmark_explorer,
+    count_matches,
+    load_gold,
+    pareto_front,
+    run_benchmark,
+    score_profile,
+    settings_grid,
+    write_frontier_svg,
+)
+
+
+def test_scoring_matches_aliases_and_result_paraphrases():
+    assert count_matches("tools", ["HF Transformers", "roberta", "spaCy"], ["RoBERTa", "Hugging Face Transformers"]) == 2
+    assert count_matches("results", ["RoBERTa was chosen since it is more efficient to train"],
+                         ["RoBERTa was chosen for PII redaction because it is smaller and more efficient to train"]) == 1
+
+    scores = score_profile({"datasets": ["MNIST", "CIFAR-10"]}, {"datasets": ["MNIST"], "tools": ["Keras"]}, ("datasets", "tools"))
+    assert (scores["datasets"].precision, scores["datasets"].recall) == (0.5, 1.0)
+    assert scores["tools"].recall == 0.0
+
+
+def test_pareto_front_keeps_only_undominated_settings():
+    def result(tokens, f1, latency_ms):
+        score = FieldScore(matched=int(f1 * 100), predicted=100, gold=100)
+        return SettingResult(ExtractionSettings(tokens), {"tools": score}, [latency_ms], cost_usd=0.0, prompt_tokens=0)
+
+    cheap, dominated, best = result(500, 0.4, 10), result(1000, 0.3, 20), result(3500, 0.8, 50)
+    assert pareto_front([best, dominated, cheap], lambda r: r.mean_latency_ms) == [cheap, best]
+
+
+def test_benchmark_scores_fake_extractions_and_plots_frontier(tmp_path):
+    gold = dict(list(load_gold().items())[:2])
+    explorer = build_benchmark_explorer("fake")
+    results = run_benchmark(explorer, settings_grid([300, 3500], ["strong", "fast"]), gold)
+
+    by_name = {r.settings.name: r for r in results}
+    assert by_name["3500t/strong"].overall.recall > by_name["300t/strong"].overall.recall  # truncation loses entities
+    assert by_name["3500t/fast"].cost_usd < by_name["3500t/strong"].cost_usd
+    assert all(r.failures == 0 for r in results)
+    assert any(r.pareto_latency for r in results) and any(r.pareto_cost for r in results)
+
+    svg = ET.parse(write_frontier_svg(results, tmp_path / "frontier.svg")).getroot()
+    assert len(svg.findall("{http://www.w3.org/2000/svg}circle")) == 2 * len(results)
@@ -0,0 +1,71 @@
+# tests/test_flowchart.py
+from typing import TypedDict
+
+from streamlit.testing.v1 import AppTest
+
+import run_history
+from flowchart import END, START, bottleneck, graph_topology, heat_color, node_metrics, pipeline_topology, to_dot, to_mermaid
+from paths import SRC_DIR
+from run_history import RunHistory, RunRecord
+
+STATS = {
+    "analyze_pubs": {"calls": 4, "failures": 0, "failure_rate": 0.0, "p50_ms": 900.0, "p95_ms": 1000.0,
+                     "input_tokens": 4000, "output_tokens": 400},
+    "summarize": {"calls": 4, "failures": 1, "failure_rate": 0.25, "p50_ms": 3000.0, "p95_ms": 4000.0,
+                  "input_tokens": 800, "output_tokens": 200},
+}
+
+
+def test_topology_follows_the_compiled_graph():
+    topology = pipeline_topology()
+    assert topology.steps == ["analyze_pubs", "compare", "aggregate_trends", "summarize", "fact_check_node", "react_agent_tool"]
+    assert topology.edges[0] == (START, "analyze_pubs", False) and topology.edges[-1] == ("react_agent_tool", END, False)
+
+    from langgraph.graph import StateGraph
+
+    class State(TypedDict):
+        x: int
+
+    builder = StateGraph(State)
+    builder.add_node("a", lambda s: s)
+    builder.add_node("b", lambda s: s)
+    builder.set_entry_point("a")
+    builder.add_conditional_edges("a", lambda s: "b" if s["x"] else END, {"b": "b", END: END})
+    builder.add_edge("b", END)
+    edges = set(graph_topology(builder.compile()).edges)
+    assert {("a", "b", True), ("a", END, True), ("b", END, False)} <= edges
+    assert "    a -.-> b" in to_mermaid(graph_topology(builder.compile()))
+
+
+def test_heatmap_annotates_and_colors_nodes():
+    metrics = node_metrics(STATS, {"compare": {"calls": 5, "p50_ms": 10.0, "p95_ms": 20.0, "error_rate": 0.2},
+                                   "summarize": {"calls": 5, "p50_ms": 1.0, "p95_ms": 1.0, "error_rate": 0.4}})
+    assert metrics["summarize"]["failure_rate"] == 0.4 and metrics["summarize"]["p95_ms"] == 4000.0
+    assert metrics["compare"]["tokens_per_run"] is None and metrics["analyze_pubs"]["tokens_per_run"] == 1100
+    assert bottleneck(metrics) == ("summarize", 4000 / 5020)
+    assert (heat_color(0), heat_color(1)) == ("#c7e9c0", "#f46d43")
+
+    dot = to_dot(pipeline_topology(), metrics)
+    assert '"summarize" [label="summarize\\np50 3.0s · p95 4.0s\\n250 tok/run · 40.0% failed", fillcolor="#f46d43"]' in dot
+    assert '"aggregate_trends" [label="aggregate_trends", fillcolor="#eeeeee"]' in dot
+    assert '"aggregate_trends" -> "summarize" [color="#f46d43", penwidth=4.0, label="4 runs"]' in dot
+
+    mermaid = to_mermaid(pipeline_topology(), metrics)
+    assert 'analyze_pubs["analyze_pubs<br/>p50 900ms · p95 1.0s<br/>1,100 tok/run · 0.0% failed"]' in mermaid
+    assert "    style summarize fill:#f46d43,stroke:#333,stroke-width:1px" in mermaid
+    assert '    aggregate_trends -->|"4 runs"| summarize' in mermaid
+
+
+def test_history_page_renders_the_heatmap(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_history, "HISTORY_PATH", tmp_path / "history.sqlite3")
+    slow = {"duration_ms": 5000.0, "status": "ok", "input_tokens": 10, "output_tokens": 5}
+    fast = {"duration_ms": 50.0, "status": "ok", "input_tokens": 0, "output_tokens": 0}
+    RunHistory().record(RunRecord("r1", "2026-10-19T12:00:00", "Datasets", ["a", "b"], [],
+                                  {"analyze_pubs": fast, "summarize": slow}))
+
+    at = AppTest.from_file(str(SRC_DIR / "pages" / "1_History.py"), default_timeout=60)
+    at.run()
+    assert not at.exception
+    assert at.warning[0].value.startswith("Bottleneck: `summarize`")
+    chart = at.get("graphviz_chart")[0].proto.spec
+    assert "digraph pipeline" in chart and '"summarize" [label="summarize\\np50 5.0s' in chart
@@ -0,0 +1,43 @@
+# tests/test_grounding.py
+from grounding import Claim, GroundingIndex, profile_claims, summary_claims, verify_claims
+
+
+DOC = (
+    "We fine-tune BERT on the SST-2 dataset. Models are evaluated with F1 on SST-2 "
+    "and accuracy on IMDB reviews."
+)
+
+
+def test_index_positions_and_offsets():
+    index = GroundingIndex(DOC)
+    start = index.positions(("sst-2", "dataset"))[0]
+    lo, hi = index.span(start, start + 2)
+    assert DOC[lo:hi] == "SST-2 dataset"
+    assert len(index.positions(("sst-2",))) == 2
+
+
+def test_claims_are_scored_with_evidence_offsets():
+    checks = verify_claims(
+        [
+            Claim("evaluated with F1 on SST-2", "summary"),
+            Claim("IMDB", "paper:datasets", ["paper"]),
+            Claim("trained with reinforcement learning on Atari", "summary"),
+        ],
+        {"paper": DOC},
+    )
+
+    supported, entity, unsupported = checks
+    assert supported.supported and supported.score == 1.0
+    span = supported.evidence[0]
+    assert span["publication"] == "paper" and DOC[span["start"]:span["end"]] == span["text"]
+    assert "F1 on SST-2" in span["text"]
+    assert entity.supported
+    assert not unsupported.supported and unsupported.score < 0.5
+
+
+def test_claim_builders():
+    claims = profile_claims(["a", "b"], [{"datasets": ["SST-2"]}, "raw"], ["datasets", "tools"])
+    assert [(c.text, c.source, c.publications) for c in claims] == [("SST-2", "a:datasets", ["a"])]
+
+    sentences = summary_claims("## Summary\n- Both papers use BERT models.\nOk. Short one.")
+    assert [c.text for c in sentences] == ["Both papers use BERT models."]
@@ -0,0 +1,70 @@
+# tests/test_ingest.py
+import filecmp
+import json
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from ingest import DocumentManifest, ingest, iter_records
+from paths import PUBLICATION_FPATH, SAMPLE_PUBLICATION_DIR
+
+
+def test_iter_records_streams_arrays_and_json_lines_in_bounded_memory(tmp_path):
+    records = [{"id": f"p{i}", "title": f"T{i}", "publication_description": "word " * 400} for i in range(2000)]
+    array, lines = tmp_path / "dump.json", tmp_path / "dump.jsonl"
+    array.write_text(json.dumps(records, indent=1), encoding="utf-8")
+    lines.write_text("\n".join(json.dumps(r) for r in records), encoding="utf-8")
+
+    assert list(iter_records(lines)) == records
+    tracemalloc.start()
+    count = sum(1 for _ in iter_records(array, chunk_chars=4096))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert count == 2000
+    assert peak < array.stat().st_size / 20  # ~4 MB dump; only a chunk and one record are held
+
+    broken = tmp_path / "broken.json"
+    broken.write_text('[{"id": "a"}, {"id": ', encoding="utf-8")
+    with pytest.raises(ValueError, match="malformed JSON"):
+        list(iter_records(broken))
+
+
+def test_ingest_reproduces_the_app_corpus_and_skips_unchanged_records(tmp_path):
+    docs, manifest = tmp_path / "docs", tmp_path / "documents.sqlite3"
+    assert ingest(PUBLICATION_FPATH, docs, manifest)["new"] == 35
+    names = sorted(p.name for p in docs.iterdir())
+    assert names == sorted(p.name for p in Path(SAMPLE_PUBLICATION_DIR).glob("*.txt"))
+    assert all(filecmp.cmp(docs / n, Path(SAMPLE_PUBLICATION_DIR) / n, shallow=False) for n in names)
+
+    mtimes = {p.name: p.stat().st_mtime_ns for p in docs.iterdir()}
+    counts = ingest(PUBLICATION_FPATH, docs, manifest, workers=2, batch_size=4)
+    assert counts["unchanged"] == 35 and counts["new"] == counts["changed"] == 0
+    assert {p.name: p.stat().st_mtime_ns for p in docs.iterdir()} == mtimes
+
+    row = next(d for d in DocumentManifest(manifest).documents() if d["id"] == "0CBAR8U8FakE")
+    assert (row["username"], row["license"]) == ("3rdson", "none")
+
+
+def test_ingest_rewrites_changed_records_and_drops_duplicates(tmp_path):
+    docs, manifest = tmp_path / "docs", tmp_path / "documents.sqlite3"
+    dump = tmp_path / "dump.jsonl"
+    base = {"id": "a", "title": "First: Paper", "username": "u", "license": "mit", "publication_description": "Body A\r\n"}
+
+    def run(*records):
+        dump.write_text("\n".join(json.dumps(r) for r in records), encoding="utf-8")
+        return ingest(dump, docs, manifest)
+
+    counts = run(base, {**base, "id": "b", "title": "Copy"}, {"id": "c", "title": "Empty", "publication_description": " "})
+    assert (counts["new"], counts["duplicate"], counts["invalid"]) == (1, 1, 1)
+    assert (docs / "First_ Paper.txt").read_text(encoding="utf-8").endswith("Publication_description:\nBody A\n\n\n")
+
+    counts = run({**base, "title": "Renamed", "publication_description": "Body A, revised"})
+    assert counts["changed"] == 1
+    assert sorted(p.name for p in docs.iterdir()) == ["Renamed.txt"]
+    assert [d["title"] for d in DocumentManifest(manifest).documents()] == ["Renamed"]
+
+    counts = run({**base, "title": "Renamed", "license": "Apache-2.0", "publication_description": "Body A, revised"})
+    assert counts["changed"] == 1  # same description, new license
+    assert "License:\nApache-2.0\n" in (docs / "Renamed.txt").read_text(encoding="utf-8")
+    assert DocumentManifest(manifest).documents()[0]["license"] == "Apache-2.0"
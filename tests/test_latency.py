@@ -0,0 +1,88 @@
+# tests/test_latency.py
+import time
+import threading
+from unittest.mock import MagicMock
+
+from explorer import PublicationExplorer
+from latency import HedgeBudget, LatencyTracker, hedged_call, simulate
+
+
+def test_node_timeout_adapts_to_observed_latency():
+    tracker = LatencyTracker(min_samples=5)
+    assert tracker.node_timeout("compare", 10) == 10  # no observations yet
+
+    for ms in (800, 900, 1000, 1100, 4000):
+        tracker.record("compare", ms)
+    assert tracker.node_timeout("compare", 10) == 12  # 3 × p99
+    tracker.record("compare", 50_000)
+    assert tracker.node_timeout("compare", 10) == 20  # capped at twice the default
+
+    for _ in range(25):
+        tracker.record("summarize", 3)
+    assert tracker.node_timeout("summarize", 30) == 30  # quick runs never cut below the default
+
+
+def test_fast_runs_do_not_feed_llm_timeouts(sample_pub_files):
+    explorer = PublicationExplorer()
+    explorer.latency = LatencyTracker(min_samples=1)
+    state = {"pub_paths": list(sample_pub_files), "user_query": "Tool Usage", "fast": True, "count": 0}
+    explorer.compare(explorer.analyze_pubs(state))
+
+    snapshot = explorer.latency.snapshot()
+    assert {"analyze_pubs:fast", "compare:fast"} <= set(snapshot)
+    assert "analyze_pubs" not in snapshot and "compare" not in snapshot
+
+
+def test_hedged_call_returns_first_answer_within_budget():
+    calls = []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        time.sleep(1.0 if first else 0.01)
+        return "slow" if first else "fast"
+
+    budget = HedgeBudget(max_fraction=0.0, burst=1)
+    start = time.perf_counter()
+    assert hedged_call(call, 0.05, budget) == "fast"
+    assert time.perf_counter() - start < 0.5
+    assert budget.stats == {"calls": 1, "hedges": 1, "hedge_wins": 1}
+
+    calls.clear()
+    assert hedged_call(call, 0.05, budget) == "slow"  # budget exhausted: no duplicate
+
+
+def test_hedging_cuts_tail_latency():
+    baseline = simulate(100, fast_ms=5, slow_ms=300, slow_rate=0.04, hedging=False)
+    hedged = simulate(100, fast_ms=5, slow_ms=300, slow_rate=0.04, hedging=True)
+    assert baseline["p99_ms"] >= 300
+    assert hedged["p99_ms"] < baseline["p99_ms"] / 4
+    assert 0 < hedged["hedges"] <= 0.1 * hedged["calls"] + 2
+
+
+def test_explorer_hedges_slow_llm_calls():
+    explorer = PublicationExplorer()
+    explorer.latency = LatencyTracker(min_samples=1)
+    explorer.latency.record("summarize:llm", 10)
+    calls = []
+
+    def invoke(messages, **kwargs):
+        calls.append(1)
+        response = MagicMock()
+        if len(calls) == 1:
+            time.sleep(1.5)
+            response.content = "slow summary"
+        else:
+            response.content = "fast summary"
+        return response
+
+    explorer.model = MagicMock()
+    explorer.model.invoke.side_effect = invoke
+    start = time.perf_counter()
+    result = explorer.summarize({"comparison": "c", "trends": "t", "count": 0})
+
+    assert result["summary"] == "fast summary"
+    assert time.perf_counter() - start < 1.0
+    assert explorer.hedge_budget.stats["hedge_wins"] == 1
@@ -0,0 +1,42 @@
+# tests/test_load_test.py
+import threading
+
+from explorer import timeout
+from load_test import explorer_session, run_load, summarize, workload
+
+
+def test_workload_rotates_pairs_and_queries():
+    jobs = workload(4, ["a.txt", "b.txt", "c.txt"], queries=("Datasets", "Results"))
+    assert [pubs for pubs, _ in jobs] == [["a.txt", "b.txt"], ["a.txt", "c.txt"], ["b.txt", "c.txt"], ["a.txt", "b.txt"]]
+    assert [query for _, query in jobs] == ["Datasets", "Results", "Datasets", "Results"]
+
+
+def test_run_load_reports_throughput_and_percentiles():
+    calls = []
+
+    def factory():
+        def compare(pubs, query):
+            calls.append(threading.current_thread().name)
+            if len(calls) == 3:
+                raise RuntimeError("boom")
+        return compare
+
+    results, wall_s = run_load(factory, sessions=3, iterations=2, publications=["a.txt", "b.txt"])
+    report = summarize("explorer", 3, results, wall_s)
+    assert report.comparisons == 6 and report.errors == 1
+    assert len(set(calls)) == 3  # one thread per session
+    assert report.p50_ms is not None and report.p50_ms <= report.p99_ms
+    assert report.throughput_per_s > 0
+
+
+def test_explorer_sessions_run_concurrently_off_the_main_thread():
+    # Node timeouts must not rely on signals outside the main thread
+    assert threading.current_thread() is threading.main_thread()
+    results, wall_s = run_load(explorer_session(fast=True, fake_model=True), sessions=2, iterations=1)
+    assert [r.error for r in results] == [None, None]
+
+    outcome = []
+    thread = threading.Thread(target=lambda: outcome.append(timeout(5)(lambda: "done")()))
+    thread.start()
+    thread.join()
+    assert outcome == ["done"]
@@ -0,0 +1,102 @@
+# tests/test_log_analytics.py
+import json
+import zipfile
+
+import pytest
+
+from log_analytics import analyze_logs, build_report, parse_time
+
+
+def _record(ts, extra=None, function="wrapper", message="done", level="INFO"):
+    return json.dumps({
+        "text": message,
+        "record": {
+            "extra": extra or {},
+            "function": function,
+            "level": {"icon": "", "name": level, "no": 20},
+            "message": message,
+            "process": {"id": 1, "name": "MainProcess"},
+            "thread": {"id": 2, "name": "MainThread"},
+            "time": {"repr": "", "timestamp": ts},
+        },
+    })
+
+
+def _node(ts, run_id, node, ms, status="ok"):
+    extra = {"run_id": run_id, "node": node, "status": status, "duration_ms": ms}
+    return _record(ts, extra, level="INFO" if status == "ok" else "ERROR")
+
+
+def test_analyze_logs_reads_live_and_zipped_rotations(tmp_path):
+    rotated = [
+        _node(1000.0, "run-a", "analyze_pub1", 1000),
+        _record(1000.5, function="validate_profile", message="[PUB1] Raw: " + "x" * 500, level="DEBUG"),
+        _node(1003.0, "run-a", "compare", 2000),
+    ]
+    with zipfile.ZipFile(tmp_path / "pipeline.2025-08-01_00-00-00_000000.log.zip", "w") as archive:
+        archive.writestr("pipeline.2025-08-01_00-00-00_000000.log", "\n".join(rotated) + "\n")
+
+    live = [
+        _node(2000.0, "run-b", "analyze_pub1", 500),
+        _node(2030.0, "run-b", "compare", 30000, status="timeout"),
+    ]
+    (tmp_path / "pipeline.log").write_text("\n".join(live) + "\n", encoding="utf-8")
+
+    report = build_report(analyze_logs(tmp_path), top=1)
+
+    assert report["files"] == 2
+    assert report["runs"] == 2
+    assert report["nodes"]["analyze_pub1"]["calls"] == 2
+    assert report["nodes"]["compare"]["timeouts"] == 1
+    assert report["nodes"]["compare"]["error_rate"] == 0.5
+    assert report["slowest_runs"][0]["run_id"] == "run-b"
+    assert report["slowest_runs"][0]["slowest_node"] == "compare"
+
+
+def test_analyze_logs_respects_time_window(tmp_path):
+    lines = [_node(ts, f"run-{ts}", "summarize", 100) for ts in (100.0, 200.0, 300.0)]
+    (tmp_path / "pipeline.log").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    report = build_report(analyze_logs(tmp_path, since=150.0, until=250.0))
+
+    assert report["runs"] == 1
+    assert report["nodes"]["summarize"]["calls"] == 1
+
+
+def test_legacy_records_are_grouped_into_runs(tmp_path):
+    lines = [
+        _record(10.0, function="validate_profile", message="[PUB1] Validated: {}"),
+        _record(12.0, function="validate_profile", message="[PUB2] Validated: {}"),
+        _record(15.0, function="compare", message="📊 Comparison complete"),
+    ]
+    (tmp_path / "pipeline.log").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    report = build_report(analyze_logs(tmp_path))
+
+    assert report["runs"] == 1
+    assert report["nodes"]["analyze_pub2"]["p50_ms"] == pytest.approx(2000, rel=0.02)
+    assert report["nodes"]["compare"]["p50_ms"] == pytest.approx(3000, rel=0.02)
+
+
+def test_traced_processes_are_not_inferred_as_legacy_runs(tmp_path):
+    start = {"run_id": "run-a", "node": "analyze_pubs"}
+    lines = [
+        _record(10.0, start, message="▶️ analyze_pubs started", level="DEBUG"),
+        _record(10.5, function="validate_profile", message="[PUB1] Validated: {}"),
+        _node(11.0, "run-a", "analyze_pubs", 1000),
+        _record(12.0, function="fact_check", message="🧷 Lexically grounded: 4/5 claims"),
+        _record(13.0, function="react_agent_tool", message="🔎 Web search stats: {}"),
+        _node(14.0, "run-a", "react_agent_tool", 1500),
+    ]
+    (tmp_path / "pipeline.log").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    report = build_report(analyze_logs(tmp_path))
+
+    assert report["runs"] == 1
+    assert list(report["nodes"]) == ["analyze_pubs", "react_agent_tool"]
+    assert report["nodes"]["react_agent_tool"]["calls"] == 1
+
+
+def test_parse_time_relative_offsets():
+    assert parse_time("2h", now=10_000.0) == 10_000.0 - 7200
+    assert parse_time(None) is None
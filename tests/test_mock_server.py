@@ -0,0 +1,44 @@
+# tests/test_mock_server.py
+import random
+
+import pytest
+import requests
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+
+from mock_server import LatencyDistribution, MockBehavior, MockServer, TokenBucket
+from search import TavilySearchBackend
+
+
+def test_latency_specs_parse_and_sample():
+    rng = random.Random(0)
+    assert LatencyDistribution.parse("fixed:50").sample_ms(rng) == 50
+    assert 20 <= LatencyDistribution.parse("uniform:20:80").sample_ms(rng) <= 80
+    assert LatencyDistribution.parse("lognormal:300:0.5").sample_ms(rng) > 0
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse("pareto:1")
+
+
+def test_chat_client_and_tavily_backend_talk_to_the_mock():
+    with MockServer() as server:
+        model = ChatOpenAI(model="gpt-3.5-turbo", api_key="sk-mock", base_url=server.env()["OPENAI_BASE_URL"], max_retries=0)
+        answer = model.invoke([HumanMessage("Summarize the findings below.")])
+        assert answer.content.startswith("Offline answer to: Summarize")
+        assert answer.usage_metadata["input_tokens"] > 0
+
+        results = TavilySearchBackend(api_url=server.url).search("sentiment classification datasets")
+        assert results and {"url", "content"} <= set(results[0])
+        assert server.stats()["chat"]["ok"] == 1 and server.stats()["search"]["ok"] == 1
+
+
+def test_injected_errors_and_rate_limits():
+    bucket = TokenBucket(rate=1, burst=2)
+    assert [bucket.acquire()[0] for _ in range(3)] == [True, True, False]
+
+    limited = MockBehavior(rate_limit=1, burst=1)
+    with MockServer(chat=limited, search=MockBehavior(error_rate=1.0)) as server:
+        body = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+        statuses = [requests.post(f"{server.url}/v1/chat/completions", json=body).status_code for _ in range(2)]
+        assert statuses == [200, 429]
+        assert requests.post(f"{server.url}/search", json={"query": "x"}).status_code == 500
+        assert server.stats()["chat"]["rate_limited"] == 1 and server.stats()["search"]["errors"] == 1
@@ -0,0 +1,68 @@
+# tests/test_model_tiers.py
+import pytest
+from unittest.mock import MagicMock
+
+from explorer import PublicationExplorer
+from model_tiers import FAST, STRONG, ModelRouter, TierMetrics
+
+
+PROFILE_JSON = '{"tools": ["PyTorch"], "evaluation_methods": [], "datasets": [], "task_types": [], "results": []}'
+
+
+@pytest.fixture
+def routed_explorer(monkeypatch):
+    monkeypatch.setenv("MODEL_ROUTING", "1")
+    exp = PublicationExplorer(lazy=False)
+    exp.model = MagicMock()
+    exp.fast_model = MagicMock()
+    exp.react_agent = MagicMock()
+    return exp
+
+
+def test_router_configuration(monkeypatch):
+    monkeypatch.setenv("MODEL_ROUTING", "1")
+    monkeypatch.setenv("NODE_TIERS", "aggregate_trends=fast, summarize=nope")
+    router = ModelRouter.from_env()
+
+    assert router.route("aggregate_trends", 10_000) == FAST
+    assert router.route("summarize", 100) == FAST
+    assert router.route("summarize", 10_000) == STRONG
+    assert router.route("react_agent_tool", 100) == STRONG
+    assert router.invoke_kwargs("summarize") == {"temperature": 0.2, "max_tokens": 600}
+
+    monkeypatch.setenv("MODEL_STRONG", "gpt-4o")
+    assert PublicationExplorer().profile_store.model == "gpt-4o"  # cached profiles follow the strong model
+
+
+def test_invalid_fast_profile_falls_back_to_strong_tier(routed_explorer, sample_pub_files):
+    routed_explorer.fast_model.invoke.return_value.content = "not json"
+    routed_explorer.model.invoke.return_value.content = PROFILE_JSON
+
+    profile = routed_explorer.extract_profile("Short paper using PyTorch.", "pub1", save=False)
+
+    assert profile["tools"] == ["PyTorch"]
+    assert routed_explorer.fast_model.invoke.call_count == 1
+    assert routed_explorer.model.invoke.call_args.kwargs == {"temperature": 0.0, "max_tokens": 800}
+    summary = routed_explorer.tier_metrics.summary()
+    assert summary["fallbacks"] == {"analyze_pubs": 1}
+    assert summary["tiers"][FAST]["calls"] == 1 and summary["tiers"][STRONG]["calls"] == 1
+
+
+def test_fast_tier_errors_fall_back(routed_explorer):
+    routed_explorer.fast_model.invoke.side_effect = TimeoutError("stuck")
+    routed_explorer.model.invoke.return_value.content = "A summary."
+
+    result = routed_explorer.summarize({"comparison": "c", "trends": "t", "count": 0})
+
+    assert result["summary"] == "A summary."
+    assert routed_explorer.tier_metrics.summary()["fallbacks"] == {"summarize": 1}
+
+
+def test_metrics_report_fast_tier_savings():
+    metrics = TierMetrics({STRONG: "gpt-3.5-turbo", FAST: "gpt-4o-mini"})
+    metrics.record("summarize", STRONG, 900.0, 1000, 500)
+    metrics.record("summarize", FAST, 300.0, 1000, 500)
+
+    savings = metrics.summary()["savings"]
+    assert savings["latency_ms_per_call"] == 600.0
+    assert savings["cost_usd"] == pytest.approx((0.0005 + 0.00075) - (0.00015 + 0.0003))
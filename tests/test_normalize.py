@@ -0,0 +1,64 @@
+# tests/test_normalize.py
+from normalize import NormalizeOptions, TextNormalizer, normalize_text
+
+
+RAW = """Title
+
+![figure.png](figure.png)
+# Introduction
+We fine-tune [BERT](https://huggingface.co/bert) on SST-2.<br/>It   works.
+--DIVIDER--# Method
+
+```python
+print("not prose")
+```
+
+| Model | Acc |
+| ----- | --- |
+| BERT  | 93  |
+# Introduction
+# References
+1. Devlin et al. BERT.
+## Older work
+2. Someone else.
+# Appendix
+Extra tables.
+"""
+
+
+def test_boilerplate_is_removed():
+    text = normalize_text(RAW).text
+
+    assert "![" not in text and "--DIVIDER--" not in text and "<br" not in text
+    assert "We fine-tune BERT on SST-2. It works." in text
+    assert "print(" not in text
+    assert "| ----- |" not in text and "| BERT | 93 |" in text
+    assert text.count("# Introduction") == 1
+    assert "\n\n\n" not in text
+
+
+def test_references_and_appendices_are_optional():
+    default = normalize_text(RAW).text
+    assert "Devlin" not in default and "Someone else" not in default
+    assert "Extra tables." in default
+
+    stripped = normalize_text(RAW, NormalizeOptions(drop_appendices=True)).text
+    assert "Extra tables." not in stripped
+
+    kept = normalize_text(RAW, NormalizeOptions(drop_references=False, drop_code=False)).text
+    assert "Devlin" in kept and 'print("not prose")' in kept
+
+
+def test_normalizer_caches_by_content_hash(tmp_path):
+    doc = tmp_path / "pub.txt"
+    doc.write_text(RAW)
+
+    first = TextNormalizer(cache_dir=tmp_path / "cache")
+    result = first.read(doc)
+    again = first.read(doc)
+    second = TextNormalizer(cache_dir=tmp_path / "cache").read(doc)
+
+    assert result.ratio > 1.3
+    assert again is result
+    assert first.stats == {"hits": 1, "misses": 1}
+    assert second == result
@@ -0,0 +1,50 @@
+# tests/test_profile_diff.py
+from profile_diff import benchmark, canonical_entity, diff_profiles, entities_match
+
+
+A = {"tools": ["HF Transformers", "PyTorch", "Python 3.8"], "datasets": ["SST-2", "IMDB"],
+     "evaluation_methods": ["F1 score"], "results": ["93% accuracy"]}
+B = {"tools": ["HuggingFace Transformers", "torch", "Python 3.10"], "datasets": ["SST-5", "imdb"],
+     "evaluation_methods": ["F1-Score", "BLEU"]}
+C = {"tools": ["scikit-learn", "pytorch"], "datasets": ["IMDB"]}
+
+
+def test_aliases_and_fuzzy_spellings_match():
+    assert canonical_entity("HF Transformers") == canonical_entity("Hugging Face transformers")
+    assert canonical_entity("sklearn") == canonical_entity("Scikit-Learn")
+    assert canonical_entity("TF-IDF") != canonical_entity("TensorFlow")
+    assert entities_match("sklearn", "Scikit-Learn") and entities_match("Lang-chain ", "LangChain")
+    assert not entities_match("TF-IDF", "TensorFlow")
+
+    tools = diff_profiles(["a", "b"], [{"tools": ["LangChain"]}, {"tools": ["Lang-chain "]}]).fields["tools"]
+    assert tools.shared == ["LangChain"]
+
+
+def test_two_way_diff_reports_shared_unique_and_conflicts():
+    diff = diff_profiles(["A", "B"], [A, B])
+    tools, datasets = diff.fields["tools"], diff.fields["datasets"]
+
+    assert tools.shared == ["HF Transformers", "PyTorch"]
+    assert tools.conflicts == [{"entity": "Python", "values": {"A": "Python 3.8", "B": "Python 3.10"}}]
+    # Numbered datasets are distinct entities, not version conflicts
+    assert datasets.unique == {"A": ["SST-2"], "B": ["SST-5"]} and datasets.conflicts == []
+    assert diff.fields["evaluation_methods"].unique["B"] == ["BLEU"]
+    assert diff.results["A"] == ["93% accuracy"]
+
+
+def test_n_way_diff_reports_partial_overlap():
+    diff = diff_profiles(["A", "B", "C"], [A, B, C])
+    tools = diff.fields["tools"]
+
+    assert tools.shared == ["PyTorch"]
+    assert tools.partial == [("HF Transformers", ["A", "B"])]
+    assert tools.unique["C"] == ["scikit-learn"]
+    assert "HF Transformers: only pub1, pub2" in diff.to_text()
+
+
+def test_benchmark_shrinks_compare_payload():
+    report = benchmark([("A", A), ("B", B), ("C", C)], pairs=10)
+
+    assert report["pairs"] == 10
+    assert report["diff_prompt_tokens_mean"] < report["raw_prompt_tokens_mean"]
+    assert report["diff_latency_us_p50"] < 10_000
@@ -0,0 +1,22 @@
+# tests/test_profile_store.py
+from profile_store import PROFILE_FIELDS, ProfileStore, extraction_fields_for_query
+
+
+def test_extraction_fields_for_query():
+    assert extraction_fields_for_query("Datasets") == ("datasets",)
+    assert extraction_fields_for_query("  evaluation   methods ") == ("evaluation_methods",)
+    assert extraction_fields_for_query("How do they handle class imbalance?") == PROFILE_FIELDS
+
+
+def test_store_merges_fields_and_persists(tmp_path):
+    store = ProfileStore("gpt-3.5-turbo", cache_dir=tmp_path)
+    store.merge("doc", {"datasets": ["SST-2"]})
+    store.merge("doc", {"tools": ["PyTorch"]})
+
+    cached, missing = store.missing("doc", ("tools", "datasets", "results"))
+    assert cached == {"datasets": ["SST-2"], "tools": ["PyTorch"]}
+    assert missing == ("results",)
+
+    reloaded = ProfileStore("gpt-3.5-turbo", cache_dir=tmp_path)
+    assert reloaded.get("doc") == cached
+    assert ProfileStore("gpt-4o", cache_dir=tmp_path).get("doc") == {}
@@ -0,0 +1,60 @@
+# tests/test_prompt_budget.py
+from unittest.mock import MagicMock
+
+import pytest
+
+from explorer import PublicationExplorer
+from prompt_budget import ApproxTokenizer, PromptBudgetExceeded, PromptBudgeter
+
+
+def _budgeter(**kwargs):
+    return PromptBudgeter(tokenizer=ApproxTokenizer(), **kwargs)
+
+
+def test_truncate_stops_at_sentence_boundary():
+    budgeter = _budgeter()
+    text = "First sentence is here. Second sentence follows it. " * 20
+
+    cut = budgeter.truncate(text, 40)
+
+    assert budgeter.count(cut) <= 40
+    assert cut.endswith(".")
+    assert budgeter.truncate("Short text.", 40) == "Short text."
+
+
+def test_allocation_gives_short_passages_everything():
+    budgeter = _budgeter()
+
+    assert budgeter.allocate([10, 100, 1000], 300) == [10, 100, 190]
+    assert budgeter.allocate([400, 1000], 300) == [150, 150]
+    passages = budgeter.fit(["tiny", "word " * 500, "term " * 900], 300)
+    assert passages[0] == "tiny"
+    assert sum(budgeter.count(p) for p in passages) <= 300
+
+
+def test_oversized_prompt_is_rejected_locally():
+    budgeter = _budgeter(model="gpt-4", reserve_output=1000)
+
+    with pytest.raises(PromptBudgetExceeded):
+        budgeter.check("word " * 8000, "compare")
+    assert budgeter.check("word " * 100, "compare") > 100
+
+
+def test_fact_check_prompt_fits_node_budget(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"long_{i}.txt"
+        path.write_text(f"Publication {i} evaluates models on many datasets. " * 3000)
+        paths.append(str(path))
+
+    explorer = PublicationExplorer()
+    explorer.model = MagicMock()
+    explorer.model.invoke.return_value.content = "ok"
+    summary = " ".join(f"Claim {i} says models reach accuracy {i} on benchmark B{i}." for i in range(300))
+    state = {"pub_paths": paths, "user_query": "Datasets", "count": 0,
+             "comparison": "c", "trends": "t", "summary": summary}
+    explorer.fact_check(state)
+
+    prompt = explorer.model.invoke.call_args[0][0][0].content
+    assert explorer.budgeter.count(prompt) <= explorer.budgeter.budget("fact_check_node")
+    assert "Evidence long_" in prompt
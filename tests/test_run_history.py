@@ -0,0 +1,94 @@
+# tests/test_run_history.py
+import json
+import uuid
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+import run_history
+from paths import SAMPLE_PUBLICATION_DIR, SRC_DIR
+from run_history import ALL_TIME, RunHistory, RunRecord, record_from_comparison
+from work_queue import build_explorer
+
+
+def _run(run_id, saved_at, query, pubs, tools, nodes=None):
+    profiles = [{"tools": t, "datasets": ["MNIST"]} for t in tools]
+    return RunRecord(run_id, saved_at, query, pubs, profiles, nodes or {})
+
+
+def test_record_updates_monthly_and_all_time_aggregates_once_per_run(tmp_path):
+    history = RunHistory(tmp_path / "history.sqlite3")
+    nodes = {"compare": {"duration_ms": 100.0, "status": "ok", "input_tokens": 50, "output_tokens": 10}}
+    assert history.record(_run("r1", "2026-09-30T23:00:00", "Datasets", ["a", "b"], [["PyTorch"], ["pytorch", "NumPy"]], nodes))
+    assert history.record(_run("r2", "2026-10-01T08:00:00", "Tool Usage", ["b", "a", "c"], [["PyTorch"]],
+                               {"compare": {**nodes["compare"], "duration_ms": 300.0}}))
+    assert not history.record(_run("r2", "2026-10-01T08:00:00", "Tool Usage", ["a", "b"], [["PyTorch"]]))
+
+    assert history.periods() == [ALL_TIME, "2026-10", "2026-09"]
+    assert history.run_count() == 2 and history.run_count("2026-09") == 1
+    assert history.top_entities("tools") == [{"entity": "PyTorch", "count": 3}, {"entity": "NumPy", "count": 1}]
+    assert history.top_entities("tools", "2026-10") == [{"entity": "PyTorch", "count": 1}]
+    assert history.query_counts() == [{"query": "Datasets", "runs": 1}, {"query": "Tool Usage", "runs": 1}]
+    assert history.top_pairs(limit=1) == [{"publications": ["a", "b"], "runs": 2}]
+
+    compare = history.node_stats()["compare"]
+    assert (compare["calls"], compare["failures"], compare["mean_ms"]) == (2, 0, 200.0)
+    assert abs(compare["p50_ms"] - 100) < 3 and abs(compare["p95_ms"] - 300) < 7
+    assert (compare["input_tokens"], compare["output_tokens"]) == (100, 20)
+
+
+def test_rebuild_recomputes_aggregates_from_saved_comparisons(tmp_path):
+    comparisons = tmp_path / "comparisons"
+    comparisons.mkdir()
+    runs = [
+        _run("r1", "2026-10-02T10:00:00", "Datasets", ["a", "b"], [["PyTorch"], ["TensorFlow"]],
+             {"summarize": {"duration_ms": 40.0, "status": "ok", "input_tokens": 5, "output_tokens": 1}}),
+        _run("r2", "2026-10-03T10:00:00", "Datasets", ["a", "c"], [["pytorch"]]),
+    ]
+    incremental = RunHistory(tmp_path / "incremental.sqlite3")
+    for run in runs:
+        (comparisons / f"comparison_{run.run_id}.json").write_text(
+            json.dumps({"summary": "s", "profiles": run.profiles, "run": run.meta()}), encoding="utf-8"
+        )
+        incremental.record(run)
+    # Saved before the history existed: legacy two-publication state, Windows paths, string profile
+    (comparisons / "comparison_x_vs_y_20250807_134337.json").write_text(json.dumps({
+        "pub1_path": "C:\\data\\Paper X.txt", "pub2_path": "C:\\data\\Paper Y.txt", "user_query": "Datasets",
+        "pub1_profile": json.dumps({"tools": ["Keras"]}), "pub2_profile": {"tools": ["PyTorch"]},
+    }), encoding="utf-8")
+
+    legacy = record_from_comparison(comparisons / "comparison_x_vs_y_20250807_134337.json")
+    assert (legacy.saved_at, legacy.publications) == ("2025-08-07T13:43:37", ["Paper X", "Paper Y"])
+
+    # Profiler reports are not comparisons, whatever their name
+    (comparisons / "comparison_x_20251001_100000.profile.alloc.json").write_text(json.dumps({"run_id": "p", "nodes": []}))
+    (comparisons / "profile_p.alloc.json").write_text(json.dumps({"run": {"run_id": "p"}}))
+
+    rebuilt = RunHistory(tmp_path / "rebuilt.sqlite3")
+    rebuilt.record(legacy)  # counted again by the rebuild, not twice
+    assert rebuilt.rebuild(comparisons) == 3
+    assert rebuilt.report("2026-10") == incremental.report("2026-10")
+    assert rebuilt.top_entities("tools")[0] == {"entity": "PyTorch", "count": 3}
+    assert rebuilt.periods() == [ALL_TIME, "2026-10", "2025-08"]
+
+
+def test_explorer_ledger_feeds_the_history_page(tmp_path, monkeypatch):
+    explorer = build_explorer(fake_model=True)
+    run_id = uuid.uuid4().hex
+    pubs = sorted(Path(SAMPLE_PUBLICATION_DIR).glob("*.txt"))[:2]
+    result = explorer.graph.invoke({"run_id": run_id, "pub_paths": [str(p) for p in pubs],
+                                    "user_query": "Tool Usage", "fast": False, "count": 0})
+    nodes = explorer.node_ledger.pop(run_id)
+    assert {"analyze_pubs", "compare", "summarize"} <= set(nodes)
+    assert all(n["status"] == "ok" for n in nodes.values()) and nodes["summarize"]["input_tokens"] > 0
+    assert explorer.node_ledger.pop(run_id) == {}
+
+    monkeypatch.setattr(run_history, "HISTORY_PATH", tmp_path / "history.sqlite3")
+    RunHistory().record(RunRecord(run_id, "2026-10-19T12:00:00", "Tool Usage", [p.stem for p in pubs],
+                                  result["profiles"], nodes))
+    at = AppTest.from_file(str(SRC_DIR / "pages" / "1_History.py"), default_timeout=30)
+    at.run()
+    assert not at.exception
+    assert at.metric[0].value == "1"
+    node_table = at.dataframe[-1].value
+    assert "summarize" in list(node_table["Node"])
@@ -0,0 +1,114 @@
+# tests/test_run_profiler.py
+import json
+import uuid
+import tracemalloc
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+import api_server
+import explorer
+import run_profiler
+from api_client import ApiClient
+from api_server import ApiServer, JobManager
+from paths import SAMPLE_PUBLICATION_DIR, SRC_DIR
+from run_profiler import RunProfiler, active_profiler, categorize
+from work_queue import build_explorer
+
+PUBS = sorted(p.name for p in Path(SAMPLE_PUBLICATION_DIR).glob("*.txt"))[:2]
+
+
+def test_profiled_run_writes_folded_stacks_and_per_node_allocations(tmp_path):
+    explorer = build_explorer(fake_model=True)
+    run_id = uuid.uuid4().hex
+    state = {"run_id": run_id, "pub_paths": [str(Path(SAMPLE_PUBLICATION_DIR) / p) for p in PUBS],
+             "user_query": "Datasets", "fast": False, "count": 0}
+    with RunProfiler(run_id, interval_ms=1) as profiler:
+        assert active_profiler(run_id) is profiler and active_profiler("other") is None
+        explorer.graph.invoke(state)
+
+    files = profiler.save(tmp_path / "run.profile")
+    lines = Path(files["flamegraph"]).read_text(encoding="utf-8").splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() and ";" in line for line in lines)
+    assert any("explorer:" in line for line in lines)
+
+    report = json.loads(Path(files["allocations"]).read_text(encoding="utf-8"))
+    nodes = [n["node"] for n in report["nodes"]]
+    assert nodes[:2] == ["analyze_pubs", "compare"] and "summarize" in nodes
+    assert all(n["peak_kb"] >= 0 and "top" in n for n in report["nodes"])
+    assert abs(sum(report["time_share"].values()) - 1) < 0.01
+
+
+def test_unprofiled_runs_leave_no_trace():
+    explorer = build_explorer(fake_model=True)
+    run_id = uuid.uuid4().hex
+    state = {"run_id": run_id, "pub_paths": [str(Path(SAMPLE_PUBLICATION_DIR) / p) for p in PUBS],
+             "user_query": "Datasets", "fast": True, "count": 0}
+    explorer.graph.invoke(state)
+    assert run_profiler._ACTIVE == {} and active_profiler(run_id) is None
+
+    assert categorize(["json.decoder", "openai._base_client"]) == "llm"
+    assert categorize(["json.decoder", "guardrails.guard"]) == "guardrails"
+    assert categorize(["explorer", "pathlib"]) == "file_io"
+    assert categorize(["explorer"]) == "other"
+
+
+def test_overlapping_profilers_share_tracemalloc_and_never_fail_runs(monkeypatch):
+    tracing_before = tracemalloc.is_tracing()
+    first, second = RunProfiler("first").start(), RunProfiler("second").start()
+    second.node_started("compare")
+    first.stop()  # the other run is still profiled
+    assert tracemalloc.is_tracing()
+    second.node_finished("compare")
+    second.stop()
+    assert tracemalloc.is_tracing() == tracing_before and run_profiler._ACTIVE == {}
+    assert second.nodes[0]["node"] == "compare" and second.nodes[0]["peak_kb"] is None  # the peak was shared
+
+    def broken(self, node, status="ok"):
+        raise RuntimeError("profiler broke")
+
+    monkeypatch.setattr(RunProfiler, "node_finished", broken)
+    explorer = build_explorer(fake_model=True)
+    run_id = uuid.uuid4().hex
+    state = {"run_id": run_id, "pub_paths": [str(Path(SAMPLE_PUBLICATION_DIR) / p) for p in PUBS],
+             "user_query": "Datasets", "fast": True, "count": 0}
+    with RunProfiler(run_id):
+        assert explorer.graph.invoke(state)["comparison"]
+
+
+def test_api_profiles_jobs_requested_by_header(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_server, "RUN_PROFILES_DIR", tmp_path)
+    manager = JobManager(workers=1, explorer_factory=lambda: build_explorer(fake_model=True))
+    with ApiServer(manager) as server:
+        client = ApiClient(server.url)
+        plain = client.submit(PUBS, "Datasets", fast=True)
+        list(client.events(plain["id"]))
+        assert "profile" not in client.result(plain["id"])
+
+        response = client.session.post(f"{server.url}/jobs", headers={"X-Profile": "1"},
+                                       json={"publications": PUBS, "query": "Datasets", "fast": True})
+        job = response.json()
+        list(client.events(job["id"]))
+        files = client.result(job["id"])["profile"]
+    assert Path(files["flamegraph"]) == tmp_path / f"job_{job['id']}.profile.folded"
+    assert Path(files["allocations"]).is_file()
+
+
+def test_failed_app_run_stops_its_profiler(monkeypatch):
+    class FailingGraph:
+        def invoke(self, state):
+            raise RuntimeError("graph failed")
+
+    monkeypatch.delenv("API_URL", raising=False)
+    monkeypatch.setattr(explorer.PublicationExplorer, "graph", FailingGraph())
+    tracing_before = tracemalloc.is_tracing()
+    at = AppTest.from_file(str(SRC_DIR / "app.py"), default_timeout=60)
+    at.run()
+    at.multiselect(key="pubs").set_value(PUBS)
+    next(s for s in at.selectbox if s.label == "Select a query type").set_value("Datasets")
+    next(c for c in at.checkbox if c.label == "🔬 Profile this run").check()
+    next(b for b in at.button if b.label == "🚀 Run Comparison").click()
+    at.run()
+
+    assert at.exception and "graph failed" in at.exception[0].value
+    assert run_profiler._ACTIVE == {} and tracemalloc.is_tracing() == tracing_before
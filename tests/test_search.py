@@ -0,0 +1,98 @@
+# tests/test_search.py
+import threading
+import time
+
+import pytest
+
+from search import CachedWebSearch, CorpusSearchBackend, SearchCache, normalize_query
+
+
+class CountingBackend:
+    name = "fake"
+
+    def __init__(self, delay=0.0, fail=False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+
+    def search(self, query):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("offline")
+        return [{"url": "https://example.com", "content": f"result for {query}"}]
+
+
+def test_normalize_query():
+    assert normalize_query("  What is  SST-2? ") == normalize_query("what is sst-2")
+
+
+def test_cache_hits_for_equivalent_queries(tmp_path):
+    backend = CountingBackend()
+    search = CachedWebSearch(backend, cache=SearchCache(tmp_path / "cache.sqlite"))
+
+    first = search.run("HuggingFace Transformers")
+    second = search.run("huggingface   transformers!")
+
+    assert first == second
+    assert backend.calls == 1
+    assert search.stats["hits"] == 1
+
+
+def test_cache_entries_expire(tmp_path):
+    backend = CountingBackend()
+    search = CachedWebSearch(backend, cache=SearchCache(tmp_path / "cache.sqlite", ttl_seconds=-1))
+
+    search.run("BLEU score")
+    search.run("BLEU score")
+
+    assert backend.calls == 2
+
+
+def test_budget_limits_backend_calls(tmp_path):
+    backend = CountingBackend()
+    search = CachedWebSearch(backend, max_searches=1)
+
+    search.run("first query")
+    result = search.run("second query")
+
+    assert backend.calls == 1
+    assert "budget" in result[0]["content"]
+    assert search.stats["over_budget"] == 1
+    search.start_run()
+    assert search.stats["over_budget"] == 0  # stats are per run, like the budget
+    search.run("second query")
+    assert backend.calls == 2
+
+
+def test_identical_inflight_queries_are_deduplicated():
+    backend = CountingBackend(delay=0.2)
+    search = CachedWebSearch(backend, max_searches=10)
+
+    threads = [threading.Thread(target=search.run, args=("ImageNet",)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert backend.calls == 1
+    assert search.stats["deduplicated"] == 3
+
+
+def test_falls_back_to_corpus_backend(tmp_path):
+    (tmp_path / "paper.txt").write_text(
+        "Intro paragraph.\n\n"
+        "We fine-tune PyTorch models on the SST-2 benchmark and report accuracy and F1 scores across seeds.",
+        encoding="utf-8",
+    )
+    search = CachedWebSearch(CountingBackend(fail=True), fallback=CorpusSearchBackend(tmp_path))
+
+    results = search.run("SST-2 accuracy")
+
+    assert results[0]["url"] == "corpus://paper"
+    assert search.stats["fallbacks"] == 1
+
+
+def test_failures_without_fallback_propagate():
+    with pytest.raises(ConnectionError):
+        CachedWebSearch(CountingBackend(fail=True)).run("anything")
@@ -0,0 +1,39 @@
+# tests/test_similarity.py
+from similarity import SimilarityIndex
+
+
+RECORDS = {
+    "a": {"title": "A", "profile": {"tools": ["PyTorch", "HuggingFace"], "datasets": ["SST-2"]}},
+    "b": {"title": "B", "profile": {"tools": ["pytorch", "HuggingFace"], "datasets": ["SST-2", "IMDB"]}},
+    "c": {"title": "C", "profile": {"tools": ["PyTorch"], "datasets": ["ImageNet"]}},
+    "d": {"title": "D", "profile": {"tools": ["JAX"], "task_types": ["RL"]}},
+    "e": {"title": "E", "profile": "unvalidated raw text is skipped"},
+}
+
+
+def test_similar_to_ranks_by_shared_entities():
+    index = SimilarityIndex.from_records(RECORDS)
+    results = index.similar_to("a", k=5)
+
+    assert len(index) == 4
+    assert [r["id"] for r in results] == ["b", "c"]
+    assert results[0]["shared"]["datasets"] == ["SST-2"]
+    assert sorted(results[0]["shared"]["tools"]) == ["HuggingFace", "PyTorch"]
+
+
+def test_ad_hoc_profile_query():
+    index = SimilarityIndex.from_records(RECORDS)
+
+    assert index.query({"tools": ["jax"]}, k=1)[0]["id"] == "d"
+    assert index.query({"tools": ["Unknown tool"]}) == []
+    assert index.query({}) == []
+
+
+def test_replacing_a_document_updates_vectors():
+    index = SimilarityIndex.from_records(RECORDS)
+    index.add("c", "C v2", {"tools": ["JAX"], "task_types": ["RL"]})
+
+    assert len(index) == 4
+    assert index.find_id("C v2") == "c"
+    assert index.similar_to("d", k=1)[0]["id"] == "c"
+    assert [r["id"] for r in index.similar_to("a")] == ["b"]
@@ -0,0 +1,34 @@
+# tests/test_startup.py
+import os
+import subprocess
+import sys
+
+from paths import SRC_DIR
+from startup_profile import FIRST_RENDER_BUDGET_S, import_profile, parse_importtime, time_to_first_render
+
+
+def test_importing_explorer_skips_llm_dependencies():
+    profile = import_profile("explorer")
+    assert profile.total_ms > 0
+    assert profile.heavy_loaded == []
+
+    rows = parse_importtime("import time:       120 |       4500 |   langchain_core\n")
+    assert rows == [{"module": "langchain_core", "self_ms": 0.12, "cumulative_ms": 4.5, "depth": 1}]
+
+
+def test_imports_have_no_filesystem_side_effects(tmp_path):
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+    script = "import explorer, logger; logger.logger.info('hello'); logger.logger.complete()"
+    subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env, check=True, capture_output=True)
+    # The log sinks only appear once something is written; nothing else does
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["logs"]
+
+    fresh = tmp_path / "fresh"
+    fresh.mkdir()
+    subprocess.run([sys.executable, "-c", "import explorer, cassette, similarity"],
+                   cwd=fresh, env=env, check=True, capture_output=True)
+    assert list(fresh.iterdir()) == []
+
+
+def test_first_render_within_budget():
+    assert time_to_first_render() < FIRST_RENDER_BUDGET_S
@@ -0,0 +1,69 @@
+# tests/test_trends.py
+from corpus import load_corpus_profiles, precompute_profiles
+from trends import TrendEngine, fields_for_query
+
+
+RECORDS = [
+    {"date": "2025-01-10", "profile": {"tools": ["PyTorch", "HuggingFace"], "datasets": ["SST-2"]}},
+    {"date": "2025-01-20", "profile": {"tools": ["pytorch", "scikit-learn"], "datasets": ["SST-2", "IMDB"]}},
+    {"date": "2025-02-03", "profile": {"tools": ["PyTorch", "HuggingFace"], "datasets": ["ImageNet"]}},
+    {"profile": "unvalidated raw text is skipped"},
+]
+
+
+def test_frequencies_merge_case_variants():
+    engine = TrendEngine(RECORDS)
+
+    assert engine.n_docs == 3
+    assert engine.frequencies("tools", top_k=2) == [("PyTorch", 3), ("HuggingFace", 2)]
+    assert engine.prevalence("datasets", ["sst-2", "COCO"]) == {"sst-2": 2, "COCO": 0}
+
+
+def test_cooccurrence_and_time_buckets():
+    engine = TrendEngine(RECORDS)
+
+    assert engine.cooccurrence("tools", top_k=1) == [("PyTorch", "HuggingFace", 2)]
+    assert engine.time_buckets("datasets")["2025-01"][0] == ("SST-2", 2)
+    assert engine.time_buckets("datasets")["2025-02"] == [("ImageNet", 1)]
+
+
+def test_prompt_focuses_on_query_fields():
+    engine = TrendEngine(RECORDS)
+    text = engine.to_prompt("Datasets", [{"datasets": ["SST-2"]}])
+
+    assert fields_for_query("Datasets") == ("datasets",)
+    assert "Most common datasets: SST-2 (2)" in text
+    assert "SST-2 (2/3)" in text
+    assert "Most common tools" not in text
+
+
+def test_precompute_only_extracts_new_or_changed(tmp_path):
+    store = tmp_path / "profiles.json"
+    calls = []
+
+    def extract(text, pub_id):
+        calls.append(pub_id)
+        return {"tools": [text.split()[0]]}
+
+    pubs = [
+        {"id": "a", "title": "A", "publication_description": "PyTorch paper"},
+        {"id": "b", "title": "B", "publication_description": "JAX paper"},
+    ]
+    precompute_profiles(pubs, extract, workers=2, path=store)
+    pubs[1]["publication_description"] = "Keras paper"
+    precompute_profiles(pubs, extract, workers=2, path=store)
+
+    assert sorted(calls) == ["a", "b", "b"]
+    assert load_corpus_profiles(store)["b"]["profile"] == {"tools": ["Keras"]}
+    assert sorted(TrendEngine.from_file(store).frequencies("tools")) == [("Keras", 1), ("PyTorch", 1)]
+
+
+def test_precompute_retries_profiles_that_failed_validation(tmp_path):
+    store = tmp_path / "profiles.json"
+    answers = iter(["not a profile", {"tools": ["JAX"]}])
+    pubs = [{"id": "a", "title": "A", "publication_description": "JAX paper"}]
+
+    precompute_profiles(pubs, lambda text, pub_id: next(answers), workers=1, path=store)
+    assert load_corpus_profiles(store)["a"]["profile"] is None
+    precompute_profiles(pubs, lambda text, pub_id: next(answers), workers=1, path=store)
+    assert load_corpus_profiles(store)["a"]["profile"] == {"tools": ["JAX"]}
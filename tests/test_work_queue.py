@@ -0,0 +1,55 @@
+# tests/test_work_queue.py
+import time
+
+from work_queue import WorkQueue, enqueue_batch, run_workers
+
+
+def test_lease_expiry_and_idempotent_commit(tmp_path):
+    queue = WorkQueue(tmp_path / "jobs.sqlite3", backoff_s=0)
+    jid = queue.enqueue("extract", {"path": "a.txt"})
+    assert queue.enqueue("extract", {"path": "a.txt"}) == jid  # same job, not queued twice
+
+    first = queue.lease("w1", lease_s=0.05)
+    assert first.id == jid and first.attempts == 1
+    assert queue.lease("w2") is None  # invisible while leased
+
+    time.sleep(0.1)
+    second = queue.lease("w2", lease_s=60)
+    assert second.id == jid and second.attempts == 2
+    assert not queue.heartbeat(jid, "w1")  # w1 lost the lease
+
+    assert queue.complete(jid, "w2", {"tools": ["PyTorch"]})
+    assert not queue.complete(jid, "w1", {"tools": ["stale"]})
+    assert queue.jobs("done")[0]["result"] == {"tools": ["PyTorch"]}
+
+
+def test_failing_job_is_dead_lettered_and_requeued(tmp_path):
+    queue = WorkQueue(tmp_path / "jobs.sqlite3", backoff_s=0)
+    jid = queue.enqueue("compare", {"paths": ["x"]}, max_attempts=2)
+
+    job = queue.lease("w1")
+    assert queue.fail(job.id, "w1", "boom") == "queued"
+    job = queue.lease("w1")
+    assert queue.fail(job.id, "w1", "boom again") == "dead"
+    assert queue.lease("w1") is None
+    assert queue.jobs("dead")[0]["error"] == "boom again"
+
+    assert queue.requeue_dead([jid]) == 1
+    assert queue.stats()["queued"] == 1
+
+
+def test_worker_processes_drain_queue_with_fake_model(tmp_path, sample_pub_files):
+    queue = WorkQueue(tmp_path / "jobs.sqlite3", backoff_s=0)
+    counts = enqueue_batch(queue, list(sample_pub_files), "Datasets", fast=True)
+    queue.enqueue("extract", {"path": str(tmp_path / "missing.txt")}, max_attempts=2)
+
+    codes = run_workers(2, queue.path, fake_model=True, backoff_s=0, lease_s=30)
+
+    assert codes == [0, 0]
+    assert counts == {"extract": 2, "compare": 1}
+    assert queue.stats() == {"queued": 0, "leased": 0, "done": 3, "dead": 1}
+    done = {j["kind"]: j for j in queue.jobs("done")}
+    assert done["extract"]["attempts"] == 1
+    assert done["compare"]["result"]["comparison"].startswith("Query: 'Datasets'")
+    assert done["compare"]["result"]["profiles"][1] == {"datasets": ["SST-2"]}
+    assert "FileNotFoundError" in queue.jobs("dead")[0]["error"]